@@ -1,6 +1,6 @@
 """ 
  * __init__.py
- * Last Edited: 3/26/24
+ * Last Edited: 10/18/26
  *
  * Contains initialization of the Flask App
  *
@@ -14,13 +14,23 @@ from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 import os
-from werkzeug.security import generate_password_hash
 from dotenv import load_dotenv
 from flask_jwt_extended import JWTManager
 from datetime import timedelta
+from .slow_queries import SlowQueryRecorder
+from .passwords import PasswordHasher
+from .response_cache import ResponseCache
+from .compression import ResponseCompressor
+from .json_provider import FastJSONProvider
+from .slot_events import SlotEventBroker
 
 db = SQLAlchemy()
 jwt = JWTManager()
+slow_queries = SlowQueryRecorder()
+password_hasher = PasswordHasher()
+response_cache = ResponseCache()
+compressor = ResponseCompressor()
+slot_events = SlotEventBroker()
 
 def create_app():
     app = Flask(__name__)
@@ -35,8 +45,17 @@ def create_app():
     from .instructor import instructor
     from .programs import programs
     from .feedback import feedback
-    from .models import User
     from .user import user
+    from .roster import roster
+    from .roster_sync import roster_sync
+    from .freebusy import freebusy
+    from .batch import batch
+    from .dashboard import dashboard
+    from .slot_stream import slot_stream
+    from .analytics import analytics
+    from .cascades import DEFAULT_CHUNK_SIZE
+    from .batch import DEFAULT_MAX_REQUESTS, DEFAULT_WORKERS
+    from .commands import bootstrap_admin, import_roster_command, sync_rosters_command, purge_deleted_programs_command, rebuild_feedback_aggregates_command
     
     ##create MySQL database##    
     load_dotenv()
@@ -50,11 +69,40 @@ def create_app():
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY')
     app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=3)
     jwt.init_app(app)  # Initialize the JWTManager with the Flask app
+
+    # reservations are checked against the student's course meeting times unless BOOKING_CONFLICT_COURSE_TIMES is false
+    app.config.setdefault('BOOKING_CONFLICT_COURSE_TIMES', os.environ.get('BOOKING_CONFLICT_COURSE_TIMES', 'true'))
+
+    # program deletes purge PURGE_CHUNK_SIZE availabilities per statement, in the request (sync) or a background thread (async)
+    app.config.setdefault('PURGE_CHUNK_SIZE', int(os.environ.get('PURGE_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)))
+    app.config.setdefault('PROGRAM_DELETE_MODE', os.environ.get('PROGRAM_DELETE_MODE', 'sync'))
+
+    # /batch takes at most BATCH_MAX_REQUESTS paths and runs parallel ones on BATCH_WORKERS threads
+    app.config.setdefault('BATCH_MAX_REQUESTS', int(os.environ.get('BATCH_MAX_REQUESTS', DEFAULT_MAX_REQUESTS)))
+    app.config.setdefault('BATCH_WORKERS', int(os.environ.get('BATCH_WORKERS', DEFAULT_WORKERS)))
     
+    # jsonify encodes with orjson when installed, stdlib json otherwise
+    app.json = FastJSONProvider(app)
+
     # Bind the SQLAlchemy instance to this Flask app
     db.init_app(app)
     migrate = Migrate(app, db)
 
+    # log statements slower than SLOW_QUERY_THRESHOLD_MS along with their EXPLAIN plan
+    slow_queries.init_app(app)
+
+    # scrypt hashing runs on a bounded process pool sized by PASSWORD_HASH_WORKERS
+    password_hasher.init_app(app)
+
+    # catalog responses are cached in the RESPONSE_CACHE_BACKEND (lru, shared, redis or none)
+    response_cache.init_app(app)
+
+    # gzip or brotli for JSON and text bodies over COMPRESS_MIN_SIZE, negotiated by Accept-Encoding
+    compressor.init_app(app)
+
+    # slot changes reach /events streams through the slot_event table, polled every SLOT_EVENTS_POLL_INTERVAL seconds
+    slot_events.init_app(app)
+
     app.register_blueprint(auth, url_prefix='/')
     app.register_blueprint(admin, url_prefix='/')
     app.register_blueprint(student, url_prefix='/')
@@ -62,23 +110,20 @@ def create_app():
     app.register_blueprint(programs, url_prefix='/')
     app.register_blueprint(feedback, url_prefix='/')
     app.register_blueprint(user, url_prefix='/')
+    app.register_blueprint(roster, url_prefix='/')
+    app.register_blueprint(roster_sync, url_prefix='/')
+    app.register_blueprint(freebusy, url_prefix='/')
+    app.register_blueprint(batch, url_prefix='/')
+    app.register_blueprint(dashboard, url_prefix='/')
+    app.register_blueprint(slot_stream, url_prefix='/')
+    app.register_blueprint(analytics, url_prefix='/')
     
-    with app.app_context():
-        db.create_all()
-
-        def create_admin():
-            admin = User.query.filter_by(name='admin', account_type='admin').first()
-            if not admin:
-                # Create the admin user with default values
-                name=os.environ.get('ADMIN_NAME')
-                email=os.environ.get('ADMIN_EMAIL')
-                password=os.environ.get('ADMIN_PASSWORD')
-                new_admin = User(name=name, email=email, 
-                                 password=generate_password_hash(password, method='scrypt', salt_length=2), 
-                                 status='active', account_type='admin')
-                db.session.add(new_admin)
-                db.session.commit()
-
-        create_admin()  # Call the function directly
-            
+    # schema and admin seeding run from the CLI (`flask db upgrade`, `flask bootstrap-admin`)
+    # so worker boot never touches the database
+    app.cli.add_command(bootstrap_admin)
+    app.cli.add_command(import_roster_command)
+    app.cli.add_command(sync_rosters_command)
+    app.cli.add_command(purge_deleted_programs_command)
+    app.cli.add_command(rebuild_feedback_aggregates_command)
+
     return app
@@ -9,12 +9,15 @@
  *
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from .models import User, ProgramDetails, db
 from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required, set_access_cookies, get_jwt
 from datetime import datetime, timedelta, timezone
-from . import db
+from . import db, slow_queries, password_hasher, response_cache, compressor, slot_events
+from .response_cache import program_tags
 from .user import get_user_data
+from .cascades import purge_program, soft_delete_program, purge_in_background
+from .slot_stream import record_program_event
 
 admin = Blueprint('admin', __name__)
 allowed_account_types = ["admin", "instructor", "student"]
@@ -252,9 +255,10 @@ def update_program(program_id):
     program.description = data.get('description', program.description)
     program.duration = data.get('duration', program.duration)
     db.session.commit()
+    response_cache.invalidate(*program_tags(program))
     return jsonify({"msg": "Program updated"}), 200
 
-# delete the program using its ID
+# delete the program using its ID, the same way /program/delete does
 @admin.route('/program/<int:program_id>', methods=['DELETE'])
 @jwt_required()
 def delete_program(program_id):
@@ -263,6 +267,88 @@ def delete_program(program_id):
         return jsonify({"msg": "Admin access required"}), 401
 
     program = ProgramDetails.query.get_or_404(program_id)
-    db.session.delete(program)
-    db.session.commit()
-    return jsonify({"msg": "Program deleted"}), 200
\ No newline at end of file
+    try:
+        # async hides the program immediately and purges its rows on a background thread
+        mode = request.args.get('mode', current_app.config.get('PROGRAM_DELETE_MODE', 'sync'))
+        tags = program_tags(program)
+        record_program_event(program, 'deleted')
+        if mode == 'async':
+            soft_delete_program(program)
+            response_cache.invalidate(*tags)
+            purge_in_background(program_id)
+            return jsonify({"msg": "Program deleted", "purge": "scheduled"}), 202
+
+        purge_program(program_id)
+        response_cache.invalidate(*tags)
+        return jsonify({"msg": "Program deleted"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+# fetch the rolling top-N slow queries with their EXPLAIN output
+@admin.route('/admin/slow-queries', methods=['GET'])
+@jwt_required()
+def get_slow_queries():
+    user_id = get_jwt_identity()
+    if not is_admin(user_id):
+        return jsonify({"msg": "Admin access required"}), 401
+
+    limit = request.args.get('limit', type=int)
+
+    # clear the recorded stats
+    if request.args.get('reset') == 'true':
+        slow_queries.reset()
+        return jsonify({"slow_queries": []}), 200
+
+    return jsonify({
+        "threshold_ms": slow_queries.threshold_ms,
+        "slow_queries": slow_queries.top(limit)
+    }), 200
+
+# fetch password hashing latency and pool settings
+@admin.route('/admin/metrics/password-hashing', methods=['GET'])
+@jwt_required()
+def get_password_hashing_metrics():
+    user_id = get_jwt_identity()
+    if not is_admin(user_id):
+        return jsonify({"msg": "Admin access required"}), 401
+
+    return jsonify(password_hasher.metrics()), 200
+
+# fetch response cache hit ratios for this worker
+@admin.route('/admin/metrics/response-cache', methods=['GET'])
+@jwt_required()
+def get_response_cache_metrics():
+    user_id = get_jwt_identity()
+    if not is_admin(user_id):
+        return jsonify({"msg": "Admin access required"}), 401
+
+    # clear the counters
+    if request.args.get('reset') == 'true':
+        response_cache.reset()
+
+    return jsonify(response_cache.metrics()), 200
+
+# fetch response compression ratios for this worker
+@admin.route('/admin/metrics/compression', methods=['GET'])
+@jwt_required()
+def get_compression_metrics():
+    user_id = get_jwt_identity()
+    if not is_admin(user_id):
+        return jsonify({"msg": "Admin access required"}), 401
+
+    # clear the counters
+    if request.args.get('reset') == 'true':
+        compressor.reset()
+
+    return jsonify(compressor.metrics()), 200
+
+# fetch the slot event broker's subscriber count and publish counter for this worker
+@admin.route('/admin/metrics/slot-events', methods=['GET'])
+@jwt_required()
+def get_slot_event_metrics():
+    user_id = get_jwt_identity()
+    if not is_admin(user_id):
+        return jsonify({"msg": "Admin access required"}), 401
+
+    return jsonify(slot_events.metrics()), 200
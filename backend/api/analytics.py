@@ -0,0 +1,230 @@
+"""
+ * analytics.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the booking utilization report. Slots in a date range are
+ * counted in SQL with one GROUP BY on day, program and hour over the
+ * appointment_date index, and the per-program, per-weekday and per-hour
+ * rollups are summed from those rows. Admins see every program and
+ * instructors the slots they host. The rows of days before today (PST)
+ * are kept per report scope and day in UtilizationDay for up to
+ * CACHE_TTL seconds, so dashboards polling it don't rescan history, while
+ * today and later are always counted live. Writes to a past day's slots
+ * (attendance, cancellations, availability toggles and deletes) drop that
+ * day's rows in their own transaction.
+ *
+ * Known Bugs:
+ * - students cancelling put the slot back to posted, so only cancellations
+ *   made by the host are counted
+ * - a report counting a day while a write drops it can store the old rows,
+ *   which then show until CACHE_TTL passes
+ *
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity, set_access_cookies, get_jwt, create_access_token
+from sqlalchemy import func, case, cast, Integer
+from sqlalchemy.exc import IntegrityError
+from .models import User, Appointment, Availability, ProgramDetails, UtilizationDay
+from . import db
+from .dashboard import dashboard_now
+
+analytics = Blueprint('analytics', __name__)
+
+# statuses of slots a student took, cancelled and no-show ones and slots nobody could book
+BOOKED_STATUSES = ['reserved', 'pending', 'completed', 'missed']
+CANCELLED_STATUSES = ['canceled']
+NO_SHOW_STATUSES = ['missed']
+CLOSED_STATUSES = ['inactive']
+
+DEFAULT_RANGE_DAYS = 28
+MAX_RANGE_DAYS = 366
+CACHE_TTL = 3600
+
+# token generator
+@analytics.after_request
+def refresh_expiring_jwts(response):
+    try:
+        exp_timestamp = get_jwt()["exp"]
+        now = datetime.now(timezone.utc)
+        target_timestamp = datetime.timestamp(now + timedelta(minutes=30))
+        if target_timestamp > exp_timestamp:
+            access_token = create_access_token(identity=get_jwt_identity())
+            set_access_cookies(response, access_token)
+        return response
+    except (RuntimeError, KeyError):
+        # Case where there is not a valid JWT. Just return the original response
+        return response
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# hour of a 'HH:MM' column
+def hour_column(column):
+    return cast(func.substr(column, 1, 2), Integer)
+
+def count_of(statuses):
+    return func.sum(case((Appointment.status.in_(statuses), 1), else_=0))
+
+# counts per (day, program, hour) of the slots in [date_from, date_to], hosted by host_id unless None
+def utilization_rows(date_from, date_to, host_id=None, program_id=None, course_id=None):
+    hour = hour_column(Appointment.start_time).label('hour')
+    query = db.session.query(
+        Appointment.appointment_date, Availability.program_id, hour,
+        func.count(Appointment.id), count_of(BOOKED_STATUSES), count_of(NO_SHOW_STATUSES),
+        count_of(CANCELLED_STATUSES), count_of(CLOSED_STATUSES)
+    ).join(Availability, Appointment.availability_id == Availability.id).filter(
+        Appointment.appointment_date.between(date_from, date_to)
+    )
+    if host_id is not None:
+        query = query.filter(Appointment.host_id == host_id)
+    if program_id is not None:
+        query = query.filter(Availability.program_id == program_id)
+    if course_id is not None:
+        query = query.join(ProgramDetails, Availability.program_id == ProgramDetails.id).filter(ProgramDetails.course_id == course_id)
+    return query.group_by(Appointment.appointment_date, Availability.program_id, hour).all()
+
+# {day: [[program_id, hour, slots, bookings, no_shows, cancellations, closed]]} of utilization_rows
+def rows_by_day(rows):
+    days = {}
+    for day, program_id, hour, *counts in rows:
+        days.setdefault(day, []).append([program_id, hour] + [int(count or 0) for count in counts])
+    return days
+
+# 'YYYY-MM-DD' days from date_from through date_to
+def days_between(date_from, date_to):
+    start = datetime.strptime(date_from, '%Y-%m-%d')
+    return [(start + timedelta(days=offset)).strftime('%Y-%m-%d')
+            for offset in range((datetime.strptime(date_to, '%Y-%m-%d') - start).days + 1)]
+
+# rows of days that are over, from UtilizationDay where stored and one query for the rest
+def closed_day_rows(days, scope, host_id, program_id, course_id):
+    if not days:
+        return {}
+    built_after = datetime.utcnow() - timedelta(seconds=CACHE_TTL)
+    stored = {day: json.loads(rows) for day, rows in db.session.query(UtilizationDay.day, UtilizationDay.rows).filter(
+        UtilizationDay.scope == scope, UtilizationDay.day.between(days[0], days[-1]), UtilizationDay.built_at > built_after)}
+    missing = [day for day in days if day not in stored]
+    if not missing:
+        return stored
+
+    fetched = rows_by_day(utilization_rows(missing[0], missing[-1], host_id, program_id, course_id))
+    for day in missing:
+        stored[day] = fetched.get(day, [])
+    try:
+        db.session.query(UtilizationDay).filter(UtilizationDay.scope == scope, UtilizationDay.day.in_(missing)).delete(
+            synchronize_session=False)
+        db.session.add_all([UtilizationDay(scope=scope, day=day, rows=json.dumps(stored[day])) for day in missing])
+        db.session.commit()
+    except IntegrityError:
+        # a concurrent report stored the same days first
+        db.session.rollback()
+    return stored
+
+# drop the stored rows of the days before today among days, in the caller's transaction
+def mark_days_stale(*days):
+    today = dashboard_now()[0]
+    past = {day for day in days if day and day < today}
+    if past:
+        db.session.query(UtilizationDay).filter(UtilizationDay.day.in_(past)).delete(synchronize_session=False)
+
+# sum the rows of every day into (program_id, weekday, hour, counts...) cells, Monday = 0
+def weekday_rows(days):
+    cells = {}
+    for day, rows in days.items():
+        weekday = datetime.strptime(day, '%Y-%m-%d').weekday()
+        for program_id, hour, *counts in rows:
+            totals = cells.setdefault((program_id, weekday, hour), [0] * len(counts))
+            for index, count in enumerate(counts):
+                totals[index] += count
+    return [(program_id, weekday, hour, *counts) for (program_id, weekday, hour), counts in cells.items()]
+
+def empty_counts():
+    return {"slots": 0, "bookings": 0, "no_shows": 0, "cancellations": 0, "closed": 0}
+
+# share of the slots open to book that a student took, None when none were open
+def with_fill_rate(counts):
+    offered = counts["slots"] - counts["closed"]
+    counts["fill_rate"] = round(counts["bookings"] / offered, 4) if offered else None
+    return counts
+
+# sum the grouped rows into the cells and the per-program, per-weekday and per-hour rollups
+def summarize(rows, program_names):
+    totals = empty_counts()
+    rollups = {"program_id": {}, "weekday": {}, "hour": {}}
+    cells = []
+    for program_id, weekday, hour, slots, bookings, no_shows, cancellations, closed in rows:
+        counts = {"slots": slots, "bookings": int(bookings or 0), "no_shows": int(no_shows or 0),
+                  "cancellations": int(cancellations or 0), "closed": int(closed or 0)}
+        cells.append({"program_id": program_id, "weekday": weekday, "hour": hour, **with_fill_rate(dict(counts))})
+        for field, value in (("program_id", program_id), ("weekday", weekday), ("hour", hour)):
+            group = rollups[field].setdefault(value, empty_counts())
+            for name, count in counts.items():
+                group[name] += count
+        for name, count in counts.items():
+            totals[name] += count
+
+    by_program = [{"program_id": program_id, "program_name": program_names.get(program_id), **with_fill_rate(counts)}
+                  for program_id, counts in sorted(rollups["program_id"].items(), key=lambda item: item[0] or 0)]
+    by_weekday = [{"weekday": weekday, **with_fill_rate(counts)} for weekday, counts in sorted(rollups["weekday"].items())]
+    by_hour = [{"hour": hour, **with_fill_rate(counts)} for hour, counts in sorted(rollups["hour"].items())]
+    cells.sort(key=lambda cell: (cell["program_id"] or 0, cell["weekday"], cell["hour"]))
+    return with_fill_rate(totals), by_program, by_weekday, by_hour, cells
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""               Endpoint Functions                ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# bookings, no-shows, cancellations and fill rate by program, weekday and hour
+# ?from=&to= bound the dates (the last four weeks by default), ?program_id= and ?course_id= narrow it down
+@analytics.route('/analytics/utilization', methods=['GET'])
+@jwt_required()
+def get_utilization():
+    try:
+        user_id = get_jwt_identity()
+        user = User.query.get(int(user_id))
+        if not user or user.account_type not in ('admin', 'instructor'):
+            return jsonify({"error": "Only instructors and admins can view utilization"}), 403
+
+        today = dashboard_now()[0]
+        date_from = request.args.get('from', (datetime.strptime(today, '%Y-%m-%d') - timedelta(days=DEFAULT_RANGE_DAYS)).strftime('%Y-%m-%d'))
+        date_to = request.args.get('to', today)
+        try:
+            start = datetime.strptime(date_from, '%Y-%m-%d')
+            end = datetime.strptime(date_to, '%Y-%m-%d')
+            program_id = int(request.args['program_id']) if request.args.get('program_id') else None
+            course_id = int(request.args['course_id']) if request.args.get('course_id') else None
+        except ValueError:
+            return jsonify({"error": "from and to must be 'YYYY-MM-DD', program_id and course_id numbers"}), 400
+        if end < start or (end - start).days >= MAX_RANGE_DAYS:
+            return jsonify({"error": f"'to' must be after 'from' and within {MAX_RANGE_DAYS} days"}), 400
+
+        # instructors only see the slots they host
+        host_id = user.id if user.account_type == 'instructor' else None
+
+        # days before today are stored until a write to their slots, today and later are counted on every request
+        closed_days = [day for day in days_between(date_from, date_to) if day < today]
+        days = closed_day_rows(closed_days, f"{host_id}:{program_id}:{course_id}", host_id, program_id, course_id)
+        if date_to >= today:
+            days.update(rows_by_day(utilization_rows(max(date_from, today), date_to, host_id, program_id, course_id)))
+        rows = weekday_rows(days)
+
+        program_ids = {row[0] for row in rows if row[0] is not None}
+        program_names = dict(db.session.query(ProgramDetails.id, ProgramDetails.name).filter(
+            ProgramDetails.id.in_(program_ids))) if program_ids else {}
+        totals, by_program, by_weekday, by_hour, cells = summarize(rows, program_names)
+
+        return jsonify({
+            "from": date_from,
+            "to": date_to,
+            "totals": totals,
+            "by_program": by_program,
+            "by_weekday": by_weekday,
+            "by_hour": by_hour,
+            "cells": cells
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -12,9 +12,8 @@
 
 from flask import Blueprint, request, jsonify
 from .models import User
-from werkzeug.security import generate_password_hash, check_password_hash
-from . import db
-from email_validator import EmailNotValidError, validate_email
+from . import db, password_hasher
+from .passwords import HashingPoolSaturated
 from flask_jwt_extended import create_access_token, unset_jwt_cookies, \
     get_jwt_identity, jwt_required, set_access_cookies, get_jwt
 from datetime import datetime, timedelta, timezone
@@ -41,11 +40,17 @@ def refresh_expiring_jwts(response):
 
 # add a new user tuple to the User Table
 def create_account(email, name, account_type, status, password):
-    new_user = User(email=email, name=name, account_type=account_type, status=status, password=generate_password_hash(password, method='scrypt', salt_length=2))
+    new_user = User(email=email, name=name, account_type=account_type, status=status, password=password_hasher.hash_password(password))
     db.session.add(new_user)
     db.session.commit()
     return new_user.id
 
+# response returned when the hashing pool has no room for another request
+def hashing_unavailable(e):
+    response = jsonify({"error": "Server is busy, try again shortly"})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 ""               Endpoint Functions                ""
 """""""""""""""""""""""""""""""""""""""""""""""""""""
@@ -60,6 +65,9 @@ def sign_up():
     password2 = data.get('verifyPassword')
     user_type = data.get('userType') # "student" or "instructor"
     user_type = (str(user_type)).lower()
+
+    # imported on first use to keep email_validator out of worker startup
+    from email_validator import EmailNotValidError, validate_email
     
     # check if all the fields are provided
     required_fields = [email, name, password1, password2, user_type]
@@ -92,12 +100,18 @@ def sign_up():
         else:
             # Create student account
             status = "active"  # Student accounts are automatically active 
-            user_id = create_account(email, name, 'student', status, password1)
+            try:
+                user_id = create_account(email, name, 'student', status, password1)
+            except HashingPoolSaturated as e:
+                return hashing_unavailable(e)
             response = {"message": "Student account created successfully", "user_id": user_id}
             return jsonify(response), 201
     else:
         # Create instructor
-        user_id = create_account(email, name, 'instructor', 'pending', password1)
+        try:
+            user_id = create_account(email, name, 'instructor', 'pending', password1)
+        except HashingPoolSaturated as e:
+            return hashing_unavailable(e)
         response = {"message": "instructor account created successfully", "user_id": user_id}
         return jsonify(response), 201
 
@@ -108,6 +122,9 @@ def login():
     data = request.get_json()
     email = data.get('email')
     password = data.get('password')
+
+    # imported on first use to keep email_validator out of worker startup
+    from email_validator import EmailNotValidError, validate_email
     
     # Validate email address
     try:
@@ -118,7 +135,17 @@ def login():
     
     user = User.query.filter_by(email=email).first()
     if user:
-        if check_password_hash(user.password, password):
+        try:
+            password_matches = password_hasher.check_password(user.password, password)
+
+            # upgrade hashes stored with outdated parameters while the plaintext is at hand
+            if password_matches and password_hasher.needs_rehash(user.password):
+                user.password = password_hasher.hash_password(password)
+                db.session.commit()
+        except HashingPoolSaturated as e:
+            return hashing_unavailable(e)
+
+        if password_matches:
             access_token = create_access_token(identity=user.id)
             response = jsonify({"msg": "login successful"})
             set_access_cookies(response, access_token)
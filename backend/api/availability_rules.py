@@ -0,0 +1,149 @@
+"""
+ * availability_rules.py
+ * Last Edited: 10/18/26
+ *
+ * Contains functions used to turn AvailabilityRule rows into concrete
+ * Availability and Appointment rows. Rules are only materialized for the
+ * date range being viewed or booked, and each rule remembers how far it
+ * has been materialized so repeat views don't re-check the table.
+ * (rule_id, date) is unique, so when two requests materialize the same
+ * rule at once the second one skips the dates the first one inserted.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from .models import Availability, AvailabilityRule, Appointment, ProgramDetails
+from . import db
+from .recurrence import expand_rule, split_into_slots
+
+# how far ahead rules are materialized when a caller gives no window
+DEFAULT_HORIZON_DAYS = 14
+
+# statuses a rule can be given, only active rules are materialized
+RULE_STATUSES = ['active', 'inactive']
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# create the Availability and Appointment rows of one rule from today through window_to
+# rows are always materialized contiguously from today, so materialized_through marks everything before it as done
+def materialize_rule(rule, program, window_to):
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    # already materialized for this version
+    if rule.materialized_through and rule.materialized_through >= window_to:
+        return 0
+
+    window_from = max(today, rule.materialized_through or today)
+    windows = expand_rule(rule, window_from, window_to)
+    if not windows:
+        rule.materialized_through = max(rule.materialized_through or '', window_to)
+        return 0
+
+    existing_dates = {date for (date,) in db.session.query(Availability.date).filter(
+        Availability.rule_id == rule.id,
+        Availability.date.between(windows[0]['date'], windows[-1]['date'])
+    )}
+
+    created = 0
+    for window in windows:
+        if window['date'] in existing_dates:
+            continue
+
+        new_availability = Availability(
+            user_id=rule.user_id,
+            program_id=rule.program_id,
+            date=window['date'],
+            start_time=window['start_time'],
+            end_time=window['end_time'],
+            status='active',
+            rule_id=rule.id
+        )
+        try:
+            with db.session.begin_nested():
+                db.session.add(new_availability)
+        except IntegrityError:
+            # another request materialized this date first
+            continue
+
+        # dropins don't have bookable appointments
+        if not program.isDropins:
+            for start_time, end_time in split_into_slots(window['start_time'], window['end_time'], program.duration):
+                db.session.add(Appointment(
+                    host_id=rule.user_id,
+                    appointment_date=window['date'],
+                    start_time=start_time,
+                    end_time=end_time,
+                    status="posted",
+                    physical_location=program.physical_location,
+                    meeting_url=program.meeting_url,
+                    availability_id=new_availability.id
+                ))
+        created += 1
+
+    rule.materialized_through = max(rule.materialized_through or '', window_to)
+    return created
+
+# materialize every active rule of a program for a window, committing if anything changed
+def materialize_program_rules(program_id, window_from=None, window_to=None):
+    return materialize_rules_for_programs([program_id], window_from, window_to)
+
+# same as materialize_program_rules for many programs, with one query for their rules
+def materialize_rules_for_programs(program_ids, window_from=None, window_to=None):
+    window_from = window_from or datetime.now().strftime('%Y-%m-%d')
+    window_to = window_to or (datetime.now() + timedelta(days=DEFAULT_HORIZON_DAYS)).strftime('%Y-%m-%d')
+
+    if not program_ids:
+        return 0
+
+    rules = AvailabilityRule.query.filter(
+        AvailabilityRule.program_id.in_(program_ids),
+        AvailabilityRule.status == 'active',
+        AvailabilityRule.start_date <= window_to,
+        (AvailabilityRule.until_date == None) | (AvailabilityRule.until_date >= window_from),
+        (AvailabilityRule.materialized_through == None) | (AvailabilityRule.materialized_through < window_to)
+    ).all()
+
+    if not rules:
+        return 0
+
+    programs = {program.id: program for program in ProgramDetails.query.filter(
+        ProgramDetails.id.in_({rule.program_id for rule in rules})
+    )}
+    created = 0
+    try:
+        for rule in rules:
+            created += materialize_rule(rule, programs[rule.program_id], window_to)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return created
+
+# drop a rule's future materialized rows that nobody has booked, so an edited rule re-expands
+def clear_unbooked_future(rule):
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    booked = select(Appointment.availability_id).where(Appointment.status.in_(['reserved', 'pending']),
+                                                      Appointment.availability_id.isnot(None))
+    stale = select(Availability.id).where(
+        Availability.rule_id == rule.id,
+        Availability.date >= today,
+        Availability.id.notin_(booked)
+    )
+    stale_ids = [availability_id for (availability_id,) in db.session.execute(stale)]
+
+    if stale_ids:
+        db.session.execute(delete(Appointment).where(Appointment.availability_id.in_(stale_ids))
+                           .execution_options(synchronize_session=False))
+        db.session.execute(delete(Availability).where(Availability.id.in_(stale_ids))
+                           .execution_options(synchronize_session=False))
+
+    rule.materialized_through = None
+    return len(stale_ids)
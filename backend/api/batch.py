@@ -0,0 +1,155 @@
+"""
+ * batch.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the /batch endpoint used to bootstrap a page with one round
+ * trip. Each GET sub-request is dispatched through the app with the
+ * caller's cookies and keeps its own status code. Run in order (the
+ * default) every sub-request shares the batch's application context, so
+ * they use one DB session and connection and the caller's User row is
+ * loaded once and then served from the session's identity map. With
+ * "parallel": true they run on a small thread pool, each thread with its
+ * own session.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token, set_access_cookies, get_jwt
+from werkzeug.test import EnvironBuilder
+from sqlalchemy import event
+from datetime import datetime, timedelta, timezone
+from . import db
+
+batch = Blueprint('batch', __name__)
+
+DEFAULT_MAX_REQUESTS = 20
+DEFAULT_WORKERS = 4
+
+# request headers passed on to every sub-request
+FORWARDED_HEADERS = ['Cookie', 'Authorization', 'Accept-Language']
+
+executor = None
+executor_lock = threading.Lock()
+
+# token generator
+@batch.after_request
+def refresh_expiring_jwts(response):
+    try:
+        exp_timestamp = get_jwt()["exp"]
+        now = datetime.now(timezone.utc)
+        target_timestamp = datetime.timestamp(now + timedelta(minutes=30))
+        if target_timestamp > exp_timestamp:
+            access_token = create_access_token(identity=get_jwt_identity())
+            set_access_cookies(response, access_token)
+        return response
+    except (RuntimeError, KeyError):
+        # Case where there is not a valid JWT. Just return the original response
+        return response
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# shared pool for parallel batches, sized by BATCH_WORKERS
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=int(current_app.config.get('BATCH_WORKERS') or DEFAULT_WORKERS), thread_name_prefix='batch')
+        return executor
+
+# [{"id", "path"}] from a list of paths or {"id", "path"} objects, raising ValueError when malformed
+def parse_subrequests(entries, maximum):
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("provide a non-empty 'requests' list")
+    if len(entries) > maximum:
+        raise ValueError(f"a batch can hold at most {maximum} requests")
+
+    subrequests = []
+    for index, entry in enumerate(entries):
+        if isinstance(entry, str):
+            entry = {'path': entry}
+        if not isinstance(entry, dict) or not isinstance(entry.get('path'), str):
+            raise ValueError(f"request {index} must be a path or an object with a 'path'")
+        if entry.get('method', 'GET').upper() != 'GET':
+            raise ValueError(f"request {index}: only GET requests can be batched")
+
+        parts = urlsplit(entry['path'])
+        if parts.scheme or parts.netloc or not parts.path.startswith('/') or parts.path.rstrip('/') == '/batch':
+            raise ValueError(f"request {index}: path must be an internal path other than /batch")
+        subrequests.append({'id': entry.get('id', index), 'path': parts.path, 'query_string': parts.query})
+    return subrequests
+
+# WSGI environ of a sub-request carrying the caller's headers
+def subrequest_environ(subrequest, headers):
+    return EnvironBuilder(path=subrequest['path'], query_string=subrequest['query_string'], method='GET',
+                          headers=headers, base_url=request.host_url).get_environ()
+
+# dispatch one sub-request in the current application context
+def dispatch(app, subrequest, environ):
+    result = {'id': subrequest['id'], 'path': subrequest['path'] + ('?' + subrequest['query_string'] if subrequest['query_string'] else '')}
+    try:
+        with app.request_context(environ):
+            response = app.full_dispatch_request()
+            try:
+                # event streams never end, everything else is read whole
+                if response.mimetype == 'text/event-stream':
+                    return dict(result, status=400, body={"error": "event streams can't be batched"})
+                result['status'] = response.status_code
+                result['body'] = response.get_json(silent=True) if response.is_json else response.get_data(as_text=True)
+            finally:
+                response.close()
+    except Exception as e:
+        db.session.rollback()
+        result.update(status=500, body={"error": str(e)})
+    return result
+
+# dispatch one sub-request on a pool thread, inside its own application context
+def dispatch_in_thread(app, subrequest, environ):
+    with app.app_context():
+        return dispatch(app, subrequest, environ)
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""               Endpoint Functions                ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# run a list of GET requests in one round trip
+# body: {"requests": ["/profile", {"id": "courses", "path": "/user/courses"}], "parallel": false}
+@batch.route('/batch', methods=['POST'])
+@jwt_required()
+def run_batch():
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            subrequests = parse_subrequests(data.get('requests'), int(current_app.config.get('BATCH_MAX_REQUESTS') or DEFAULT_MAX_REQUESTS))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        headers = [(name, request.headers[name]) for name in FORWARDED_HEADERS if name in request.headers]
+        environs = [subrequest_environ(subrequest, headers) for subrequest in subrequests]
+        app = current_app._get_current_object()
+
+        if data.get('parallel') and len(subrequests) > 1:
+            futures = [get_executor().submit(dispatch_in_thread, app, subrequest, environ)
+                       for subrequest, environ in zip(subrequests, environs)]
+            results = [future.result() for future in futures]
+        else:
+            # the identity map only holds weak references, keep every row loaded during the
+            # batch alive so later lookups by primary key (the caller's User row) skip the DB
+            session, loaded = db.session(), []
+            retain = lambda session, instance: loaded.append(instance)
+            event.listen(session, 'loaded_as_persistent', retain)
+            try:
+                results = [dispatch(app, subrequest, environ) for subrequest, environ in zip(subrequests, environs)]
+            finally:
+                event.remove(session, 'loaded_as_persistent', retain)
+
+        return jsonify({"responses": results}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
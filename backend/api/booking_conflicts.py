@@ -0,0 +1,133 @@
+"""
+ * booking_conflicts.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the double-booking checks for students. A reservation is
+ * compared with the student's reserved and pending appointments on the
+ * same date and, optionally, their weekly course meetings, all in a single
+ * indexed query. IntervalIndex does the same check in memory when many
+ * slots are tested for one student at once.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, union_all, literal, and_, String
+from .models import Appointment, Availability, ProgramDetails, CourseDetails, CourseMembers, CourseTimes
+from . import db
+from .recurrence import DAY_NAMES
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# sorted, per-date intervals of one student for testing many slots without a query each
+class IntervalIndex:
+    def __init__(self):
+        self.by_date = {}
+
+    # start and end are 'HH:MM' strings, which sort the same as the times they hold
+    def add(self, date, start_time, end_time, conflict):
+        insort(self.by_date.setdefault(date, []), (start_time, end_time, id(conflict), conflict))
+
+    # first interval overlapping [start_time, end_time) on date, or None
+    def find_overlap(self, date, start_time, end_time):
+        intervals = self.by_date.get(date, [])
+        # intervals starting at or after end_time can't overlap, everything before may
+        for interval_start, interval_end, _, conflict in intervals[:bisect_left(intervals, (end_time,))]:
+            if interval_end > start_time:
+                return conflict
+        return None
+
+    # load a student's booked appointments and course meetings for the dates in [date_from, date_to] in one query
+    @classmethod
+    def for_student(cls, student_id, date_from, date_to, include_course_times=True):
+        index = cls()
+        course_times = []
+        for conflict in query_conflicts(student_id, date_from=date_from, date_to=date_to,
+                                        include_course_times=include_course_times):
+            if conflict['kind'] == 'appointment':
+                index.add(conflict['date'], conflict['start_time'], conflict['end_time'], conflict)
+            else:
+                course_times.append(conflict)
+
+        # weekly course meetings land on every matching weekday of the window
+        current = datetime.strptime(date_from, '%Y-%m-%d').date()
+        last = datetime.strptime(date_to, '%Y-%m-%d').date()
+        while current <= last:
+            date = current.strftime('%Y-%m-%d')
+            for conflict in course_times:
+                if conflict['day'] == DAY_NAMES[current.weekday()]:
+                    index.add(date, conflict['start_time'], conflict['end_time'], dict(conflict, date=date))
+            current += timedelta(days=1)
+        return index
+
+# whether course meetings count as conflicts (BOOKING_CONFLICT_COURSE_TIMES, on by default)
+def course_times_checked():
+    value = current_app.config.get('BOOKING_CONFLICT_COURSE_TIMES', 'true')
+    return str(value).lower() not in ('0', 'false', 'no')
+
+# one UNION ALL statement over the student's booked appointments and course meetings
+# with date given only rows overlapping [start_time, end_time) on that date are returned
+def query_conflicts(student_id, date=None, start_time=None, end_time=None, exclude_id=None,
+                    date_from=None, date_to=None, include_course_times=True):
+    # the (attendee_id, appointment_date) index serves this half
+    appointment_filters = [
+        Appointment.attendee_id == student_id,
+        Appointment.status.in_(['reserved', 'pending'])
+    ]
+    if date:
+        appointment_filters += [Appointment.appointment_date == date,
+                                Appointment.start_time < end_time, Appointment.end_time > start_time]
+    else:
+        appointment_filters.append(Appointment.appointment_date.between(date_from, date_to))
+    if exclude_id is not None:
+        appointment_filters.append(Appointment.id != exclude_id)
+
+    statement = select(
+        literal('appointment').label('kind'), Appointment.id.label('id'), ProgramDetails.name.label('name'),
+        Appointment.appointment_date.label('date'), literal(None, String).label('day'),
+        Appointment.start_time.label('start_time'), Appointment.end_time.label('end_time'),
+        Appointment.status.label('status')
+    ).select_from(Appointment).outerjoin(
+        Availability, Appointment.availability_id == Availability.id
+    ).outerjoin(ProgramDetails, Availability.program_id == ProgramDetails.id).where(and_(*appointment_filters))
+
+    if include_course_times:
+        course_filters = [CourseMembers.user_id == student_id]
+        if date:
+            course_filters += [CourseTimes.day == DAY_NAMES[datetime.strptime(date, '%Y-%m-%d').weekday()],
+                               CourseTimes.start_time < end_time, CourseTimes.end_time > start_time]
+
+        statement = union_all(statement, select(
+            literal('course').label('kind'), CourseTimes.id.label('id'), CourseDetails.name.label('name'),
+            literal(date, String).label('date'), CourseTimes.day.label('day'),
+            CourseTimes.start_time.label('start_time'), CourseTimes.end_time.label('end_time'),
+            literal(None, String).label('status')
+        ).select_from(CourseTimes).join(
+            CourseDetails, CourseTimes.course_id == CourseDetails.id
+        ).join(CourseMembers, CourseMembers.course_id == CourseDetails.id).where(and_(*course_filters)))
+
+    return [dict(row._mapping) for row in db.session.execute(statement)]
+
+# first booking or course meeting of the student overlapping the appointment, or None
+def find_student_conflict(student_id, appointment, include_course_times=None):
+    if include_course_times is None:
+        include_course_times = course_times_checked()
+    conflicts = query_conflicts(student_id, appointment.appointment_date, appointment.start_time,
+                                appointment.end_time, exclude_id=appointment.id,
+                                include_course_times=include_course_times)
+    # report the earliest overlapping interval
+    return min(conflicts, key=lambda conflict: (conflict['start_time'], conflict['kind'])) if conflicts else None
+
+# human readable explanation of a conflict returned by find_student_conflict
+def describe_conflict(conflict):
+    times = f"from {conflict['start_time']} to {conflict['end_time']}"
+    if conflict['kind'] == 'course':
+        return f"Overlaps your {conflict['name']} class meeting on {conflict['day']}s {times}"
+    program = f" for {conflict['name']}" if conflict['name'] else ''
+    return f"Overlaps your {conflict['status']} appointment{program} on {conflict['date']} {times}"
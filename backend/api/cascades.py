@@ -0,0 +1,105 @@
+"""
+ * cascades.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the set-based deletes for programs and availabilities. Rows are
+ * removed with DELETE ... WHERE ... IN (SELECT ...) statements in
+ * dependency order (comments and feedback, appointments, availabilities,
+ * rules and times, then the program), a chunk of ids at a time, taking the
+ * deleted feedback out of the rating aggregates first. Programs
+ * can also be soft-deleted right away and purged on a background thread.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, select
+from .models import Appointment, AppointmentComment, Feedback, Availability, AvailabilityRule, ProgramDetails, ProgramTimes
+from . import db
+from .dashboard import mark_stale, program_row_audience
+from .feedback_aggregates import subtract_feedback
+from .analytics import mark_days_stale
+
+# availabilities deleted per statement, keeps IN lists and transactions bounded
+DEFAULT_CHUNK_SIZE = 1000
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+def chunk_size():
+    return int(current_app.config.get('PURGE_CHUNK_SIZE') or DEFAULT_CHUNK_SIZE)
+
+def chunks(ids, size):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+def bulk_delete(statement):
+    return db.session.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+# delete availabilities with their appointments, comments and feedback, returning the availabilities removed
+# commit_each commits after every chunk so a long purge never holds one big transaction
+def delete_availabilities(availability_ids, commit_each=False, size=None):
+    deleted = 0
+    for chunk in chunks(list(availability_ids), size or chunk_size()):
+        appointments = select(Appointment.id).where(Appointment.availability_id.in_(chunk))
+        mark_days_stale(*[day for (day,) in db.session.execute(
+            select(Appointment.appointment_date).where(Appointment.availability_id.in_(chunk)).distinct())])
+        bulk_delete(delete(AppointmentComment).where(AppointmentComment.appointment_id.in_(appointments)))
+        subtract_feedback(Appointment.availability_id.in_(chunk))
+        bulk_delete(delete(Feedback).where(Feedback.appointment_id.in_(appointments)))
+        bulk_delete(delete(Appointment).where(Appointment.availability_id.in_(chunk)))
+        deleted += bulk_delete(delete(Availability).where(Availability.id.in_(chunk)))
+        if commit_each:
+            db.session.commit()
+    return deleted
+
+# delete a program and everything hanging off it, then commit
+# the dashboards listing it are marked stale once its rows are gone
+def purge_program(program_id, commit_each=False, size=None):
+    audience = program_row_audience(db.session.get(ProgramDetails, program_id))
+    availability_ids = [availability_id for (availability_id,) in db.session.execute(
+        select(Availability.id).where(Availability.program_id == program_id))]
+    deleted = delete_availabilities(availability_ids, commit_each, size)
+
+    bulk_delete(delete(AvailabilityRule).where(AvailabilityRule.program_id == program_id))
+    bulk_delete(delete(ProgramTimes).where(ProgramTimes.program_id == program_id))
+    bulk_delete(delete(ProgramDetails).where(ProgramDetails.id == program_id))
+    mark_stale(audience)
+    db.session.commit()
+    return deleted
+
+# hide a program from every listing and from booking, leaving its rows for the purge
+def soft_delete_program(program):
+    program.deleted_at = datetime.utcnow()
+    mark_stale(program_row_audience(program))
+    db.session.commit()
+
+def run_purge(app, program_id):
+    with app.app_context():
+        try:
+            purge_program(program_id, commit_each=True)
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("purge of program %s failed, `flask purge-deleted-programs` will retry it", program_id)
+        finally:
+            db.session.remove()
+
+# purge a soft-deleted program on a daemon thread
+def purge_in_background(program_id):
+    thread = threading.Thread(target=run_purge, args=(current_app._get_current_object(), program_id),
+                              name=f"purge-program-{program_id}", daemon=True)
+    thread.start()
+    return thread
+
+# purge every soft-deleted program, for purges interrupted by a restart
+def purge_deleted_programs():
+    program_ids = [program_id for (program_id,) in db.session.execute(
+        select(ProgramDetails.id).where(ProgramDetails.deleted_at.isnot(None)))]
+    for program_id in program_ids:
+        purge_program(program_id, commit_each=True)
+    return program_ids
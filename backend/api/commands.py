@@ -0,0 +1,122 @@
+"""
+ * commands.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the flask CLI commands used to prepare a deployment.
+ * Schema changes are applied with `flask db upgrade` (Flask-Migrate),
+ * and the default admin account is seeded with `flask bootstrap-admin`.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+import os
+import click
+from flask.cli import with_appcontext
+from . import db, password_hasher
+from .models import User, CourseDetails
+from .roster import parse_roster, import_roster, RosterFormatError
+from .roster_sync import get_roster_source, sync_course, sync_all_courses, RosterSourceError
+from .cascades import purge_deleted_programs
+from .feedback_aggregates import rebuild_feedback_aggregates
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""                  CLI Commands                   ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# create the admin user from ADMIN_NAME, ADMIN_EMAIL and ADMIN_PASSWORD if it doesn't exist
+@click.command('bootstrap-admin')
+@with_appcontext
+def bootstrap_admin():
+    admin = User.query.filter_by(name='admin', account_type='admin').first()
+    if admin:
+        click.echo("Admin user already exists")
+        return
+
+    name = os.environ.get('ADMIN_NAME')
+    email = os.environ.get('ADMIN_EMAIL')
+    password = os.environ.get('ADMIN_PASSWORD')
+
+    if not all([name, email, password]):
+        raise click.ClickException("ADMIN_NAME, ADMIN_EMAIL and ADMIN_PASSWORD must be set")
+
+    # Create the admin user with default values
+    new_admin = User(name=name, email=email,
+                     password=password_hasher.generate_inline(password),
+                     status='active', account_type='admin')
+    db.session.add(new_admin)
+    db.session.commit()
+    click.echo(f"Admin user '{email}' created")
+
+# bulk import a CSV or JSON roster file into a course
+@click.command('import-roster')
+@click.argument('course_id', type=int)
+@click.argument('roster_file', type=click.File('rb'))
+@click.option('--dry-run', is_flag=True, help="Report the changes without writing them.")
+@with_appcontext
+def import_roster_command(course_id, roster_file, dry_run):
+    if not CourseDetails.query.get(course_id):
+        raise click.ClickException(f"Course {course_id} not found")
+
+    content_format = 'csv' if roster_file.name.lower().endswith('.csv') else 'json'
+    try:
+        rows = parse_roster(roster_file.read(), content_format)
+    except RosterFormatError as e:
+        raise click.ClickException(str(e))
+
+    result = import_roster(course_id, rows, dry_run)
+    for entry in result['rows']:
+        if entry['status'] == 'error':
+            click.echo(f"row {entry['row']}: {entry['email']} error: {entry['error']}")
+        else:
+            line = f"row {entry['row']}: {entry['email']} user {entry['user']}, membership {entry['membership']}"
+            if entry.get('temporary_password'):
+                line += f", temporary password {entry['temporary_password']}"
+            click.echo(line)
+
+    summary = result['summary']
+    click.echo(f"{summary['users_created']} users created, {summary['memberships_added']} memberships added, "
+               f"{summary['unchanged']} unchanged, {summary['errors']} errors" + (" (dry run)" if dry_run else ""))
+
+# pull roster changes for one or every course from ROSTER_SOURCE_URL (run hourly from cron)
+@click.command('sync-rosters')
+@click.option('--course-id', type=int, help="Sync a single course instead of every course.")
+@click.option('--source', help="Roster source URL or JSON file, overrides ROSTER_SOURCE_URL.")
+@with_appcontext
+def sync_rosters_command(course_id, source):
+    try:
+        roster_source = get_roster_source(source)
+    except RosterSourceError as e:
+        raise click.ClickException(str(e))
+
+    if course_id:
+        course = CourseDetails.query.get(course_id)
+        if not course:
+            raise click.ClickException(f"Course {course_id} not found")
+        results = [sync_course(course, roster_source)]
+    else:
+        results = sync_all_courses(roster_source)
+
+    for result in results:
+        if result.get('error'):
+            click.echo(f"course {result['course_id']}: error: {result['error']}")
+        elif result['not_modified']:
+            click.echo(f"course {result['course_id']}: not modified")
+        else:
+            click.echo(f"course {result['course_id']}: {result['added']} added, {result['dropped']} dropped, "
+                       f"{len(result['errors'])} errors")
+
+# finish purging programs that were soft-deleted but whose background purge didn't complete
+@click.command('purge-deleted-programs')
+@with_appcontext
+def purge_deleted_programs_command():
+    program_ids = purge_deleted_programs()
+    click.echo(f"{len(program_ids)} programs purged")
+
+# recompute the per host and per program feedback aggregates, for backfill or after manual edits to Feedback
+@click.command('rebuild-feedback-aggregates')
+@with_appcontext
+def rebuild_feedback_aggregates_command():
+    count = rebuild_feedback_aggregates()
+    click.echo(f"{count} feedback aggregates rebuilt")
@@ -0,0 +1,168 @@
+"""
+ * compression.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the response compression applied after every request. The
+ * encoding is negotiated from Accept-Encoding: brotli when the optional
+ * brotli package is installed and the client accepts it, otherwise gzip.
+ * Bodies under COMPRESS_MIN_SIZE bytes are sent as they are, and
+ * generator (streamed) responses are compressed chunk by chunk with a
+ * flush after each one so every chunk reaches the client right away.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+import gzip
+import os
+import threading
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = [
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/csv',
+    'text/plain',
+    'text/calendar',
+    'text/event-stream',
+]
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# encodings this process can produce, in server preference order
+def available_encodings(preference):
+    return [encoding for encoding in preference if encoding == 'gzip' or (encoding == 'br' and brotli is not None)]
+
+# best encoding accepted by the client: highest q-value, ties go to the server preference
+def negotiate_encoding(accept_encodings, encodings):
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress_body(data, encoding, gzip_level, brotli_level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_level)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+# compress an iterable of chunks, flushing after each chunk
+def compress_stream(chunks, encoding, gzip_level, brotli_level):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_level)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        # wbits 31 writes the gzip header and trailer
+        compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+        compress, flush, finish = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compress(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+class ResponseCompressor:
+    def __init__(self, app=None):
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_level = 4
+        self.encodings = ['br', 'gzip']
+        self.mimetypes = COMPRESSIBLE_MIMETYPES
+        self.lock = threading.Lock()
+        self.reset()
+        if app is not None:
+            self.init_app(app)
+
+    # read the configuration and register the after_request hook
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_ENABLED', os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true')
+        app.config.setdefault('COMPRESS_MIN_SIZE', int(os.environ.get('COMPRESS_MIN_SIZE', 1024)))
+        app.config.setdefault('COMPRESS_GZIP_LEVEL', int(os.environ.get('COMPRESS_GZIP_LEVEL', 6)))
+        app.config.setdefault('COMPRESS_BROTLI_LEVEL', int(os.environ.get('COMPRESS_BROTLI_LEVEL', 4)))
+        app.config.setdefault('COMPRESS_ENCODINGS', os.environ.get('COMPRESS_ENCODINGS', 'br,gzip'))
+        self.min_size = app.config['COMPRESS_MIN_SIZE']
+        self.gzip_level = app.config['COMPRESS_GZIP_LEVEL']
+        self.brotli_level = app.config['COMPRESS_BROTLI_LEVEL']
+        self.encodings = available_encodings([encoding.strip() for encoding in app.config['COMPRESS_ENCODINGS'].split(',')])
+        self.reset()
+        app.extensions['compression'] = self
+
+        if app.config['COMPRESS_ENABLED']:
+            app.after_request(self.compress)
+
+    # pick the response's encoding, None when it should go out as it is
+    def choose_encoding(self, response):
+        if response.mimetype not in self.mimetypes or response.status_code < 200 or response.status_code in (204, 304):
+            return None
+        if 'Content-Encoding' in response.headers or 'Content-Range' in response.headers or response.direct_passthrough:
+            return None
+        return negotiate_encoding(request.accept_encodings, self.encodings)
+
+    def compress(self, response):
+        if response.mimetype in self.mimetypes:
+            response.vary.add('Accept-Encoding')
+
+        encoding = self.choose_encoding(response)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding, self.gzip_level, self.brotli_level)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = encoding
+            self.record(encoding, None, None)
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size or request.method == 'HEAD':
+            return response
+
+        compressed = compress_body(data, encoding, self.gzip_level, self.brotli_level)
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        self.record(encoding, len(data), len(compressed))
+        return response
+
+    # per-encoding response and byte counts, streamed responses only count as responses
+    def record(self, encoding, original, compressed):
+        with self.lock:
+            stats = self.stats.setdefault(encoding, {'responses': 0, 'bytes_in': 0, 'bytes_out': 0})
+            stats['responses'] += 1
+            if original is not None:
+                stats['bytes_in'] += original
+                stats['bytes_out'] += compressed
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+
+    def metrics(self):
+        with self.lock:
+            return {
+                'encodings': self.encodings,
+                'min_size': self.min_size,
+                'stats': {encoding: dict(stats, ratio=round(stats['bytes_out'] / stats['bytes_in'], 4) if stats['bytes_in'] else None)
+                          for encoding, stats in self.stats.items()},
+            }
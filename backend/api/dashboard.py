@@ -0,0 +1,241 @@
+"""
+ * dashboard.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the dashboard read model. Every user has one DashboardView row
+ * holding their upcoming appointments (with host, attendee, program and
+ * course names already joined) and their next drop-in office hours, so
+ * /dashboard is a single primary-key read. The write endpoints keep it
+ * current: appointment changes rebuild the host's and attendee's rows
+ * right after they commit, while program and availability changes, which
+ * can reach a whole course, mark the affected rows stale so each one is
+ * rebuilt on its next read. Rows are also rebuilt once the day changes,
+ * and entries whose time has passed are dropped when the row is served.
+ *
+ * Known Bugs:
+ * - course renames and profile name changes only reach other users'
+ *   dashboards on their next rebuild (at the latest the next day)
+ *
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, set_access_cookies, get_jwt, create_access_token
+from sqlalchemy import or_, and_, select, update
+from sqlalchemy.orm import aliased
+from .models import User, Appointment, Availability, ProgramDetails, CourseDetails, CourseMembers, DashboardView
+from . import db
+
+logger = logging.getLogger(__name__)
+
+dashboard = Blueprint('dashboard', __name__)
+
+# appointment statuses listed as upcoming
+UPCOMING_STATUSES = ['reserved', 'pending']
+
+# drop-in windows kept per user
+OFFICE_HOURS_LIMIT = 5
+
+# token generator
+@dashboard.after_request
+def refresh_expiring_jwts(response):
+    try:
+        exp_timestamp = get_jwt()["exp"]
+        now = datetime.now(timezone.utc)
+        target_timestamp = datetime.timestamp(now + timedelta(minutes=30))
+        if target_timestamp > exp_timestamp:
+            access_token = create_access_token(identity=get_jwt_identity())
+            set_access_cookies(response, access_token)
+        return response
+    except (RuntimeError, KeyError):
+        # Case where there is not a valid JWT. Just return the original response
+        return response
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# current PST date and time as ("YYYY-MM-DD", "HH:MM")
+def dashboard_now():
+    current_time_pst = datetime.now(timezone.utc) - timedelta(hours=8)
+    return current_time_pst.strftime('%Y-%m-%d'), current_time_pst.strftime('%H:%M')
+
+# reserved and pending appointments the user hosts or attends from today on, names joined in one query
+def upcoming_appointments(user_id, today):
+    host, attendee = aliased(User), aliased(User)
+    rows = db.session.query(
+        Appointment.id, Appointment.host_id, Appointment.attendee_id, Appointment.appointment_date,
+        Appointment.start_time, Appointment.end_time, Appointment.status, Appointment.physical_location,
+        Appointment.meeting_url, ProgramDetails.id, ProgramDetails.name, Appointment.course_id, CourseDetails.name,
+        host.name, attendee.name
+    ).join(Availability, Appointment.availability_id == Availability.id).join(
+        ProgramDetails, Availability.program_id == ProgramDetails.id).outerjoin(
+        CourseDetails, Appointment.course_id == CourseDetails.id).outerjoin(
+        host, Appointment.host_id == host.id).outerjoin(
+        attendee, Appointment.attendee_id == attendee.id
+    ).filter(
+        or_(Appointment.host_id == user_id, Appointment.attendee_id == user_id),
+        ProgramDetails.deleted_at == None,
+        Appointment.status.in_(UPCOMING_STATUSES),
+        Appointment.appointment_date >= today
+    ).order_by(Appointment.appointment_date, Appointment.start_time)
+
+    return [{
+        "appointment_id": appointment_id,
+        "program_id": program_id,
+        "program_name": program_name,
+        "course_id": course_id,
+        "course_name": course_name,
+        "date": date,
+        "start_time": start_time,
+        "end_time": end_time,
+        "status": status,
+        "physical_location": physical_location,
+        "meeting_url": meeting_url,
+        "host": {"id": host_id, "name": host_name},
+        "attendee": {"id": attendee_id, "name": attendee_name} if attendee_id else None,
+    } for (appointment_id, host_id, attendee_id, date, start_time, end_time, status, physical_location, meeting_url,
+           program_id, program_name, course_id, course_name, host_name, attendee_name) in rows]
+
+# next active drop-in windows of the user's own programs, their courses' programs and their instructors' global programs
+def next_office_hours(user_id, today, now):
+    member_courses = select(CourseMembers.course_id).where(CourseMembers.user_id == user_id)
+    course_instructors = select(CourseDetails.instructor_id).where(CourseDetails.id.in_(member_courses))
+    rows = db.session.query(
+        Availability.id, Availability.date, Availability.start_time, Availability.end_time, ProgramDetails.id,
+        ProgramDetails.name, ProgramDetails.course_id, CourseDetails.name, ProgramDetails.physical_location,
+        ProgramDetails.meeting_url, User.id, User.name
+    ).join(ProgramDetails, Availability.program_id == ProgramDetails.id).outerjoin(
+        CourseDetails, ProgramDetails.course_id == CourseDetails.id).outerjoin(
+        User, Availability.user_id == User.id
+    ).filter(
+        or_(ProgramDetails.instructor_id == user_id,
+            ProgramDetails.course_id.in_(member_courses),
+            and_(ProgramDetails.course_id == None, ProgramDetails.instructor_id.in_(course_instructors))),
+        ProgramDetails.isDropins == True,
+        ProgramDetails.deleted_at == None,
+        Availability.status == 'active',
+        or_(Availability.date > today, and_(Availability.date == today, Availability.end_time > now))
+    ).order_by(Availability.date, Availability.start_time).limit(OFFICE_HOURS_LIMIT)
+
+    return [{
+        "availability_id": availability_id,
+        "program_id": program_id,
+        "program_name": program_name,
+        "course_id": course_id,
+        "course_name": course_name,
+        "date": date,
+        "start_time": start_time,
+        "end_time": end_time,
+        "physical_location": physical_location,
+        "meeting_url": meeting_url,
+        "host": {"id": host_id, "name": host_name},
+    } for (availability_id, date, start_time, end_time, program_id, program_name, course_id, course_name,
+           physical_location, meeting_url, host_id, host_name) in rows]
+
+# write the user's DashboardView row from the current tables, the caller commits
+def rebuild_dashboard(user_id):
+    today, now = dashboard_now()
+    payload = {
+        "upcoming_appointments": upcoming_appointments(user_id, today),
+        "next_office_hours": next_office_hours(user_id, today, now),
+    }
+    view = db.session.get(DashboardView, user_id) or DashboardView(user_id=user_id)
+    view.payload = current_app.json.dumps(payload)
+    view.built_for = today
+    view.stale = False
+    view.updated_at = datetime.utcnow()
+    db.session.add(view)
+    return payload
+
+# flag rows for a rebuild on their next read, in the caller's transaction
+def mark_stale(user_ids):
+    user_ids = {int(user_id) for user_id in user_ids if user_id is not None}
+    if user_ids:
+        db.session.execute(update(DashboardView).where(DashboardView.user_id.in_(user_ids)).values(
+            stale=True).execution_options(synchronize_session=False))
+
+# users whose dashboards list a program: its instructor, its upcoming attendees and the members of its courses
+# a global program (course_id None) reaches the members of every course its instructor teaches
+def program_audience(program_id, course_ids, instructor_id):
+    today, _ = dashboard_now()
+    user_ids = {instructor_id}
+    user_ids.update(attendee_id for (attendee_id,) in db.session.query(Appointment.attendee_id).join(
+        Availability, Appointment.availability_id == Availability.id).filter(
+        Availability.program_id == program_id, Appointment.attendee_id != None,
+        Appointment.status.in_(UPCOMING_STATUSES), Appointment.appointment_date >= today).distinct())
+
+    course_filters = [CourseMembers.course_id.in_([course_id for course_id in course_ids if course_id is not None])]
+    if None in course_ids and instructor_id is not None:
+        course_filters.append(CourseMembers.course_id.in_(select(CourseDetails.id).where(CourseDetails.instructor_id == instructor_id)))
+    user_ids.update(user_id for (user_id,) in db.session.query(CourseMembers.user_id).filter(or_(*course_filters)).distinct())
+    return user_ids
+
+# users reached by a program row, read before it is deleted
+def program_row_audience(program):
+    return program_audience(program.id, {program.course_id}, program.instructor_id) if program else set()
+
+# mark everyone a program reaches stale after its availabilities changed, then commit
+def mark_program_stale(program_id):
+    program = db.session.get(ProgramDetails, int(program_id)) if program_id is not None else None
+    if program:
+        mark_stale(program_row_audience(program))
+        db.session.commit()
+
+# rebuild the dashboards of the users an appointment write touched, after that write committed
+# a failed rebuild leaves the rows marked stale so the next read rebuilds them
+def refresh_dashboards(*user_ids):
+    user_ids = {int(user_id) for user_id in user_ids if user_id is not None}
+    try:
+        for user_id in user_ids:
+            rebuild_dashboard(user_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception("dashboard rebuild for users %s failed", sorted(user_ids))
+        try:
+            mark_stale(user_ids)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+
+# the stored payload as served: passed entries dropped and pending appointments counted
+def current_dashboard(payload, user_id, today, now):
+    upcoming = [appointment for appointment in payload["upcoming_appointments"]
+                if appointment["date"] > today or (appointment["date"] == today and appointment["start_time"] >= now)]
+    office_hours = [window for window in payload["next_office_hours"]
+                    if window["date"] > today or (window["date"] == today and window["end_time"] > now)]
+    pending = [appointment for appointment in upcoming if appointment["status"] == 'pending']
+    return {
+        "upcoming_appointments": upcoming,
+        "pending_counts": {
+            "hosting": sum(1 for appointment in pending if appointment["host"]["id"] == user_id),
+            "attending": sum(1 for appointment in pending if appointment["attendee"] and appointment["attendee"]["id"] == user_id),
+        },
+        "next_office_hours": office_hours,
+    }
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""               Endpoint Functions                ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# the caller's dashboard from their DashboardView row, rebuilt first when missing, stale or from an earlier day
+@dashboard.route('/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    try:
+        user_id = int(get_jwt_identity())
+        today, now = dashboard_now()
+
+        view = db.session.get(DashboardView, user_id)
+        if view is None or view.stale or view.built_for != today:
+            payload = rebuild_dashboard(user_id)
+            db.session.commit()
+        else:
+            payload = current_app.json.loads(view.payload)
+
+        return jsonify(current_dashboard(payload, user_id, today, now)), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
@@ -1,8 +1,11 @@
 """ 
  * feedback.py
- * Last Edited: 3/26/24
+ * Last Edited: 10/18/26
  *
- * Contains functions used to manipulate the feedback for appointments
+ * Contains functions used to manipulate the feedback for appointments.
+ * Ratings are also counted into the per host and per program aggregates
+ * (feedback_aggregates.py) in the same transaction, which back the
+ * summary endpoints.
  *
  * Known Bugs:
  * - 
@@ -12,9 +15,10 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, set_access_cookies,\
     jwt_required, get_jwt_identity, get_jwt
-from .models import User, Feedback, Appointment
+from .models import User, Feedback, Appointment, ProgramDetails
 from datetime import datetime, timedelta, timezone
 from . import db
+from .feedback_aggregates import record_rating_change, aggregate_summary
 
 feedback = Blueprint('feedback', __name__)
 
@@ -42,19 +46,23 @@ def refresh_expiring_jwts(response):
 @jwt_required()
 def add_feedback():
     user_id = get_jwt_identity()
-    data = request.json
-    appointment_id = data['appointment_id']
-
-    # Fetch the existing feedback for the appointment
-    existing_feedback = Feedback.query.filter_by(appointment_id=appointment_id).first()
+    data = request.get_json(silent=True) or {}
+    appointment_id = data.get('appointment_id')
 
     user = User.query.get(user_id)
     if not user or user.account_type not in ['student', 'instructor']:
         return jsonify({"error": "Only students and instructors can add feedback"}), 401
     
-    if not data.contains('satisfaction') or not data.contains('additional_comments'):
+    if 'satisfaction' not in data or 'additional_comments' not in data:
         return jsonify({"error": "Missing satisfaction or additional_comments data"}), 404
 
+    appointment = Appointment.query.get(appointment_id) if appointment_id is not None else None
+    if not appointment:
+        return jsonify({"error": "Appointment not found"}), 404
+
+    # Fetch the existing feedback for the appointment
+    existing_feedback = Feedback.query.filter_by(appointment_id=appointment_id).first()
+
     # Function to update or create feedback
     def update_or_create_feedback(feedback, is_student):
         if is_student:
@@ -68,13 +76,20 @@ def add_feedback():
         return feedback
 
     try:
+        is_student = user.account_type == 'student'
+        rating = 'attendee' if is_student else 'host'
+        previous = None
         # If feedback already exists, update it
         if existing_feedback:
-            feedback = update_or_create_feedback(existing_feedback, user.account_type == 'student')
+            previous = existing_feedback.attendee_rating if is_student else existing_feedback.host_rating
+            feedback = update_or_create_feedback(existing_feedback, is_student)
         else:
             # Create new feedback
-            feedback = update_or_create_feedback(Feedback(appointment_id=appointment_id), user.account_type == 'student')
+            feedback = update_or_create_feedback(Feedback(appointment_id=appointment_id), is_student)
             db.session.add(feedback)
+
+        # move the rating in the host and program aggregates, committed together with the feedback
+        record_rating_change(appointment, rating, previous, data.get('satisfaction'))
         db.session.commit()
 
         return jsonify({"message": "Feedback submitted successfully"}), 200
@@ -141,4 +156,33 @@ def get_feedback(appointment_id):
         "host_notes": feedback.host_notes
     }
 
-    return jsonify(feedback_data), 200
\ No newline at end of file
+    return jsonify(feedback_data), 200
+
+# rating count, average and histogram of the appointments a host held, for admins and the host
+@feedback.route('/feedback/summary/hosts/<int:host_id>', methods=['GET'])
+@jwt_required()
+def get_host_feedback_summary(host_id):
+    try:
+        user = User.query.get(int(get_jwt_identity()))
+        if not user or (user.account_type != 'admin' and user.id != host_id):
+            return jsonify({"error": "Only admins and the host can view this summary"}), 403
+
+        return jsonify({"host_id": host_id, **aggregate_summary('host', host_id)}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# rating count, average and histogram of a program's appointments, for admins and its instructor
+@feedback.route('/feedback/summary/programs/<int:program_id>', methods=['GET'])
+@jwt_required()
+def get_program_feedback_summary(program_id):
+    try:
+        user = User.query.get(int(get_jwt_identity()))
+        program = ProgramDetails.query.get(program_id)
+        if not program:
+            return jsonify({"error": "Program not found"}), 404
+        if not user or (user.account_type != 'admin' and user.id != program.instructor_id):
+            return jsonify({"error": "Only admins and the program's instructor can view this summary"}), 403
+
+        return jsonify({"program_id": program_id, **aggregate_summary('program', program_id)}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
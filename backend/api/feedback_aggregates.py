@@ -0,0 +1,147 @@
+"""
+ * feedback_aggregates.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the running feedback aggregates. For every host and program a
+ * FeedbackAggregate row per rating side (attendee, host) keeps the count,
+ * the sum and a 1 to 5 histogram of the scores. add_feedback adjusts them
+ * with in-place increments in its own transaction, so summaries are a
+ * primary-key read instead of a scan of every Feedback row.
+ * Bulk deletes subtract the grouped scores of the feedback they remove.
+ * `flask rebuild-feedback-aggregates` recomputes them from Feedback.
+ *
+ * Known Bugs:
+ * - ratings outside the satisfaction scale are stored on Feedback but not
+ *   counted
+ *
+"""
+
+from sqlalchemy import update, func
+from sqlalchemy.exc import IntegrityError
+from .models import Feedback, FeedbackAggregate, Appointment, Availability
+from . import db
+
+RATINGS = ['attendee', 'host']
+
+# satisfaction levels of the feedback form, lowest first
+SATISFACTION_LEVELS = ['very dissatisfied', 'dissatisfied', 'neutral', 'satisfied', 'highly satisfied']
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# 1 to 5 score of a stored rating, a satisfaction level or its number, None otherwise
+def rating_score(value):
+    if value is None:
+        return None
+    value = str(value).strip().lower()
+    if value in SATISFACTION_LEVELS:
+        return SATISFACTION_LEVELS.index(value) + 1
+    if value in ('1', '2', '3', '4', '5'):
+        return int(value)
+    return None
+
+# (scope, scope_id) aggregates an appointment's feedback counts towards
+def aggregate_keys(appointment):
+    keys = []
+    if appointment.host_id is not None:
+        keys.append(('host', appointment.host_id))
+    if appointment.availability and appointment.availability.program_id is not None:
+        keys.append(('program', appointment.availability.program_id))
+    return keys
+
+# add delta (1 or -1) ratings of score to one aggregate, inserting it on its first rating
+def add_to_aggregate(scope, scope_id, rating, score, delta):
+    column = f'score_{score}'
+    statement = update(FeedbackAggregate).where(
+        FeedbackAggregate.scope == scope, FeedbackAggregate.scope_id == scope_id, FeedbackAggregate.rating == rating
+    ).values({
+        'count': FeedbackAggregate.count + delta,
+        'total': FeedbackAggregate.total + delta * score,
+        column: getattr(FeedbackAggregate, column) + delta,
+    }).execution_options(synchronize_session=False)
+
+    if db.session.execute(statement).rowcount or delta < 0:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(FeedbackAggregate(scope=scope, scope_id=scope_id, rating=rating, count=1, total=score,
+                                             **{f'score_{n}': int(n == score) for n in range(1, 6)}))
+    except IntegrityError:
+        # another request inserted it first
+        db.session.execute(statement)
+
+# move one rating of an appointment's feedback from previous to current, call before committing the feedback
+def record_rating_change(appointment, rating, previous, current):
+    previous_score, current_score = rating_score(previous), rating_score(current)
+    if previous_score == current_score:
+        return
+    for scope, scope_id in aggregate_keys(appointment):
+        if previous_score is not None:
+            add_to_aggregate(scope, scope_id, rating, previous_score, -1)
+        if current_score is not None:
+            add_to_aggregate(scope, scope_id, rating, current_score, 1)
+
+def empty_summary():
+    return {"count": 0, "average": None, "histogram": {str(score): 0 for score in range(1, 6)}}
+
+def describe_aggregate(aggregate):
+    return {
+        "count": aggregate.count,
+        "average": round(aggregate.total / aggregate.count, 2) if aggregate.count else None,
+        "histogram": {str(score): getattr(aggregate, f'score_{score}') for score in range(1, 6)},
+    }
+
+# attendee and host rating summaries of a host or program
+def aggregate_summary(scope, scope_id):
+    summary = {f"{rating}_ratings": empty_summary() for rating in RATINGS}
+    for aggregate in FeedbackAggregate.query.filter_by(scope=scope, scope_id=scope_id):
+        summary[f"{aggregate.rating}_ratings"] = describe_aggregate(aggregate)
+    return summary
+
+# {(scope, scope_id, rating): {score: count}} of the feedback on the appointments matched by appointment_filter (all
+# when None), one grouped query per rating side
+def grouped_scores(appointment_filter=None):
+    scores = {}
+    for rating, column in (('attendee', Feedback.attendee_rating), ('host', Feedback.host_rating)):
+        rows = db.session.query(Appointment.host_id, Availability.program_id, column, func.count(Feedback.id)).join(
+            Appointment, Feedback.appointment_id == Appointment.id).outerjoin(
+            Availability, Appointment.availability_id == Availability.id).filter(column.isnot(None))
+        if appointment_filter is not None:
+            rows = rows.filter(appointment_filter)
+        for host_id, program_id, value, count in rows.group_by(Appointment.host_id, Availability.program_id, column):
+            score = rating_score(value)
+            if score is None:
+                continue
+            for scope, scope_id in (('host', host_id), ('program', program_id)):
+                if scope_id is not None:
+                    counts = scores.setdefault((scope, scope_id, rating), {})
+                    counts[score] = counts.get(score, 0) + count
+    return scores
+
+# take the feedback of the appointments matched by appointment_filter out of the aggregates, call before deleting it
+def subtract_feedback(appointment_filter):
+    for (scope, scope_id, rating), counts in grouped_scores(appointment_filter).items():
+        values = {
+            'count': FeedbackAggregate.count - sum(counts.values()),
+            'total': FeedbackAggregate.total - sum(score * count for score, count in counts.items()),
+        }
+        for score, count in counts.items():
+            values[f'score_{score}'] = getattr(FeedbackAggregate, f'score_{score}') - count
+        db.session.execute(update(FeedbackAggregate).where(
+            FeedbackAggregate.scope == scope, FeedbackAggregate.scope_id == scope_id, FeedbackAggregate.rating == rating
+        ).values(values).execution_options(synchronize_session=False))
+
+# recompute every aggregate from Feedback, returns the row count
+def rebuild_feedback_aggregates():
+    aggregates = []
+    for (scope, scope_id, rating), counts in grouped_scores().items():
+        aggregates.append(FeedbackAggregate(
+            scope=scope, scope_id=scope_id, rating=rating, count=sum(counts.values()),
+            total=sum(score * count for score, count in counts.items()),
+            **{f'score_{score}': counts.get(score, 0) for score in range(1, 6)}))
+
+    FeedbackAggregate.query.delete()
+    db.session.add_all(aggregates)
+    db.session.commit()
+    return len(aggregates)
@@ -0,0 +1,53 @@
+"""
+ * fieldsets.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the sparse fieldset helpers used by the program list
+ * endpoints. A ?fields=id,name parameter limits both the keys in each
+ * serialized program and the columns loaded from ProgramDetails, so a
+ * dropdown never pulls every program's description.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+from sqlalchemy.orm import load_only
+
+# serialized program keys, each the ProgramDetails column of the same name, in response order
+PROGRAM_FIELDS = [
+    'id',
+    'name',
+    'description',
+    'duration',
+    'physical_location',
+    'meeting_url',
+    'auto_approve_appointments',
+    'max_daily_meetings',
+    'max_weekly_meetings',
+    'max_monthly_meetings',
+    'isDropins',
+    'isRangeBased',
+]
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# requested fields in the order of defaults, all defaults when none are given
+# raises ValueError for a field the endpoint doesn't return
+def parse_fields(value, defaults):
+    requested = {field.strip() for field in (value or '').split(',') if field.strip()}
+    if not requested:
+        return list(defaults)
+    unknown = requested - set(defaults)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+    return [field for field in defaults if field in requested]
+
+# query option loading only the fields' columns (the primary key is always loaded)
+def load_fields(model, fields):
+    return load_only(*[getattr(model, field) for field in fields])
+
+def serialize_fields(obj, fields):
+    return {field: getattr(obj, field) for field in fields}
@@ -0,0 +1,211 @@
+"""
+ * freebusy.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the free/busy engine for instructors. Reserved and pending
+ * Appointments, CourseTimes and ProgramTimes are busy; posted Availability
+ * windows are open. Everything for a date window is loaded in four
+ * queries for any number of instructors, then merged per day with a
+ * sorted sweep.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from .models import User, Availability, Appointment, CourseDetails, CourseTimes, ProgramDetails, ProgramTimes
+from . import db
+from .recurrence import expand_weekly_times
+
+freebusy = Blueprint('freebusy', __name__)
+
+MAX_WINDOW_DAYS = 62
+MAX_INSTRUCTORS = 50
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# "HH:MM" to minutes after midnight, None when malformed
+def to_minutes(time_str):
+    try:
+        hours, minutes = str(time_str).split(':')[:2]
+        return int(hours) * 60 + int(minutes)
+    except (ValueError, AttributeError):
+        return None
+
+def to_time(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+# sort intervals and merge the overlapping or touching ones in a single sweep
+def merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+# parts of merged, sorted intervals not covered by merged, sorted busy intervals
+def subtract_intervals(intervals, busy):
+    result = []
+    i = 0
+    for start, end in intervals:
+        # skip busy intervals that end before this one starts
+        while i < len(busy) and busy[i][1] <= start:
+            i += 1
+        j = i
+        cursor = start
+        while j < len(busy) and busy[j][0] < end:
+            if busy[j][0] > cursor:
+                result.append((cursor, busy[j][0]))
+            cursor = max(cursor, busy[j][1])
+            j += 1
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+# add an interval to a {instructor_id: {date: [(start, end)]}} index
+def add_interval(index, instructor_id, date, start_time, end_time):
+    start, end = to_minutes(start_time), to_minutes(end_time)
+    if start is None or end is None or end <= start:
+        return
+    index.setdefault(instructor_id, {}).setdefault(date, []).append((start, end))
+
+# load every busy and open interval for the instructors in [date_from, date_to] with one query per source
+def load_intervals(instructor_ids, date_from, date_to):
+    busy = {}
+    open_windows = {}
+
+    appointments = db.session.query(Appointment.host_id, Appointment.appointment_date,
+                                    Appointment.start_time, Appointment.end_time).filter(
+        Appointment.host_id.in_(instructor_ids),
+        Appointment.appointment_date.between(date_from, date_to),
+        Appointment.status.in_(['reserved', 'pending'])
+    )
+    for host_id, date, start_time, end_time in appointments:
+        add_interval(busy, host_id, date, start_time, end_time)
+
+    availabilities = db.session.query(Availability.user_id, Availability.date,
+                                      Availability.start_time, Availability.end_time).filter(
+        Availability.user_id.in_(instructor_ids),
+        Availability.date.between(date_from, date_to),
+        Availability.status == 'active'
+    )
+    for user_id, date, start_time, end_time in availabilities:
+        add_interval(open_windows, user_id, date, start_time, end_time)
+
+    # weekly course meetings and program times are expanded onto the dates in the window
+    course_times = db.session.query(CourseTimes, CourseDetails.instructor_id).join(
+        CourseDetails, CourseTimes.course_id == CourseDetails.id).filter(CourseDetails.instructor_id.in_(instructor_ids)).all()
+    program_times = db.session.query(ProgramTimes, ProgramDetails.instructor_id).join(
+        ProgramDetails, ProgramTimes.program_id == ProgramDetails.id).filter(ProgramDetails.instructor_id.in_(instructor_ids)).all()
+
+    for rows in [course_times, program_times]:
+        owners = {id(time): instructor_id for time, instructor_id in rows}
+        for window in expand_weekly_times([time for time, _ in rows], date_from, date_to):
+            add_interval(busy, owners[id(window['source'])], window['date'], window['start_time'], window['end_time'])
+
+    return busy, open_windows
+
+# dates from date_from through date_to as strings
+def date_range(date_from, date_to):
+    current = datetime.strptime(date_from, '%Y-%m-%d').date()
+    last = datetime.strptime(date_to, '%Y-%m-%d').date()
+    while current <= last:
+        yield current.strftime('%Y-%m-%d')
+        current += timedelta(days=1)
+
+def format_intervals(date, intervals):
+    return [{'date': date, 'start_time': to_time(start), 'end_time': to_time(end)} for start, end in intervals]
+
+# compute merged busy, free (inside day_start-day_end) and open (availability minus busy) lists per instructor
+def compute_freebusy(instructor_ids, date_from, date_to, day_start='08:00', day_end='20:00'):
+    busy_index, open_index = load_intervals(instructor_ids, date_from, date_to)
+    working_day = [(to_minutes(day_start), to_minutes(day_end))]
+    dates = list(date_range(date_from, date_to))
+
+    results = {}
+    for instructor_id in instructor_ids:
+        busy_by_date = busy_index.get(instructor_id, {})
+        open_by_date = open_index.get(instructor_id, {})
+        result = {'instructor_id': instructor_id, 'busy': [], 'free': [], 'open': []}
+
+        for date in dates:
+            busy = merge_intervals(busy_by_date.get(date, []))
+            result['busy'].extend(format_intervals(date, busy))
+            result['free'].extend(format_intervals(date, subtract_intervals(working_day, busy)))
+            if date in open_by_date:
+                result['open'].extend(format_intervals(date, subtract_intervals(merge_intervals(open_by_date[date]), busy)))
+
+        results[instructor_id] = result
+    return results
+
+# read and validate from/to/day_start/day_end, returning (args, error response)
+def parse_window_args(args):
+    date_from = args.get('from', datetime.now().strftime('%Y-%m-%d'))
+    date_to = args.get('to', (datetime.now() + timedelta(days=6)).strftime('%Y-%m-%d'))
+    day_start = args.get('day_start', '08:00')
+    day_end = args.get('day_end', '20:00')
+
+    try:
+        start = datetime.strptime(date_from, '%Y-%m-%d')
+        end = datetime.strptime(date_to, '%Y-%m-%d')
+    except ValueError:
+        return None, (jsonify({"error": "provide 'from' and 'to' in 'YYYY-MM-DD' format"}), 400)
+
+    if end < start or (end - start).days >= MAX_WINDOW_DAYS:
+        return None, (jsonify({"error": f"'to' must be after 'from' and within {MAX_WINDOW_DAYS} days"}), 400)
+
+    if to_minutes(day_start) is None or to_minutes(day_end) is None or to_minutes(day_start) >= to_minutes(day_end):
+        return None, (jsonify({"error": "provide valid 'HH:MM' day_start and day_end"}), 400)
+
+    return (date_from, date_to, day_start, day_end), None
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""               Endpoint Functions                ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# busy, free and open intervals for one instructor
+@freebusy.route('/instructor/<int:instructor_id>/freebusy', methods=['GET'])
+@jwt_required()
+def get_instructor_freebusy(instructor_id):
+    try:
+        window, error = parse_window_args(request.args)
+        if error:
+            return error
+
+        instructor = User.query.filter_by(id=instructor_id, account_type='instructor').first()
+        if not instructor:
+            return jsonify({"error": "Instructor not found"}), 404
+
+        return jsonify(compute_freebusy([instructor_id], *window)[instructor_id]), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# busy, free and open intervals for many instructors in one request (?ids=1,2,3)
+@freebusy.route('/instructors/freebusy', methods=['GET'])
+@jwt_required()
+def get_instructors_freebusy():
+    try:
+        window, error = parse_window_args(request.args)
+        if error:
+            return error
+
+        try:
+            instructor_ids = sorted({int(value) for value in request.args.get('ids', '').split(',') if value.strip()})
+        except ValueError:
+            return jsonify({"error": "ids must be a comma separated list of instructor ids"}), 400
+
+        if not instructor_ids or len(instructor_ids) > MAX_INSTRUCTORS:
+            return jsonify({"error": f"provide between 1 and {MAX_INSTRUCTORS} instructor ids"}), 400
+
+        results = compute_freebusy(instructor_ids, *window)
+        return jsonify({"freebusy": [results[instructor_id] for instructor_id in instructor_ids]}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
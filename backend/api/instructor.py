@@ -6,9 +6,6 @@
  * instructor user type
  *
  * Known Bugs:
- * - delete_instructor_availabililty does not delete appointments. 
- *   This isnt a bug, but the function's logic operates different 
- *   than other Availability delete functions
  * - There are a good amount of functions that are close to identical with functions in
  *   student.py. These functions can be merged and put into user.py. These functions can accept
  *   students and instructors and will operate slightly different based on that.
@@ -16,14 +13,22 @@
 """
 
 from flask import Blueprint, request, jsonify
-from .models import User, Availability, Appointment, AppointmentComment, CourseDetails, CourseMembers, ProgramDetails
+from .models import User, Availability, AvailabilityRule, Appointment, AppointmentComment, CourseDetails, CourseMembers, ProgramDetails
 from flask_jwt_extended import jwt_required, get_jwt_identity, set_access_cookies, get_jwt, create_access_token
-from sqlalchemy import extract, func, or_, and_
-from . import db
+from sqlalchemy import or_, and_, update
+from . import db, response_cache
+from .response_cache import identity_scope, caller_tags
+from .fieldsets import PROGRAM_FIELDS, parse_fields, load_fields, serialize_fields
 from datetime import datetime, timedelta, timezone
-from .student import get_week_range
 from .programs import get_program_name, get_course_name
 from .user import is_instructor
+from .recurrence import parse_days, format_days, parse_exdates, expand_rule
+from .availability_rules import clear_unbooked_future, RULE_STATUSES
+from .cascades import delete_availabilities
+from .meeting_limits import program_limits, booked_counts, limit_reached
+from .dashboard import refresh_dashboards, mark_program_stale
+from .slot_stream import record_slot_event, record_availability_event, record_availabilities_deleted
+from .analytics import mark_days_stale
 
 instructor = Blueprint('instructor', __name__)
 
@@ -57,35 +62,21 @@ def get_program_name_and_isDropins(program_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
-# return the global programs for a instructor
-def get_global_programs(user_id):
+# return the global programs for a instructor, loading only the columns of fields
+def get_global_programs(user_id, fields=None):
+    fields = fields or PROGRAM_FIELDS
     try:
         if is_instructor(user_id):
-            global_programs = ProgramDetails.query.filter(
-                and_(ProgramDetails.course_id == None, ProgramDetails.instructor_id == user_id)
+            global_programs = ProgramDetails.query.options(load_fields(ProgramDetails, fields)).filter(
+                and_(ProgramDetails.course_id == None, ProgramDetails.instructor_id == user_id, ProgramDetails.deleted_at == None)
             ).all()
 
             if global_programs:
                 formatted_programs = []
 
                 for program in global_programs:
-                    # convert attributes to a object
-                    program_info = {
-                        'id': program.id,
-                        'name': program.name,
-                        'description': program.description,
-                        'duration': program.duration,
-                        'physical_location': program.physical_location,
-                        'meeting_url': program.meeting_url,
-                        'auto_approve_appointments': program.auto_approve_appointments,
-                        'max_daily_meetings': program.max_daily_meetings,
-                        'max_weekly_meetings': program.max_weekly_meetings,
-                        'max_monthly_meetings': program.max_monthly_meetings,
-                        'isDropins': program.isDropins,
-                        'isRangeBased': program.isRangeBased,
-                    }
-                    # add object to list
-                    formatted_programs.append(program_info)
+                    # convert the requested attributes to a object and add it to the list
+                    formatted_programs.append(serialize_fields(program, fields))
 
                 # add id and course_name to object
                 formatted_programs = {
@@ -170,6 +161,42 @@ def validate_availability_data(instructor_id, course_id, availability_id, date,
 
     return None  # Data is valid
 
+# validate a recurrence rule body, returning an error response or None
+def validate_rule_data(days, start_date, until_date, start_time, end_time, exdates):
+    if not all([days, start_date, until_date, start_time, end_time]):
+        return jsonify({"error": "provide days, start_date, until_date, start_time and end_time"}), 400
+
+    try:
+        if not parse_days(days):
+            return jsonify({"error": "provide at least one day"}), 400
+        for date in [start_date, until_date] + list(parse_exdates(exdates)):
+            datetime.strptime(date, "%Y-%m-%d")
+    except ValueError as e:
+        return jsonify({"error": f"invalid rule: {str(e)}"}), 400
+
+    if until_date < start_date or not is_valid_date(until_date):
+        return jsonify({"error": "until_date must be after start_date and not in the past"}), 400
+
+    if not is_valid_time(start_time) or not is_valid_time(end_time) or not is_start_time_before_end_time(start_time, end_time):
+        return jsonify({"error": "provide valid 'HH:MM' time formats, ensure that start_time is before end_time, and that they are at least 30 mins apart"}), 400
+
+    return None
+
+# convert an AvailabilityRule to an object
+def format_rule(rule):
+    return {
+        'id': rule.id,
+        'program_id': rule.program_id,
+        'days': rule.days.split(','),
+        'start_date': rule.start_date,
+        'until_date': rule.until_date,
+        'start_time': rule.start_time,
+        'end_time': rule.end_time,
+        'exdates': list(parse_exdates(rule.exdates)),
+        'status': rule.status,
+        'version': rule.version,
+    }
+
 # check if availability already exists in Availability table
 def is_existing_availability(instructor_id, program_id, date, start_time, end_time):
     existing_availabilities = Availability.query.filter_by(user_id=instructor_id, program_id=program_id, date=date).all()
@@ -181,7 +208,8 @@ def is_existing_availability(instructor_id, program_id, date, start_time, end_ti
     return False  # No time overlap found
 
 # add a availability tuple to the Availabilty Table
-def add_instructor_availability(course_id, instructor_id, data, physical_location, meeting_url, duration, isDropins):
+# commit=False leaves the rows flushed in the caller's transaction and lets errors propagate
+def add_instructor_availability(course_id, instructor_id, data, physical_location, meeting_url, duration, isDropins, commit=True):
     try:
         program_id = data.get('id')
         date = data.get('date')
@@ -210,54 +238,159 @@ def add_instructor_availability(course_id, instructor_id, data, physical_locatio
                 status='active'
             )
             db.session.add(new_availability) 
-            db.session.commit()
+            db.session.commit() if commit else db.session.flush()
             
             # Generate appointment events
             if not isDropins:
-                generate_appointments(instructor_id, date, start_time, end_time, physical_location, meeting_url, new_availability.id, duration)
+                generate_appointments(instructor_id, date, start_time, end_time, physical_location, meeting_url, new_availability.id, duration, commit)
+
+            # announced once its appointments are committed, so a client reloading on the event sees them
+            record_availability_event(new_availability, 'posted')
+            if commit:
+                db.session.commit()
             return jsonify({"message": "availability added successfully"}), 201
         else:
             return jsonify({"error": "appointment datetime must be in the future"}), 400
     except Exception as e:
+        if not commit:
+            raise
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
         
+# (start_time, end_time) of each appointment generate_appointments creates for a window
+def appointment_windows(start_time, end_time, duration):
+    start_datetime = datetime.strptime(start_time, "%H:%M")
+    end_datetime = datetime.strptime(end_time, "%H:%M")
+
+    if duration == 0 or not duration:
+        return [(start_datetime.strftime("%H:%M"), end_datetime.strftime("%H:%M"))]
+
+    windows = []
+    while start_datetime + timedelta(minutes=duration) <= end_datetime:
+        windows.append((start_datetime.strftime("%H:%M"), (start_datetime + timedelta(minutes=duration)).strftime("%H:%M")))
+        start_datetime += timedelta(minutes=duration)
+    return windows
+
+# availabilities whose appointments no longer match the posted location, meeting url, duration or drop-in setting
+def stale_availabilities(availability_ids, physical_location, meeting_url, duration, isDropins):
+    appointments = {}
+    for availability_id, start_time, end_time, location, url in db.session.query(
+            Appointment.availability_id, Appointment.start_time, Appointment.end_time,
+            Appointment.physical_location, Appointment.meeting_url).filter(
+            Appointment.availability_id.in_(list(availability_ids))):
+        appointments.setdefault(availability_id, []).append((start_time, end_time, location, url))
+
+    stale = set()
+    for availability_id, start_time, end_time in db.session.query(
+            Availability.id, Availability.start_time, Availability.end_time).filter(Availability.id.in_(list(availability_ids))):
+        expected = set() if isDropins else set(appointment_windows(start_time, end_time, duration))
+        rows = appointments.get(availability_id, [])
+        if {(row[0], row[1]) for row in rows} != expected or any(row[2:] != (physical_location, meeting_url) for row in rows):
+            stale.add(availability_id)
+    return stale
+
+# apply only the difference between a program's upcoming availabilities and the posted list, in one transaction
+# rows are keyed by (date, start_time, end_time); past rows and rows from recurrence rules are left alone,
+# and kept rows whose appointments no longer match the program's settings are rewritten
+# removals that would orphan reserved or pending appointments are flagged and kept unless force is set
+def reconcile_availabilities(course_id, instructor_id, program_id, entries, physical_location, meeting_url, duration, isDropins, force=False):
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    existing = {}
+    for availability_id, date, start_time, end_time in db.session.query(
+            Availability.id, Availability.date, Availability.start_time, Availability.end_time).filter(
+            Availability.program_id == program_id, Availability.rule_id == None, Availability.date >= today):
+        existing[(date, start_time, end_time)] = availability_id
+
+    incoming = {}
+    skipped = 0
+    for entry in entries or []:
+        if entry.get('date') and str(entry.get('date')) < today:
+            skipped += 1
+            continue
+        incoming[(entry.get('date'), entry.get('start_time'), entry.get('end_time'))] = entry
+
+    kept = existing.keys() & incoming.keys()
+    stale = stale_availabilities([existing[key] for key in kept], physical_location, meeting_url, duration, isDropins)
+    rewritten = {key for key in kept if existing[key] in stale}
+
+    to_delete = {key: existing[key] for key in (existing.keys() - incoming.keys()) | rewritten}
+
+    # one query for the bookings that would be lost with the removed rows
+    flagged = {}
+    if to_delete:
+        booked = db.session.query(Appointment.id, Appointment.availability_id, Appointment.start_time, Appointment.end_time,
+                                  Appointment.status, Appointment.attendee_id).filter(
+            Appointment.availability_id.in_(list(to_delete.values())),
+            Appointment.status.in_(['reserved', 'pending'])
+        ).order_by(Appointment.start_time)
+        for appointment in booked:
+            flagged.setdefault(appointment.availability_id, []).append({
+                'appointment_id': appointment.id,
+                'start_time': appointment.start_time,
+                'end_time': appointment.end_time,
+                'status': appointment.status,
+                'attendee_id': appointment.attendee_id,
+            })
+
+    deletable = [availability_id for availability_id in to_delete.values() if force or availability_id not in flagged]
+    rewritten = {key for key in rewritten if existing[key] in deletable}
+    to_insert = [incoming[key] for key in sorted((incoming.keys() - existing.keys()) | rewritten,
+                                                 key=lambda key: tuple(str(part) for part in key))]
+
+    record_availabilities_deleted(deletable)
+    deleted = delete_availabilities(deletable)
+
+    errors = []
+    inserted = 0
+    for entry in to_insert:
+        response, status_code = add_instructor_availability(course_id, instructor_id, entry, physical_location, meeting_url,
+                                                            duration, isDropins, commit=False)
+        if status_code == 201:
+            inserted += 1
+        else:
+            errors.append({'date': entry.get('date'), 'start_time': entry.get('start_time'), 'end_time': entry.get('end_time'),
+                           'error': response.get_json().get('error')})
+    db.session.commit()
+
+    return {
+        'inserted': inserted,
+        'deleted': deleted,
+        'unchanged': len(kept) - len(rewritten),
+        'rewritten': len(rewritten),
+        'skipped': skipped,
+        'flagged': [{
+            'availability_id': availability_id,
+            'date': key[0],
+            'start_time': key[1],
+            'end_time': key[2],
+            'deleted': force,
+            'appointments': flagged[availability_id],
+        } for key, availability_id in sorted(to_delete.items()) if availability_id in flagged],
+        'errors': errors,
+    }
+
 # Generate appointment events at 30-minute intervals within the specified time range.
-def generate_appointments(instructor_id, date, start_time, end_time, physical_location, meeting_url, availability_id, duration):
+def generate_appointments(instructor_id, date, start_time, end_time, physical_location, meeting_url, availability_id, duration, commit=True):
     try:
-        start_datetime = datetime.strptime(start_time, "%H:%M")
-        end_datetime = datetime.strptime(end_time, "%H:%M")
-
-        if duration == 0 or not duration:
+        for window_start, window_end in appointment_windows(start_time, end_time, duration):
             new_appointment = Appointment(
                 host_id=instructor_id,
                 appointment_date=date,
-                start_time=start_datetime.strftime("%H:%M"),
-                end_time=end_datetime.strftime("%H:%M"),
+                start_time=window_start,
+                end_time=window_end,
                 status="posted",
                 physical_location=physical_location,
                 meeting_url=meeting_url,
                 availability_id=availability_id
             )
             db.session.add(new_appointment)
-        else:
-            while start_datetime + timedelta(minutes=duration) <= end_datetime:
-                new_appointment = Appointment(
-                    host_id=instructor_id,
-                    appointment_date=date,
-                    start_time=start_datetime.strftime("%H:%M"),
-                    end_time=(start_datetime + timedelta(minutes=duration)).strftime("%H:%M"),
-                    status="posted",
-                    physical_location=physical_location,
-                    meeting_url=meeting_url,
-                    availability_id=availability_id
-                )
-                start_datetime += timedelta(minutes=duration)
-                db.session.add(new_appointment)
         
-        db.session.commit()
+        db.session.commit() if commit else db.session.flush()
     
     except Exception as e:
+        if not commit:
+            raise
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
@@ -266,12 +399,19 @@ def generate_appointments(instructor_id, date, start_time, end_time, physical_lo
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 
 # fetch all of the programs for each course an instructor is in
+# ?fields=id,name limits the program attributes returned and the columns loaded
 @instructor.route('/instructor/programs', methods=['GET'])
 @jwt_required()
+@response_cache.cached(scope=identity_scope, tags=caller_tags)
 def get_instructor_courses():
     try:
         user_id = get_jwt_identity()
 
+        try:
+            fields = parse_fields(request.args.get('fields'), PROGRAM_FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         if is_instructor(user_id):
             instructor_courses = CourseDetails.query.join(CourseMembers, CourseDetails.id == CourseMembers.course_id).filter_by(user_id=user_id).all()
             converted_courses = [{'course_id': course.id, 'course_name': course.name} for course in instructor_courses]
@@ -284,30 +424,12 @@ def get_instructor_courses():
                 for entry in converted_courses:
                     course_id = entry['course_id']
 
-                    programs_in_course = ProgramDetails.query.filter_by(course_id=course_id).all()
+                    # load only the columns of the requested fields
+                    programs_in_course = ProgramDetails.query.options(load_fields(ProgramDetails, fields)).filter_by(
+                        course_id=course_id, deleted_at=None).all()
 
                     # list of all programs in a course
-                    programs_in_course_list = []
-
-                    for program in programs_in_course:
-                        # convert attributes to a object
-                        program_info = {
-                            'id': program.id,
-                            'name': program.name,
-                            'description': program.description,
-                            'duration': program.duration,
-                            'physical_location': program.physical_location,
-                            'meeting_url': program.meeting_url,
-                            'auto_approve_appointments': program.auto_approve_appointments,
-                            'max_daily_meetings': program.max_daily_meetings,
-                            'max_weekly_meetings': program.max_weekly_meetings,
-                            'max_monthly_meetings': program.max_monthly_meetings,
-                            'isDropins': program.isDropins,
-                            'isRangeBased': program.isRangeBased,
-                        }
-                        
-                        # append object to list
-                        programs_in_course_list.append(program_info)
+                    programs_in_course_list = [serialize_fields(program, fields) for program in programs_in_course]
 
                     # format data to append to courses_list
                     formatTuple = {
@@ -320,7 +442,7 @@ def get_instructor_courses():
                     courses_list.append(formatTuple)
 
                 # fetch global programs for instructor
-                global_programs = get_global_programs(user_id)
+                global_programs = get_global_programs(user_id, fields)
 
                 # if global programs found, append to courses_list
                 if global_programs is not None:
@@ -345,7 +467,7 @@ def get_instructor_programs_with_descriptions():
 
         if is_instructor(user_id):
             instructor = User.query.get(user_id)
-            programs = ProgramDetails.query.filter(ProgramDetails.instructor_id==instructor.id).all()
+            programs = ProgramDetails.query.filter(ProgramDetails.instructor_id==instructor.id, ProgramDetails.deleted_at==None).all()
 
             # return list of all programs with their id, name, and description
             return jsonify([{
@@ -474,7 +596,9 @@ def cancel_appointment(appointment_id):
             if appointment_datetime > current_time:
                 # Make the appointment available for reservation
                 appointment.status = 'canceled'
+                record_slot_event(appointment)
                 db.session.commit()
+                refresh_dashboards(appointment.host_id, appointment.attendee_id)
                 return jsonify({"message": "Appointment cancelled successfully"}), 200
             else:
                 return jsonify({"error": "Past appointments cannot be cancelled"}), 400
@@ -641,21 +765,26 @@ def post_instructor_availabilities(course_id):
             isDropins = data.get('isDropins')
             program_id = data.get('program_id')
 
-            availabilities_to_delete = Availability.query.filter_by(program_id=program_id).all()
+            # replace (default) rewrites the program's whole schedule, reconcile only touches rows that changed
+            if data.get('mode', request.args.get('mode', 'replace')) == 'reconcile':
+                result = reconcile_availabilities(course_id, user_id, program_id, allAvailabilties, physical_location,
+                                                  meeting_url, duration, isDropins, force=bool(data.get('force')))
+                mark_program_stale(program_id)
+                return jsonify(dict(result, message="availability reconciled")), 201
 
-            # delete all past availabilities for the program
-            for availability in availabilities_to_delete:
-                appointments_to_delete = Appointment.query.filter_by(availability_id=availability.id).all()
+            # rows expanded from recurrence rules are managed by their rule
+            availabilities_to_delete = [availability_id for (availability_id,) in db.session.query(Availability.id).filter_by(
+                program_id=program_id, rule_id=None)]
 
-                # delete all past appointments for the availability
-                for appointment in appointments_to_delete:
-                    db.session.delete(appointment)
-
-                db.session.delete(availability)
+            # delete all past availabilities for the program with their appointments
+            record_availabilities_deleted(availabilities_to_delete)
+            delete_availabilities(availabilities_to_delete)
+            db.session.commit()
 
             # add availabilities to the Availability Table
             for availabilityEntry in allAvailabilties:
                 add_instructor_availability(course_id, user_id, availabilityEntry, physical_location, meeting_url, duration, isDropins)
+            mark_program_stale(program_id)
 
             return jsonify({"message": "all availability added successfully"}), 201
         else:
@@ -682,60 +811,34 @@ def update_availability_status():
         availability = Availability.query.filter_by(id=availability_id, user_id=user_id).first()
 
         if availability:
-            parsed_appointment_date = datetime.strptime(availability.date, '%Y-%m-%d')
-            start_of_week, end_of_week = get_week_range(availability.date)
-
             # set all appointments to inactive if availability is set to inactive
             if status == 'inactive':
                 availability.status = status
-                appointments = Appointment.query.filter_by(availability_id=availability_id, status='posted').all()
-                for appointment in appointments:
-                    appointment.status = 'inactive'
+                db.session.execute(update(Appointment).where(
+                    Appointment.availability_id == availability.id, Appointment.status == 'posted'
+                ).values(status='inactive').execution_options(synchronize_session=False))
+                record_availability_event(availability, 'inactive')
+                mark_days_stale(availability.date)
                 db.session.commit()
             # set all appointments to posted if availability is set to active and limits are not reached
             elif status == 'active':
-                # calculate monthly count of reserved and pending appointments
-                monthly_count = Appointment.query.filter(
-                    Appointment.host_id == user_id,
-                    extract('month', func.date(Appointment.appointment_date)) == parsed_appointment_date.month,
-                    extract('year', func.date(Appointment.appointment_date)) == parsed_appointment_date.year,
-                    Appointment.status.in_(['reserved', 'pending'])
-                ).count()
-
-                # calculate weekly count of reserved and pending appointments
-                weekly_count = Appointment.query.filter(
-                    Appointment.host_id == user_id,
-                    func.date(Appointment.appointment_date).between(start_of_week, end_of_week),
-                    Appointment.status.in_(['reserved', 'pending'])
-                ).count()
-
-                # calculate daily count of reserved and pending appointments
-                daily_count = Appointment.query.filter(
-                    Appointment.host_id == user_id,
-                    func.date(Appointment.appointment_date) == parsed_appointment_date,
-                    Appointment.status.in_(['reserved', 'pending'])
-                ).count()
-
                 program = ProgramDetails.query.filter_by(id=availability.program_id).first()
 
-                error_message = "Meeting limit reached"
-
-                # compare calculations and limits
-                if program.max_monthly_meetings is not None and monthly_count >= program.max_monthly_meetings:
-                    error_message = "Monthly meeting limit reached"
-                elif program.max_weekly_meetings is not None and weekly_count >= program.max_weekly_meetings:
-                    error_message = "Weekly meeting limit reached"
-                elif program.max_daily_meetings is not None and daily_count >= program.max_daily_meetings:
-                    error_message = "Daily meeting limit reached"
+                # compare per-period counts of reserved and pending appointments with the limits
+                limits = program_limits(program)
+                counts = booked_counts([availability.user_id], availability.date, availability.date)
+                reached = limit_reached(limits, counts[availability.user_id], availability.date)
+                if reached:
+                    return jsonify({"error": f"{reached.capitalize()} meeting limit reached"}), 409
 
-                if error_message != "Meeting limit reached":
-                    return jsonify({"error": error_message}), 409
-
-                appointments = Appointment.query.filter_by(availability_id=availability_id, status='inactive').all()
                 availability.status = status
-                for appointment in appointments:
-                    appointment.status = 'posted'
+                db.session.execute(update(Appointment).where(
+                    Appointment.availability_id == availability.id, Appointment.status == 'inactive'
+                ).values(status='posted').execution_options(synchronize_session=False))
+                record_availability_event(availability, 'posted')
+                mark_days_stale(availability.date)
                 db.session.commit()
+            mark_program_stale(availability.program_id)
             return jsonify({"message": "status updated successfully"}), 200
         else:
             return jsonify({"error": "availability not found"}), 404
@@ -753,8 +856,12 @@ def delete_instructor_availabililty(availability_id):
             availability = Availability.query.get(availability_id)
 
             if availability and availability.user_id == int(instructor_id):
-                db.session.delete(availability)
+                # the instance is expired by the commit and its row gone, keep what is needed afterwards
+                program_id = availability.program_id
+                record_availabilities_deleted([availability.id])
+                delete_availabilities([availability.id])
                 db.session.commit()
+                mark_program_stale(program_id)
                 return jsonify({"message": "delete successful"}), 200
             else:
                 return jsonify({"error": "availability not found"}), 404
@@ -763,4 +870,154 @@ def delete_instructor_availabililty(availability_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+# create a weekly recurring availability rule for a program
+@instructor.route('/instructor/availability/rules', methods=['POST'])
+@jwt_required()
+def create_availability_rule():
+    try:
+        user_id = get_jwt_identity()
+
+        if not is_instructor(user_id):
+            return jsonify({"error": "Instructor not found"}), 404
+
+        data = request.get_json()
+        program_id = data.get('program_id')
+        days = data.get('days')
+        start_date = data.get('start_date')
+        until_date = data.get('until_date')
+        start_time = data.get('start_time')
+        end_time = data.get('end_time')
+        exdates = data.get('exdates')
+
+        program = ProgramDetails.query.filter_by(id=program_id, instructor_id=user_id).first()
+        if not program:
+            return jsonify({"error": "Program not found"}), 404
+
+        validation_result = validate_rule_data(days, start_date, until_date, start_time, end_time, exdates)
+        if validation_result:
+            return validation_result
+
+        new_rule = AvailabilityRule(
+            user_id=user_id,
+            program_id=program_id,
+            days=format_days(parse_days(days)),
+            start_date=start_date,
+            until_date=until_date,
+            start_time=start_time,
+            end_time=end_time,
+            exdates=','.join(parse_exdates(exdates)),
+            status='active',
+            version=1
+        )
+        db.session.add(new_rule)
+        db.session.commit()
+
+        return jsonify({"message": "availability rule created successfully", "rule": format_rule(new_rule)}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+# fetch the availability rules of a program
+@instructor.route('/instructor/availability/rules/<int:program_id>', methods=['GET'])
+@jwt_required()
+def get_availability_rules(program_id):
+    try:
+        user_id = get_jwt_identity()
+
+        if not is_instructor(user_id):
+            return jsonify({"error": "Instructor not found"}), 404
+
+        rules = AvailabilityRule.query.filter_by(program_id=program_id, user_id=user_id).all()
+        return jsonify({"rules": [format_rule(rule) for rule in rules]}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# edit a rule; unbooked future windows are dropped and re-expanded from the new version
+@instructor.route('/instructor/availability/rules/<int:rule_id>/update', methods=['POST'])
+@jwt_required()
+def update_availability_rule(rule_id):
+    try:
+        user_id = get_jwt_identity()
+
+        if not is_instructor(user_id):
+            return jsonify({"error": "Instructor not found"}), 404
+
+        rule = AvailabilityRule.query.filter_by(id=rule_id, user_id=user_id).first()
+        if not rule:
+            return jsonify({"error": "rule not found"}), 404
+
+        data = request.get_json()
+        days = data.get('days', rule.days)
+        start_date = data.get('start_date', rule.start_date)
+        until_date = data.get('until_date', rule.until_date)
+        start_time = data.get('start_time', rule.start_time)
+        end_time = data.get('end_time', rule.end_time)
+        exdates = data.get('exdates', rule.exdates)
+        status = data.get('status', rule.status)
+
+        validation_result = validate_rule_data(days, start_date, until_date, start_time, end_time, exdates)
+        if validation_result:
+            return validation_result
+        if status not in RULE_STATUSES:
+            return jsonify({"error": f"status must be one of {', '.join(RULE_STATUSES)}"}), 400
+
+        rule.days = format_days(parse_days(days))
+        rule.start_date = start_date
+        rule.until_date = until_date
+        rule.start_time = start_time
+        rule.end_time = end_time
+        rule.exdates = ','.join(parse_exdates(exdates))
+        rule.status = status
+        rule.version = (rule.version or 1) + 1
+        cleared = clear_unbooked_future(rule)
+        db.session.commit()
+
+        return jsonify({"message": "availability rule updated successfully", "rule": format_rule(rule), "cleared": cleared}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+# delete a rule and its unbooked future windows; booked appointments are kept
+@instructor.route('/instructor/availability/rules/<int:rule_id>', methods=['DELETE'])
+@jwt_required()
+def delete_availability_rule(rule_id):
+    try:
+        user_id = get_jwt_identity()
+
+        if not is_instructor(user_id):
+            return jsonify({"error": "Instructor not found"}), 404
+
+        rule = AvailabilityRule.query.filter_by(id=rule_id, user_id=user_id).first()
+        if not rule:
+            return jsonify({"error": "rule not found"}), 404
+
+        clear_unbooked_future(rule)
+        Availability.query.filter_by(rule_id=rule.id).update({'rule_id': None}, synchronize_session=False)
+        db.session.delete(rule)
+        db.session.commit()
+        return jsonify({"message": "delete successful"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+# preview the concrete windows of a rule for a date range without writing anything
+@instructor.route('/instructor/availability/rules/<int:rule_id>/windows', methods=['GET'])
+@jwt_required()
+def get_availability_rule_windows(rule_id):
+    try:
+        user_id = get_jwt_identity()
+
+        if not is_instructor(user_id):
+            return jsonify({"error": "Instructor not found"}), 404
+
+        rule = AvailabilityRule.query.filter_by(id=rule_id, user_id=user_id).first()
+        if not rule:
+            return jsonify({"error": "rule not found"}), 404
+
+        window_from = request.args.get('from', datetime.now().strftime('%Y-%m-%d'))
+        window_to = request.args.get('to', (datetime.now() + timedelta(days=14)).strftime('%Y-%m-%d'))
+        return jsonify({"windows": expand_rule(rule, window_from, window_to)}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,93 @@
+"""
+ * json_provider.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the JSON provider used by jsonify and request.get_json. It
+ * serializes with orjson when that package is installed and falls back to
+ * the stdlib json module otherwise (or when orjson rejects a value, such
+ * as an integer over 64 bits). Both paths write datetimes in ISO 8601,
+ * with naive datetimes treated as UTC since the models store utcnow, so
+ * clients get the same timestamps whichever encoder runs.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+import json
+import os
+from datetime import date, datetime, time, timezone
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# ISO 8601 text of a date, time or datetime, UTC written as "Z"
+def iso_format(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        text = value.isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    return value.isoformat()
+
+class FastJSONProvider(DefaultJSONProvider):
+    def __init__(self, app):
+        super().__init__(app)
+        app.config.setdefault('JSON_FAST_ENCODER', os.environ.get('JSON_FAST_ENCODER', 'true').lower() == 'true')
+        self.fast = orjson is not None and app.config['JSON_FAST_ENCODER']
+
+    # values neither encoder handles natively, dates first so both paths agree
+    @staticmethod
+    def default(o):
+        if isinstance(o, (datetime, date, time)):
+            return iso_format(o)
+        return DefaultJSONProvider.default(o)
+
+    def options(self, pretty=False):
+        option = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    # bytes from orjson, None when it is unavailable or rejects the value
+    def fast_dumps(self, obj, pretty=False):
+        if not self.fast:
+            return None
+        try:
+            return orjson.dumps(obj, default=self.default, option=self.options(pretty))
+        except orjson.JSONEncodeError:
+            return None
+
+    # stdlib json takes over whenever json.dumps arguments are passed
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            data = self.fast_dumps(obj)
+            if data is not None:
+                return data.decode('utf-8')
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.fast and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    # jsonify: encode straight to bytes, pretty printed in debug like Flask's provider
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        data = self.fast_dumps(obj, pretty)
+        if data is None:
+            return super().response(obj)
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)
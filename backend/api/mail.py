@@ -12,8 +12,6 @@
 # using SendGrid's Python Library
 # https://github.com/sendgrid/sendgrid-python
 import os
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Attachment, FileContent, FileName, FileType, Disposition
 from dotenv import load_dotenv
 import base64
 
@@ -25,6 +23,10 @@ load_dotenv()
         
 # push email object to SendGrid API
 def send_email(to_email, subject, html_content, ics_data):
+    # imported on first use to keep sendgrid out of worker startup
+    from sendgrid import SendGridAPIClient
+    from sendgrid.helpers.mail import Mail, Attachment, FileContent, FileName, FileType, Disposition
+
     # Create an email message
     message = Mail(
         from_email=os.environ.get('FROM_EMAIL'),
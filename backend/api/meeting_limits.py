@@ -0,0 +1,213 @@
+"""
+ * meeting_limits.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the daily, weekly and monthly meeting limit checks. Limits are
+ * evaluated when slots are read or booked from per-period counts of the
+ * host's reserved and pending appointments (one grouped query), instead
+ * of flipping every remaining slot of the period to inactive when a
+ * limit is hit. Slot listings mark every candidate date of the window in
+ * one array pass (NumPy when installed, plain Python otherwise), so the
+ * slots they return are the ones a reservation will accept.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import func, and_, or_, not_
+from .models import Appointment
+from . import db
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# checked in this order, so the widest exhausted period is the one reported
+PERIODS = ['monthly', 'weekly', 'daily']
+
+# past the last date any slot is posted for, closes ranges of a listing without an end date
+LAST_DATE = '9999-12-31'
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# a limit from ProgramDetails, None when unset or not a number
+def as_limit(value):
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+def program_limits(program):
+    return {
+        'daily': as_limit(program.max_daily_meetings),
+        'weekly': as_limit(program.max_weekly_meetings),
+        'monthly': as_limit(program.max_monthly_meetings),
+    }
+
+def has_limits(limits):
+    return any(limit is not None for limit in limits.values())
+
+# first and last date of the day, week (Monday to Sunday) or month containing date
+def period_range(date, period):
+    day = datetime.strptime(date, '%Y-%m-%d').date()
+    if period == 'daily':
+        start, end = day, day
+    elif period == 'weekly':
+        start = day - timedelta(days=day.weekday())
+        end = start + timedelta(days=6)
+    else:
+        start = day.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+# key of the period containing date, used to total the per-date counts
+def period_key(date, period):
+    return period_range(date, period)[0]
+
+# reserved and pending appointments per (host, date) as {host_id: {date: count}}, one grouped query
+# the range is widened to whole weeks and months so every period touching it is fully counted
+def booked_counts(host_ids, date_from, date_to=None):
+    date_from = min(period_range(date_from, 'weekly')[0], period_range(date_from, 'monthly')[0])
+    filters = [
+        Appointment.host_id.in_(host_ids),
+        Appointment.status.in_(['reserved', 'pending']),
+        Appointment.appointment_date >= date_from
+    ]
+    if date_to:
+        filters.append(Appointment.appointment_date <= max(period_range(date_to, 'weekly')[1],
+                                                           period_range(date_to, 'monthly')[1]))
+
+    counts = {host_id: {} for host_id in host_ids}
+    rows = db.session.query(Appointment.host_id, Appointment.appointment_date, func.count(Appointment.id)).filter(
+        *filters).group_by(Appointment.host_id, Appointment.appointment_date)
+    for host_id, date, count in rows:
+        counts.setdefault(host_id, {})[date] = count
+    return counts
+
+# per-period totals of one host's {date: count}
+def period_totals(counts):
+    totals = {period: {} for period in PERIODS}
+    for date, count in counts.items():
+        for period in PERIODS:
+            key = period_key(date, period)
+            totals[period][key] = totals[period].get(key, 0) + count
+    return totals
+
+# the exhausted period ('monthly', 'weekly', 'daily') for a booking on date, or None
+def limit_reached(limits, counts, date):
+    totals = period_totals(counts)
+    for period in PERIODS:
+        if limits[period] is not None and totals[period].get(period_key(date, period), 0) >= limits[period]:
+            return period
+    return None
+
+# every date from date_from through date_to
+def date_span(date_from, date_to):
+    day = datetime.strptime(date_from, '%Y-%m-%d').date()
+    last = datetime.strptime(date_to, '%Y-%m-%d').date()
+    dates = []
+    while day <= last:
+        dates.append(day.strftime('%Y-%m-%d'))
+        day += timedelta(days=1)
+    return dates
+
+# day, week and month key of each date, so dates of the same period share a key
+def numpy_period_keys(dates):
+    days = numpy.array(dates, dtype='datetime64[D]')
+    ordinals = days.astype(numpy.int64)
+    # day 0 (1970-01-01) is a Thursday, shift by 3 to count weekdays from Monday
+    return {
+        'daily': ordinals,
+        'weekly': ordinals - (ordinals + 3) % 7,
+        'monthly': days.astype('datetime64[M]').astype(numpy.int64),
+    }
+
+def python_period_keys(dates):
+    days = [datetime.strptime(date, '%Y-%m-%d').date() for date in dates]
+    return {
+        'daily': [day.toordinal() for day in days],
+        'weekly': [day.toordinal() - day.weekday() for day in days],
+        'monthly': [day.year * 12 + day.month for day in days],
+    }
+
+# whether each candidate date still takes a booking, for one host's {date: count}
+def bookable_mask(limits, counts, dates):
+    if numpy is not None:
+        return numpy_bookable_mask(limits, counts, dates)
+    return python_bookable_mask(limits, counts, dates)
+
+def numpy_bookable_mask(limits, counts, dates):
+    bookable = numpy.ones(len(dates), dtype=bool)
+    if not dates:
+        return bookable
+    candidate_keys = numpy_period_keys(dates)
+    booked_keys = numpy_period_keys(list(counts)) if counts else None
+    booked = numpy.array(list(counts.values()), dtype=numpy.int64)
+
+    for period in PERIODS:
+        if limits[period] is None:
+            continue
+        totals = numpy.zeros(len(dates), dtype=numpy.int64)
+        if booked_keys is not None:
+            # total the bookings per period, then look each candidate's period up in the sorted keys
+            keys, inverse = numpy.unique(booked_keys[period], return_inverse=True)
+            sums = numpy.bincount(inverse, weights=booked).astype(numpy.int64)
+            positions = numpy.minimum(numpy.searchsorted(keys, candidate_keys[period]), len(keys) - 1)
+            totals = numpy.where(keys[positions] == candidate_keys[period], sums[positions], 0)
+        bookable &= totals < limits[period]
+    return bookable
+
+def python_bookable_mask(limits, counts, dates):
+    bookable = [True] * len(dates)
+    candidate_keys = python_period_keys(dates)
+    booked_keys = python_period_keys(list(counts))
+    booked = list(counts.values())
+
+    for period in PERIODS:
+        if limits[period] is None:
+            continue
+        sums = {}
+        for key, count in zip(booked_keys[period], booked):
+            sums[key] = sums.get(key, 0) + count
+        bookable = [ok and sums.get(key, 0) < limits[period] for ok, key in zip(bookable, candidate_keys[period])]
+    return bookable
+
+# (start, end) runs of dates from date_from through date_to (open ended without) in which no more
+# appointments can be booked, only dates up to the end of the last period with bookings are marked
+# since later ones are blocked by a limit of 0 alone
+def blocked_ranges(limits, counts, date_from, date_to=None):
+    date_to = date_to or LAST_DATE
+    last_counted = max([date_from] + [max(period_range(date, 'weekly')[1], period_range(date, 'monthly')[1])
+                                      for date in counts])
+    dates = date_span(date_from, min(date_to, last_counted))
+    mask = bookable_mask(limits, counts, dates)
+
+    ranges, start = [], None
+    for date, bookable in zip(dates, mask):
+        if not bookable and start is None:
+            start = date
+        elif bookable and start is not None:
+            ranges.append((start, previous))
+            start = None
+        previous = date
+    if start is not None:
+        closed = any(limit is not None and limit <= 0 for limit in limits.values())
+        ranges.append((start, date_to if closed else previous))
+    return ranges
+
+# filter dropping appointments whose date falls in any of the blocked ranges
+def outside_ranges(ranges):
+    if not ranges:
+        return None
+    return not_(or_(*[Appointment.appointment_date.between(start, end) for start, end in ranges]))
+
+# filter dropping appointments of programs whose host has reached a limit, for {program_id: ranges}
+def outside_program_ranges(program_column, ranges_by_program):
+    conditions = [and_(program_column == program_id, Appointment.appointment_date.between(start, end))
+                  for program_id, ranges in ranges_by_program.items() for start, end in ranges]
+    return not_(or_(*conditions)) if conditions else None
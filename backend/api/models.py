@@ -17,7 +17,7 @@ class User(db.Model):
     account_type=db.Column(db.String(50)) # student, instructor, admin
     status = db.Column(db.String(50)) # pending, active, inactive
     email = db.Column(db.String(150), unique=True)
-    password = db.Column(db.String(150))
+    password = db.Column(db.String(255))
     title = db.Column(db.String(10))
     name = db.Column(db.String(150))
     pronouns = db.Column(db.String(150))
@@ -36,6 +36,7 @@ class CourseDetails(db.Model):
     recordings_link = db.Column(db.String(255))
     discord_link = db.Column(db.String(255))
     comments = db.Column(db.Text)
+    times_version = db.Column(db.Integer, default=0)  # bumped whenever CourseTimes change, keys schedule caches
     times = db.relationship("CourseTimes", back_populates="course_details")
 
 class CourseTimes(db.Model):
@@ -66,6 +67,8 @@ class ProgramDetails(db.Model):
     max_monthly_meetings = db.Column(db.Integer)
     isDropins = db.Column(db.Boolean)
     isRangeBased = db.Column(db.Boolean)
+    deleted_at = db.Column(db.DateTime)  # set by a soft delete until the background purge removes the program
+    times_version = db.Column(db.Integer, default=0)  # bumped whenever ProgramTimes change, keys schedule caches
     availability = db.relationship("Availability", back_populates="program_details")
     program_times = db.relationship("ProgramTimes", back_populates="program_details")
 
@@ -85,12 +88,31 @@ class Availability(db.Model):
     start_time = db.Column(db.String(150))  # YYYY-MM-DDTHH:MM:SS
     end_time = db.Column(db.String(150))  # YYYY-MM-DDTHH:MM:SS
     status = db.Column(db.String(50))  # active, inactive
+    rule_id = db.Column(db.Integer, db.ForeignKey('availability_rule.id'), index=True)  # set when created from a recurrence rule
     appointments = db.relationship(
         'Appointment', 
         back_populates='availability', 
         cascade='all, delete-orphan'
     )
     program_details = db.relationship("ProgramDetails", back_populates="availability")
+    __table_args__ = (
+        db.Index('ix_availability_user_date', 'user_id', 'date'),
+        db.Index('ix_availability_rule_date', 'rule_id', 'date', unique=True),  # one materialized row per rule and date
+    )
+
+class AvailabilityRule(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    program_id = db.Column(db.Integer, db.ForeignKey('program_details.id'))
+    days = db.Column(db.String(50))  # BYDAY list, e.g. MO,WE
+    start_date = db.Column(db.String(150))  # YYYY-MM-DD
+    until_date = db.Column(db.String(150))  # YYYY-MM-DD
+    start_time = db.Column(db.String(150))  # HH:MM
+    end_time = db.Column(db.String(150))  # HH:MM
+    exdates = db.Column(db.Text)  # comma separated YYYY-MM-DD
+    status = db.Column(db.String(50))  # active, inactive
+    version = db.Column(db.Integer, default=1)  # bumped on every edit, keys expansion caches
+    materialized_through = db.Column(db.String(150))  # YYYY-MM-DD, last date with Availability rows
 
 class Appointment(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -107,6 +129,13 @@ class Appointment(db.Model):
     status = db.Column(db.String(50))  # posted, booked, cancelled
     availability = db.relationship('Availability', back_populates='appointments')
     appointment_comment = db.relationship('AppointmentComment', backref='appointment', cascade='all, delete-orphan')
+    __table_args__ = (
+        db.Index('ix_appointment_host_date', 'host_id', 'appointment_date'),
+        db.Index('ix_appointment_status_date', 'status', 'appointment_date', 'start_time'),
+        db.Index('ix_appointment_availability_id', 'availability_id'),
+        db.Index('ix_appointment_attendee_date', 'attendee_id', 'appointment_date'),
+        db.Index('ix_appointment_date_start', 'appointment_date', 'start_time'),
+    )
     
 class AppointmentComment(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -124,4 +153,51 @@ class Feedback(db.Model):
     attendee_rating = db.Column(db.String(255))
     attendee_notes = db.Column(db.Text)
     host_rating = db.Column(db.String(255))
-    host_notes = db.Column(db.Text)
\ No newline at end of file
+    host_notes = db.Column(db.Text)
+
+class FeedbackAggregate(db.Model):
+    scope = db.Column(db.String(20), primary_key=True)  # host or program
+    scope_id = db.Column(db.Integer, primary_key=True)  # user id of the host or program id
+    rating = db.Column(db.String(20), primary_key=True)  # attendee (ratings given by students) or host
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)  # sum of the 1 to 5 scores
+    score_1 = db.Column(db.Integer, nullable=False, default=0)
+    score_2 = db.Column(db.Integer, nullable=False, default=0)
+    score_3 = db.Column(db.Integer, nullable=False, default=0)
+    score_4 = db.Column(db.Integer, nullable=False, default=0)
+    score_5 = db.Column(db.Integer, nullable=False, default=0)
+
+class RosterSync(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('course_details.id'), unique=True)
+    cursor = db.Column(db.String(255))  # opaque position returned by the roster source
+    etag = db.Column(db.String(255))
+    last_synced_at = db.Column(db.DateTime)
+    last_added = db.Column(db.Integer, default=0)
+    last_dropped = db.Column(db.Integer, default=0)
+
+class DashboardView(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    payload = db.Column(db.Text)  # JSON document served by /dashboard
+    built_for = db.Column(db.String(150))  # YYYY-MM-DD (PST) the payload was built on, rebuilt once the day changes
+    stale = db.Column(db.Boolean, default=False)  # set by writes touching many users, rebuilt on the next read
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class UtilizationDay(db.Model):
+    scope = db.Column(db.String(100), primary_key=True)  # host:program:course filters of the report
+    day = db.Column(db.String(150), primary_key=True, index=True)  # YYYY-MM-DD, always before today (PST)
+    rows = db.Column(db.Text)  # JSON [[program_id, hour, slots, bookings, no_shows, cancellations, closed]]
+    built_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SlotEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    program_id = db.Column(db.Integer)  # ids are not foreign keys, events outlive the rows they name
+    course_id = db.Column(db.Integer)  # None for global programs
+    instructor_id = db.Column(db.Integer)
+    availability_id = db.Column(db.Integer)
+    appointment_id = db.Column(db.Integer)  # None when the event covers every slot of the availability
+    date = db.Column(db.String(150))  # YYYY-MM-DD
+    start_time = db.Column(db.String(150))  # HH:MM
+    end_time = db.Column(db.String(150))  # HH:MM
+    status = db.Column(db.String(50))  # the slots' new status
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
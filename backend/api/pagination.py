@@ -0,0 +1,65 @@
+"""
+ * pagination.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the keyset (cursor) pagination helpers used by the slot
+ * listing endpoints. Slots are ordered by (appointment_date, start_time,
+ * id) and a cursor is the opaque encoding of the last row returned, so a
+ * page is one indexed range scan however deep the client pages.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+import base64
+import json
+from sqlalchemy import or_, and_
+from .models import Appointment
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# opaque cursor for the last appointment of a page
+def encode_cursor(appointment_date, start_time, appointment_id):
+    raw = json.dumps([appointment_date, start_time, appointment_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+# (appointment_date, start_time, id) from a cursor, raising ValueError when malformed
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        appointment_date, start_time, appointment_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return str(appointment_date), str(start_time), int(appointment_id)
+    except Exception:
+        raise ValueError("invalid cursor")
+
+# filter matching appointments strictly after the cursor position
+def after_cursor(appointment_date, start_time, appointment_id):
+    return or_(
+        Appointment.appointment_date > appointment_date,
+        and_(Appointment.appointment_date == appointment_date, or_(
+            Appointment.start_time > start_time,
+            and_(Appointment.start_time == start_time, Appointment.id > appointment_id)
+        ))
+    )
+
+def slot_order():
+    return (Appointment.appointment_date, Appointment.start_time, Appointment.id)
+
+# clamp a ?limit= value to [1, maximum], raising ValueError when not a number
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    if value in (None, ''):
+        return default
+    return max(1, min(int(value), maximum))
+
+# split limit + 1 fetched rows into the page and the cursor for the next one
+def paginate(rows, limit, key):
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(*key(page[-1]))
@@ -0,0 +1,185 @@
+"""
+ * passwords.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the password hashing pool. scrypt hashing runs on a bounded
+ * process pool so login bursts don't pin the request threads, and new
+ * work is refused with HashingPoolSaturated once PASSWORD_HASH_MAX_PENDING
+ * hashes are queued, every password of a batch counting as one. Pool
+ * processes are started from a forkserver rather than forked from a
+ * request thread. Hash parameters come from the app config; hashes
+ * stored with older parameters are upgraded on the next successful login.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# raised when the pool already has PASSWORD_HASH_MAX_PENDING hashes queued
+class HashingPoolSaturated(Exception):
+    def __init__(self, retry_after):
+        super().__init__("password hashing pool is saturated")
+        self.retry_after = retry_after
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# split a stored werkzeug hash into its method string and salt
+def parse_password_hash(pwhash):
+    try:
+        method, salt, _ = pwhash.split('$', 2)
+        return method, salt
+    except (AttributeError, ValueError):
+        return None, None
+
+class PasswordHasher:
+    def __init__(self, app=None):
+        self.method = 'scrypt:32768:8:1'
+        self.salt_length = 16
+        self.workers = os.cpu_count() or 1
+        self.max_pending = self.workers * 4
+        self.retry_after = 2
+        self.executor = None
+        self.executor_lock = threading.Lock()
+        self.pending = None
+        self.metrics_lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.recent_ms = deque(maxlen=1000)
+        if app is not None:
+            self.init_app(app)
+
+    # read the hash parameters and pool limits from the environment
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD', os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1'))
+        app.config.setdefault('PASSWORD_SALT_LENGTH', int(os.environ.get('PASSWORD_SALT_LENGTH', 16)))
+        app.config.setdefault('PASSWORD_HASH_WORKERS', int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)))
+        app.config.setdefault('PASSWORD_HASH_MAX_PENDING', int(os.environ.get('PASSWORD_HASH_MAX_PENDING', app.config['PASSWORD_HASH_WORKERS'] * 4)))
+        app.config.setdefault('PASSWORD_HASH_RETRY_AFTER', int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', 2)))
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.salt_length = app.config['PASSWORD_SALT_LENGTH']
+        self.workers = app.config['PASSWORD_HASH_WORKERS']
+        self.max_pending = app.config['PASSWORD_HASH_MAX_PENDING']
+        self.retry_after = app.config['PASSWORD_HASH_RETRY_AFTER']
+        self.pending = threading.BoundedSemaphore(max(self.max_pending, 1))
+        app.extensions['password_hasher'] = self
+
+    # hash on the calling thread, used by CLI commands
+    def generate_inline(self, password):
+        return generate_password_hash(password, method=self.method, salt_length=self.salt_length)
+
+    # pool is created on first use so app startup doesn't spawn processes
+    # forking a threaded worker could copy locks held by other threads, so processes come from a forkserver
+    def get_executor(self):
+        with self.executor_lock:
+            if self.executor is None:
+                start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                    mp_context=multiprocessing.get_context(start_method))
+            return self.executor
+
+    # take count pending slots, giving back the ones taken when the pool is saturated
+    def acquire_slots(self, count):
+        if self.pending is None:
+            self.pending = threading.BoundedSemaphore(max(self.max_pending, 1))
+        for taken in range(count):
+            if not self.pending.acquire(blocking=False):
+                self.release_slots(taken)
+                raise HashingPoolSaturated(self.retry_after)
+
+    def release_slots(self, count):
+        for _ in range(count):
+            self.pending.release()
+
+    # run fn on the pool (or inline when PASSWORD_HASH_WORKERS is 0) and record its latency
+    def run(self, fn, *args):
+        self.acquire_slots(1)
+
+        start = time.perf_counter()
+        try:
+            if self.workers > 0:
+                return self.get_executor().submit(fn, *args).result()
+            return fn(*args)
+        finally:
+            self.release_slots(1)
+            self.record_latency((time.perf_counter() - start) * 1000)
+
+    def record_latency(self, elapsed_ms):
+        with self.metrics_lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self.recent_ms.append(elapsed_ms)
+
+    def hash_password(self, password):
+        return self.run(generate_password_hash, password, self.method, self.salt_length)
+
+    # hash a batch spread across every pool worker, used by roster imports
+    # the batch goes a chunk of one password per worker at a time, each holding a pending slot while hashed
+    def hash_passwords(self, passwords):
+        passwords = list(passwords)
+        hashes = []
+        size = max(1, min(self.workers, self.max_pending))
+        for offset in range(0, len(passwords), size):
+            chunk = passwords[offset:offset + size]
+            self.acquire_slots(len(chunk))
+
+            start = time.perf_counter()
+            try:
+                if self.workers > 0:
+                    hashes.extend(self.get_executor().map(generate_password_hash, chunk, repeat(self.method, len(chunk)),
+                                                          repeat(self.salt_length, len(chunk))))
+                else:
+                    hashes.extend(generate_password_hash(password, self.method, self.salt_length) for password in chunk)
+            finally:
+                self.release_slots(len(chunk))
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                for _ in chunk:
+                    self.record_latency(elapsed_ms / len(chunk))
+        return hashes
+
+    def check_password(self, pwhash, password):
+        return self.run(check_password_hash, pwhash, password)
+
+    # True when a stored hash was made with a different method or a shorter salt than configured
+    def needs_rehash(self, pwhash):
+        method, salt = parse_password_hash(pwhash)
+        if method is None:
+            return False
+        return method != self.method or len(salt) < self.salt_length
+
+    # hashing latency summary, including queue wait
+    def metrics(self):
+        with self.metrics_lock:
+            recent = sorted(self.recent_ms)
+            count = self.count
+            total_ms = self.total_ms
+            max_ms = self.max_ms
+
+        def percentile(p):
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))], 2)
+
+        return {
+            'count': count,
+            'avg_ms': round(total_ms / count, 2) if count else None,
+            'max_ms': round(max_ms, 2),
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'method': self.method,
+            'salt_length': self.salt_length,
+        }
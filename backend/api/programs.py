@@ -9,12 +9,16 @@
  *
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func, insert, update, delete
 from .models import ProgramDetails, User, Appointment, Availability, ProgramTimes, CourseDetails, CourseMembers, AppointmentComment, Feedback, CourseTimes
-from . import db
+from . import db, response_cache
+from .response_cache import identity_scope, program_tags
 from .user import is_instructor
+from .cascades import purge_program, soft_delete_program, purge_in_background
+from .dashboard import mark_stale, program_audience
+from .slot_stream import record_program_event
 
 programs = Blueprint('programs', __name__)
 
@@ -42,6 +46,54 @@ def get_course_name(course_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# cache tags of a course's program list: the course and its instructor's global programs
+def course_program_tags(course_id):
+    course = CourseDetails.query.get(course_id)
+    return [f"course:{course_id}"] + ([f"instructor:{course.instructor_id}"] if course else [])
+
+# cache tags of the calling instructor's program times
+def instructor_program_tags(**kwargs):
+    return [f"instructor:{get_jwt_identity()}"]
+
+# diff a {owner_id: {day: {start_time, end_time}}} body against the stored weekly times of one course or program
+# only the owner's own entry is read, the program page posts the times of every program in the course
+# inserts, updates and deletes go out as bulk statements with the owner's times_version bump, in one commit
+def sync_weekly_times(times_model, owner_column, owner_model, owner_id, data):
+    desired = {}
+    for day, timings in (data.get(str(owner_id)) or {}).items():
+        desired[day] = (timings['start_time'], timings['end_time'])
+
+    existing = {}
+    duplicates = []
+    for time in times_model.query.filter(owner_column == owner_id).order_by(times_model.id):
+        if time.day in existing:
+            duplicates.append(time.id)
+        else:
+            existing[time.day] = time
+
+    inserts = [{owner_column.key: owner_id, 'day': day, 'start_time': start_time, 'end_time': end_time}
+               for day, (start_time, end_time) in desired.items() if day not in existing]
+    updates = [{'id': existing[day].id, 'start_time': start_time, 'end_time': end_time}
+               for day, (start_time, end_time) in desired.items()
+               if day in existing and (existing[day].start_time, existing[day].end_time) != (start_time, end_time)]
+    deletes = [time.id for day, time in existing.items() if day not in desired] + duplicates
+
+    changed = bool(inserts or updates or deletes)
+    if changed:
+        if inserts:
+            db.session.execute(insert(times_model), inserts)
+        if updates:
+            db.session.execute(update(times_model), updates)
+        if deletes:
+            db.session.execute(delete(times_model).where(times_model.id.in_(deletes))
+                               .execution_options(synchronize_session=False))
+        db.session.execute(update(owner_model).where(owner_model.id == owner_id)
+                           .values(times_version=func.coalesce(owner_model.times_version, 0) + 1))
+    db.session.commit()
+
+    version = db.session.query(owner_model.times_version).filter(owner_model.id == owner_id).scalar() or 0
+    return {'inserted': len(inserts), 'updated': len(updates), 'deleted': len(deletes), 'times_version': version}
+
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 ""               Endpoint Functions                ""
 """""""""""""""""""""""""""""""""""""""""""""""""""""
@@ -109,6 +161,7 @@ def set_course_details():
             course.comments = comments
 
             db.session.commit()
+            response_cache.invalidate(f"course:{course.id}", f"instructor:{course.instructor_id}")
             
             return jsonify({"message": "Course details updated successfully"}), 200
         else:
@@ -157,64 +210,32 @@ def get_course_times(course_id):
 def set_course_times(course_id):
     try:
         data = request.get_json()
-        courseTimesTuples = []
 
         if data is not None:
-            # set times for course
-            courses = CourseTimes.query.filter_by(course_id=course_id).all()
-        
-            # if course already exists, delete the existing times
-            if courses:
-                for course in courses:
-                    db.session.delete(course)
-                db.session.commit()
-
-            # add the new times
-            if len(data) > 0:
-                converted_list = []
-                for course_id, schedule in data.items():
-
-                    # get attributes
-                    for day, timings in schedule.items():
-                        start_time = timings['start_time']
-                        end_time = timings['end_time']
-                        converted_list.append((day, start_time, end_time, course_id))
-
-                for entry in converted_list:
-                    # create a new CourseTimes tuple
-                    new_time = CourseTimes(
-                        day=entry[0],
-                        start_time=entry[1],
-                        end_time=entry[2],
-                        course_id=entry[3],
-                    )
-
-                    # append the new tuple to the list
-                    courseTimesTuples.append(new_time)
-                
-                # for each tuple, add it to the CourseTimes Table
-                for courseTimesTuple in courseTimesTuples:
-                    db.session.add(courseTimesTuple)
-                db.session.commit()
-                return jsonify({"message": "Times updated successfully"}), 200
-            
-            # set no times for course
-            else:
-                return jsonify({"message": "Times updated successfully: No times for course"}), 200
+            course = CourseDetails.query.get(course_id)
+            if not course:
+                return jsonify({"error": "Course not found"}), 404
+
+            # apply only the changed days in one transaction
+            changes = sync_weekly_times(CourseTimes, CourseTimes.course_id, CourseDetails, course.id, data)
+            message = "Times updated successfully" if len(data) > 0 else "Times updated successfully: No times for course"
+            return jsonify(dict(changes, message=message)), 200
         else:
             return jsonify({"error": "Times data not found"}), 404
     except Exception as e:
+        db.session.rollback()
         print(e)
         return jsonify({"error": str(e)}), 500
 
 # fetch all of the programs in a course, including global programs for the instructor of the course
 @programs.route('/course/programs/<course_id>', methods=['GET'])
+@response_cache.cached(scope=lambda course_id: course_id, tags=course_program_tags)
 def get_programs(course_id):
     try: 
         course = CourseDetails.query.filter_by(id=course_id).first()
 
         if course:
-            programs = ProgramDetails.query.filter(and_(or_(ProgramDetails.course_id==course_id, ProgramDetails.course_id==None), ProgramDetails.instructor_id==course.instructor_id)).all()
+            programs = ProgramDetails.query.filter(and_(or_(ProgramDetails.course_id==course_id, ProgramDetails.course_id==None), ProgramDetails.instructor_id==course.instructor_id, ProgramDetails.deleted_at==None)).all()
 
             # return the id, name, description, and duration of each program
             return jsonify([{
@@ -231,6 +252,7 @@ def get_programs(course_id):
 # get all of the program times for a course
 @programs.route('/course/programs/times/<course_id>', methods=['GET'])
 @jwt_required()
+@response_cache.cached(scope=identity_scope, tags=instructor_program_tags)
 def get_program_times_in_course(course_id):
     try:
         user_id = get_jwt_identity()
@@ -242,10 +264,10 @@ def get_program_times_in_course(course_id):
 
         # all courses programs
         if course_id == "null":
-            programs = ProgramDetails.query.filter(ProgramDetails.course_id.is_(None), ProgramDetails.instructor_id==instructor.id).all()
+            programs = ProgramDetails.query.filter(ProgramDetails.course_id.is_(None), ProgramDetails.instructor_id==instructor.id, ProgramDetails.deleted_at.is_(None)).all()
         # single course programs
         else:
-            programs = ProgramDetails.query.filter_by(course_id=course_id, instructor_id=instructor.id).all()
+            programs = ProgramDetails.query.filter_by(course_id=course_id, instructor_id=instructor.id, deleted_at=None).all()
         
         if programs:
             # return list of program times
@@ -287,54 +309,21 @@ def set_program_times(program_id):
             return jsonify({"msg": "instructor access required"}), 401
         
         data = request.get_json()
-        program_id = program_id
-        courseTimesTuples = []
 
         if data is not None:
-            # set times for course
-            courses = ProgramTimes.query.filter_by(program_id=program_id).all()
-        
-            # if course already exists, delete the existing times
-            if courses:
-                for course in courses:
-                    db.session.delete(course)
-                db.session.commit()
-
-            # add the new times
-            if len(data) > 0:
-                converted_list = []
-
-                for program_id, schedule in data.items():
-                    # get attributes
-                    for day, timings in schedule.items():
-                        start_time = timings['start_time']
-                        end_time = timings['end_time']
-                        converted_list.append((day, start_time, end_time, program_id))
-
-                for entry in converted_list:
-                    # create a new ProgramTimes tuple
-                    new_time = ProgramTimes(
-                        day=entry[0],
-                        start_time=entry[1],
-                        end_time=entry[2],
-                        program_id=entry[3],
-                    )
-
-                    # append the new tuple to the list
-                    courseTimesTuples.append(new_time)
-                
-                # for each tuple, add it to the CourseTimes Table
-                for courseTimesTuple in courseTimesTuples:
-                    db.session.add(courseTimesTuple)
-                db.session.commit()
-                return jsonify({"message": "Times updated successfully"}), 200
-            
-            # set no times for course
-            else:
-                return jsonify({"message": "Times updated successfully: No times for course"}), 200
+            program = ProgramDetails.query.get(program_id)
+            if not program:
+                return jsonify({"error": "Program not found"}), 404
+
+            # apply only the changed days in one transaction
+            changes = sync_weekly_times(ProgramTimes, ProgramTimes.program_id, ProgramDetails, program.id, data)
+            response_cache.invalidate(*program_tags(program))
+            message = "Times updated successfully" if len(data) > 0 else "Times updated successfully: No times for course"
+            return jsonify(dict(changes, message=message)), 200
         else:
             return jsonify({"error": "Times data not found"}), 404
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": str(e)}), 500
     
 # create a new program
@@ -373,6 +362,7 @@ def create_program():
                 # post to the database
                 db.session.add(new_details)
                 db.session.commit()
+                response_cache.invalidate(*program_tags(new_details))
 
                 # Return the new program ID
                 new_program_id = new_details.id
@@ -392,39 +382,26 @@ def delete_program(program_id):
         if not is_instructor(user_id):
             return jsonify({"msg": "instructor access required"}), 401
 
-        # delete appointments
-        appointments = Appointment.query.join(Availability).filter_by(program_id=program_id).all()
-        for appointment in appointments:
-            comments = AppointmentComment.query.filter_by(appointment_id=appointment.id).all()
-            feedbacks = Feedback.query.filter_by(appointment_id=appointment.id).all()
-
-            # delete comments
-            for comment in comments:
-                db.session.delete(comment)
-
-            # delete feedback
-            for feedback in feedbacks:
-                db.session.delete(feedback)
-
-            db.session.delete(appointment)
-
-        # delete availability
-        availabilities = Availability.query.filter_by(program_id=program_id).all()
-        for availability in availabilities:
-            db.session.delete(availability)
-
-        # delete program_times
-        times = ProgramTimes.query.filter_by(program_id=program_id).all()
-        for time in times:
-            db.session.delete(time)
-
-        # delete program
-        program = ProgramDetails.query.get_or_404(program_id)
-        db.session.delete(program)
-
-        db.session.commit()
+        program = ProgramDetails.query.get(program_id)
+        if not program:
+            return jsonify({"error": "Program not found"}), 404
+
+        # async hides the program immediately and purges its rows on a background thread
+        mode = request.args.get('mode', current_app.config.get('PROGRAM_DELETE_MODE', 'sync'))
+        tags = program_tags(program)
+        record_program_event(program, 'deleted')
+        if mode == 'async':
+            soft_delete_program(program)
+            response_cache.invalidate(*tags)
+            purge_in_background(program_id)
+            return jsonify({"msg": "Program deleted", "purge": "scheduled"}), 202
+
+        # delete appointments, comments, feedback, availabilities, rules, times and the program set-based
+        purge_program(program_id)
+        response_cache.invalidate(*tags)
         return jsonify({"msg": "Program deleted"}), 200
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": str(e)}), 500
     
 # set the program attributes of a already existing program
@@ -469,6 +446,9 @@ def set_program_details():
 
         # if program exists, update the program details
         if program:
+            # the program may move to another course, so both lists are invalidated
+            tags = program_tags(program)
+            previous_course_id = program.course_id
             program.course_id = course_id
             program.name = name
             program.description = description
@@ -481,7 +461,10 @@ def set_program_details():
             program.max_monthly_meetings = max_monthly_meetings
             program.isDropins = isDropins
 
+            # names, locations and drop-in status show on the dashboards of everyone the program reaches
+            mark_stale(program_audience(program.id, {previous_course_id, program.course_id}, program.instructor_id))
             db.session.commit()
+            response_cache.invalidate(*tags, *program_tags(program))
             
             return jsonify({"message": "Program name updated successfully"}), 200
         else:
@@ -524,6 +507,7 @@ def create_course():
         # post to the database
         db.session.add(new_member)
         db.session.commit()
+        response_cache.invalidate(f"user:{user_id}")
 
         return jsonify({"message": "Course created successfully"}), 200
 
@@ -542,7 +526,7 @@ def add_user_to_course():
         user_id = data.get('user_id')
 
         # if course_id and user_id found
-        if course_id & user_id:
+        if course_id and user_id:
             # add the user to the course in the CourseMembers Table
             new_details = CourseMembers(
                 course_id=course_id,
@@ -552,6 +536,7 @@ def add_user_to_course():
             # post to the database
             db.session.add(new_details)
             db.session.commit()
+            response_cache.invalidate(f"user:{user_id}")
             
             return jsonify({"message": "Added to course successfully"}), 200
         else:
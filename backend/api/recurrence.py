@@ -0,0 +1,111 @@
+"""
+ * recurrence.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the RRULE-style recurrence helpers. A weekly rule (days of
+ * the week, a start date, an until date and exception dates) is expanded
+ * into concrete dates only for the window being queried, and expansions
+ * are cached per (rule id, rule version, window).
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+DAY_CODES = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# convert "MO,WE", ["Monday", "Wednesday"] or ["MO", "WE"] into sorted weekday numbers (Monday is 0)
+def parse_days(days):
+    if isinstance(days, str):
+        days = days.split(',')
+
+    weekdays = set()
+    for day in days or []:
+        day = str(day).strip()
+        if day.upper() in DAY_CODES:
+            weekdays.add(DAY_CODES.index(day.upper()))
+        elif day.capitalize() in DAY_NAMES:
+            weekdays.add(DAY_NAMES.index(day.capitalize()))
+        else:
+            raise ValueError(f"unknown day '{day}'")
+    return sorted(weekdays)
+
+# store weekdays in the BYDAY form used by AvailabilityRule.days
+def format_days(weekdays):
+    return ','.join(DAY_CODES[weekday] for weekday in sorted(weekdays))
+
+def parse_exdates(exdates):
+    if not exdates:
+        return ()
+    if isinstance(exdates, str):
+        exdates = exdates.split(',')
+    return tuple(sorted(date.strip() for date in exdates if date and date.strip()))
+
+# every date in [window_from, window_to] matching the rule, as 'YYYY-MM-DD' strings
+@lru_cache(maxsize=2048)
+def expand_dates(rule_id, version, start_date, until_date, days, exdates, window_from, window_to):
+    start = max(start_date, window_from)
+    end = min(until_date, window_to) if until_date else window_to
+    if start > end:
+        return ()
+
+    weekdays = set(parse_days(days))
+    skipped = set(parse_exdates(exdates))
+    current = datetime.strptime(start, '%Y-%m-%d').date()
+    last = datetime.strptime(end, '%Y-%m-%d').date()
+
+    dates = []
+    while current <= last:
+        date_str = current.strftime('%Y-%m-%d')
+        if current.weekday() in weekdays and date_str not in skipped:
+            dates.append(date_str)
+        current += timedelta(days=1)
+    return tuple(dates)
+
+# expand an AvailabilityRule into concrete windows for a date range
+def expand_rule(rule, window_from, window_to):
+    dates = expand_dates(rule.id, rule.version, rule.start_date, rule.until_date, rule.days,
+                         rule.exdates or '', window_from, window_to)
+    return [{'date': date, 'start_time': rule.start_time, 'end_time': rule.end_time} for date in dates]
+
+# split a window into appointment slots of duration minutes (one slot when no duration)
+def split_into_slots(start_time, end_time, duration):
+    start_datetime = datetime.strptime(start_time, "%H:%M")
+    end_datetime = datetime.strptime(end_time, "%H:%M")
+
+    if duration == 0 or not duration:
+        return [(start_datetime.strftime("%H:%M"), end_datetime.strftime("%H:%M"))]
+
+    slots = []
+    while start_datetime + timedelta(minutes=duration) <= end_datetime:
+        slots.append((start_datetime.strftime("%H:%M"), (start_datetime + timedelta(minutes=duration)).strftime("%H:%M")))
+        start_datetime += timedelta(minutes=duration)
+    return slots
+
+# expand weekly ProgramTimes/CourseTimes rows (day name, start, end) into dated windows
+def expand_weekly_times(times, window_from, window_to):
+    by_weekday = {}
+    for time in times:
+        try:
+            weekday = parse_days([time.day])[0]
+        except (ValueError, IndexError):
+            continue
+        by_weekday.setdefault(weekday, []).append(time)
+
+    windows = []
+    current = datetime.strptime(window_from, '%Y-%m-%d').date()
+    last = datetime.strptime(window_to, '%Y-%m-%d').date()
+    while current <= last:
+        for time in by_weekday.get(current.weekday(), []):
+            windows.append({'date': current.strftime('%Y-%m-%d'), 'start_time': time.start_time,
+                            'end_time': time.end_time, 'source': time})
+        current += timedelta(days=1)
+    return windows
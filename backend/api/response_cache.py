@@ -0,0 +1,498 @@
+"""
+ * response_cache.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the response cache for the catalog endpoints. A decorated view
+ * is keyed by endpoint, scope (course id or caller) and query string, and
+ * its 200 responses are kept in a pluggable backend chosen with
+ * RESPONSE_CACHE_BACKEND:
+ *   lru     in-process LRU, one per worker (default for a single process)
+ *   shared  SQLite file under /dev/shm shared by every worker on the host
+ *           (default under gunicorn with several workers, which refuses lru)
+ *   redis   any Redis-protocol server at RESPONSE_CACHE_URL
+ *   none    caching disabled
+ * Entries carry per-entity tags ("course:1", "instructor:2", "user:3")
+ * and write endpoints invalidate the tags they touch. Every tag has a
+ * version, so a response built while its tags were invalidated is never
+ * stored. Backend failures are logged and treated as misses.
+ *
+ * Known Bugs:
+ * - the lru backend only sees invalidations made by its own process, use
+ *   shared or redis when CLI commands write
+ *
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode, urlparse
+from flask import request, make_response, current_app
+from flask_jwt_extended import get_jwt_identity
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'rc:'
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# default location of the shared backend, in memory where /dev/shm exists
+def default_shared_path():
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(directory, 'scheduling-tools-response-cache.sqlite3')
+
+# a 200 response as bytes: "status mimetype" line followed by the body
+def encode_response(response):
+    return f"{response.status_code} {response.mimetype}\n".encode('utf-8') + response.get_data()
+
+def decode_response(value):
+    header, body = value.split(b'\n', 1)
+    status, mimetype = header.decode('utf-8').split(' ', 1)
+    return current_app.response_class(body, status=int(status), mimetype=mimetype)
+
+# in-process LRU, entries are (value, expires, tags)
+class LRUBackend:
+    name = 'lru'
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.tag_keys = {}
+        self.tag_versions = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                self.remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def versions(self, tags):
+        with self.lock:
+            return {tag: self.tag_versions.get(tag, 0) for tag in tags}
+
+    # store unless a tag was invalidated since versions were read
+    def set(self, key, value, tags, versions, ttl):
+        with self.lock:
+            if any(self.tag_versions.get(tag, 0) != version for tag, version in versions.items()):
+                return False
+            self.remove(key)
+            self.entries[key] = (value, time.monotonic() + ttl, tags)
+            for tag in tags:
+                self.tag_keys.setdefault(tag, set()).add(key)
+            while len(self.entries) > self.max_entries:
+                self.remove(next(iter(self.entries)))
+            return True
+
+    def invalidate(self, tags):
+        with self.lock:
+            for tag in tags:
+                self.tag_versions[tag] = self.tag_versions.get(tag, 0) + 1
+                for key in self.tag_keys.pop(tag, set()):
+                    self.remove(key)
+
+    # drop an entry and its tag index references, caller holds the lock
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self.tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_keys[tag]
+
+    def size(self):
+        return len(self.entries)
+
+# SQLite file shared by every worker process, one connection per thread and process
+class SharedMemoryBackend:
+    name = 'shared'
+    PRUNE_EVERY = 64
+
+    def __init__(self, path=None, max_entries=1024):
+        self.path = path or default_shared_path()
+        self.max_entries = max_entries
+        self.local = threading.local()
+        self.sets = 0
+        with self.connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS entry_tags (tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key)) WITHOUT ROWID")
+            conn.execute("CREATE TABLE IF NOT EXISTS tag_versions (tag TEXT PRIMARY KEY, version INTEGER NOT NULL) WITHOUT ROWID")
+
+    # connections are never shared across a fork
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self.connect().execute("SELECT value FROM entries WHERE key = ? AND expires > ?", (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def read_versions(self, conn, tags):
+        if not tags:
+            return {}
+        placeholders = ', '.join('?' * len(tags))
+        stored = dict(conn.execute(f"SELECT tag, version FROM tag_versions WHERE tag IN ({placeholders})", list(tags)))
+        return {tag: stored.get(tag, 0) for tag in tags}
+
+    def versions(self, tags):
+        return self.read_versions(self.connect(), tags)
+
+    # the version check and the insert share one write transaction
+    def set(self, key, value, tags, versions, ttl):
+        conn = self.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self.read_versions(conn, list(versions)) != versions:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute("INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)", (key, value, time.time() + ttl))
+            conn.executemany("INSERT OR IGNORE INTO entry_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in tags])
+            self.sets += 1
+            if self.sets % self.PRUNE_EVERY == 0:
+                self.prune(conn)
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def invalidate(self, tags):
+        if not tags:
+            return
+        conn = self.connect()
+        placeholders = ', '.join('?' * len(tags))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT INTO tag_versions (tag, version) VALUES (?, 1) "
+                             "ON CONFLICT(tag) DO UPDATE SET version = version + 1", [(tag,) for tag in tags])
+            conn.execute(f"DELETE FROM entries WHERE key IN (SELECT key FROM entry_tags WHERE tag IN ({placeholders}))", list(tags))
+            conn.execute(f"DELETE FROM entry_tags WHERE tag IN ({placeholders})", list(tags))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # drop expired entries, then the soonest to expire past max_entries, then orphaned tags
+    def prune(self, conn):
+        conn.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+        excess = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute("DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY expires LIMIT ?)", (excess,))
+        conn.execute("DELETE FROM entry_tags WHERE key NOT IN (SELECT key FROM entries)")
+
+    def size(self):
+        return self.connect().execute("SELECT COUNT(*) FROM entries WHERE expires > ?", (time.time(),)).fetchone()[0]
+
+class RespError(Exception):
+    pass
+
+# one RESP command as bytes
+def encode_command(*args):
+    parts = [f"*{len(args)}\r\n".encode('ascii')]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+        parts.append(f"${len(data)}\r\n".encode('ascii') + data + b"\r\n")
+    return b''.join(parts)
+
+# read one reply, error replies are returned so a pipeline can be read to the end
+def read_reply(reader):
+    line = reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("connection closed by cache server")
+    prefix, rest = line[:1], line[1:-2]
+    if prefix == b'+':
+        return rest.decode('utf-8')
+    if prefix == b'-':
+        return RespError(rest.decode('utf-8'))
+    if prefix == b':':
+        return int(rest)
+    if prefix == b'$':
+        length = int(rest)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        if len(data) != length + 2:
+            raise ConnectionError("connection closed by cache server")
+        return data[:-2]
+    if prefix == b'*':
+        length = int(rest)
+        return None if length < 0 else [read_reply(reader) for _ in range(length)]
+    raise RespError(f"unexpected reply {line!r}")
+
+# minimal Redis protocol client, one socket per thread and process
+class RespClient:
+    def __init__(self, url, timeout=0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.database = int(parsed.path.strip('/') or 0)
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = (sock, sock.makefile('rb'))
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+            setup = ([('AUTH', self.password)] if self.password else []) + ([('SELECT', self.database)] if self.database else [])
+            if setup:
+                self.pipeline(setup)
+        return conn
+
+    def close(self):
+        conn = getattr(self.local, 'conn', None)
+        self.local.conn = None
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+
+    # send every command in one write and read the replies in order
+    def pipeline(self, commands):
+        sock, reader = self.connect()
+        try:
+            sock.sendall(b''.join(encode_command(*command) for command in commands))
+            replies = [read_reply(reader) for _ in commands]
+        except (OSError, ValueError):
+            self.close()
+            raise
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def execute(self, *command):
+        return self.pipeline([command])[0]
+
+# Redis-protocol backend: entries are strings with EX, tags are sets, versions are counters
+class RedisBackend:
+    name = 'redis'
+
+    def __init__(self, url, timeout=0.5):
+        self.client = RespClient(url, timeout)
+
+    def entry_key(self, key):
+        return f"{KEY_PREFIX}e:{key}"
+
+    def tag_key(self, tag):
+        return f"{KEY_PREFIX}t:{tag}"
+
+    def version_key(self, tag):
+        return f"{KEY_PREFIX}v:{tag}"
+
+    def get(self, key):
+        return self.client.execute('GET', self.entry_key(key))
+
+    def versions(self, tags):
+        if not tags:
+            return {}
+        values = self.client.execute('MGET', *[self.version_key(tag) for tag in tags])
+        return {tag: int(value or 0) for tag, value in zip(tags, values)}
+
+    # the version check and the write are two round trips, the window between them is small
+    def set(self, key, value, tags, versions, ttl):
+        if self.versions(list(versions)) != versions:
+            return False
+        commands = [('SET', self.entry_key(key), value, 'EX', int(ttl))]
+        for tag in tags:
+            commands += [('SADD', self.tag_key(tag), key), ('EXPIRE', self.tag_key(tag), int(ttl))]
+        self.client.pipeline(commands)
+        return True
+
+    def invalidate(self, tags):
+        if not tags:
+            return
+        commands = []
+        for tag in tags:
+            commands += [('INCR', self.version_key(tag)), ('SMEMBERS', self.tag_key(tag))]
+        replies = self.client.pipeline(commands)
+        keys = {member.decode('utf-8') for members in replies[1::2] for member in members}
+        self.client.execute('DEL', *([self.entry_key(key) for key in sorted(keys)] + [self.tag_key(tag) for tag in tags]))
+
+    def size(self):
+        return None
+
+# backend named by the app config, None when caching is disabled
+def create_backend(config):
+    name = str(config['RESPONSE_CACHE_BACKEND']).lower()
+    if name == 'none':
+        return None
+    if name == 'lru':
+        return LRUBackend(config['RESPONSE_CACHE_SIZE'])
+    if name == 'shared':
+        return SharedMemoryBackend(config['RESPONSE_CACHE_PATH'], config['RESPONSE_CACHE_SIZE'])
+    if name == 'redis':
+        return RedisBackend(config['RESPONSE_CACHE_URL'], config['RESPONSE_CACHE_TIMEOUT'])
+    raise ValueError(f"unknown RESPONSE_CACHE_BACKEND '{name}'")
+
+# scope of views whose response depends on the caller
+def identity_scope(**kwargs):
+    return get_jwt_identity()
+
+# tags of a program: its course and the instructor whose global programs it may be
+def program_tags(program):
+    tags = []
+    if program.course_id is not None:
+        tags.append(f"course:{program.course_id}")
+    if program.instructor_id is not None:
+        tags.append(f"instructor:{program.instructor_id}")
+    return tags
+
+# tags of everything listed for a member: the user, their courses and those courses' instructors
+def member_tags(user_id):
+    from .models import CourseDetails, CourseMembers
+    from . import db
+    tags = [f"user:{user_id}"]
+    rows = db.session.query(CourseDetails.id, CourseDetails.instructor_id).join(
+        CourseMembers, CourseMembers.course_id == CourseDetails.id).filter(CourseMembers.user_id == user_id)
+    for course_id, instructor_id in rows:
+        tags += [f"course:{course_id}", f"instructor:{instructor_id}"]
+    return tags
+
+# member tags of the caller, plus their own global programs when they are an instructor
+def caller_tags(**kwargs):
+    user_id = get_jwt_identity()
+    return member_tags(user_id) + [f"instructor:{user_id}"]
+
+class ResponseCache:
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 300
+        self.lock = threading.Lock()
+        self.reset()
+        if app is not None:
+            self.init_app(app)
+
+    # read the configuration and create the backend
+    def init_app(self, app):
+        app.config.setdefault('RESPONSE_CACHE_BACKEND', os.environ.get('RESPONSE_CACHE_BACKEND', 'lru'))
+        app.config.setdefault('RESPONSE_CACHE_SIZE', int(os.environ.get('RESPONSE_CACHE_SIZE', 1024)))
+        app.config.setdefault('RESPONSE_CACHE_TTL', int(os.environ.get('RESPONSE_CACHE_TTL', 300)))
+        app.config.setdefault('RESPONSE_CACHE_PATH', os.environ.get('RESPONSE_CACHE_PATH') or default_shared_path())
+        app.config.setdefault('RESPONSE_CACHE_URL', os.environ.get('RESPONSE_CACHE_URL', 'redis://localhost:6379/0'))
+        app.config.setdefault('RESPONSE_CACHE_TIMEOUT', float(os.environ.get('RESPONSE_CACHE_TIMEOUT', 0.5)))
+        self.ttl = app.config['RESPONSE_CACHE_TTL']
+        self.backend = create_backend(app.config)
+        self.reset()
+        app.extensions['response_cache'] = self
+
+    # run a backend call, logging failures and returning None so the request falls back to the view
+    def call(self, method, *args):
+        try:
+            return getattr(self.backend, method)(*args)
+        except Exception as e:
+            logger.warning("response cache %s failed on %s: %s", self.backend.name, method, e)
+            with self.lock:
+                self.errors += 1
+            return None
+
+    # path arguments are always part of the key, so a scope never has to repeat them
+    def make_key(self, endpoint, scope):
+        path = urlencode(sorted((name, str(value)) for name, value in (request.view_args or {}).items()))
+        return f"{endpoint}:{scope}:{path}:{urlencode(sorted(request.args.items(multi=True)))}"
+
+    # cache 200 responses of a GET view, scope and tags are called with the view arguments
+    # ttl overrides RESPONSE_CACHE_TTL for views whose data may lag longer
+    def cached(self, scope=None, tags=None, ttl=None):
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None or request.method != 'GET':
+                    return view(*args, **kwargs)
+
+                key = self.make_key(request.endpoint, scope(**kwargs) if scope else None)
+                value = self.call('get', key)
+                if value is not None:
+                    self.record(request.endpoint, True)
+                    response = decode_response(value)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+                self.record(request.endpoint, False)
+
+                # tag versions are read before the view runs so a concurrent invalidation wins
+                try:
+                    entry_tags = sorted(set(tags(**kwargs))) if tags else []
+                    versions = self.call('versions', entry_tags)
+                except Exception as e:
+                    logger.warning("response cache tags failed for %s: %s", request.endpoint, e)
+                    versions = None
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and versions is not None and not response.direct_passthrough:
+                    if self.call('set', key, encode_response(response), entry_tags, versions, ttl or self.ttl):
+                        with self.lock:
+                            self.stores += 1
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    # drop every entry carrying any of the tags, call after the write is committed
+    def invalidate(self, *tags):
+        tags = sorted({tag for tag in tags if tag})
+        if self.backend is None or not tags:
+            return
+        self.call('invalidate', tags)
+        with self.lock:
+            self.invalidations += 1
+
+    def record(self, endpoint, hit):
+        with self.lock:
+            counts = self.endpoints.setdefault(endpoint, {'hits': 0, 'misses': 0})
+            counts['hits' if hit else 'misses'] += 1
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+            self.stores = 0
+            self.invalidations = 0
+            self.errors = 0
+
+    # hit ratio overall and per endpoint for this worker
+    def metrics(self):
+        with self.lock:
+            endpoints = {endpoint: dict(counts, hit_ratio=hit_ratio(counts)) for endpoint, counts in self.endpoints.items()}
+            totals = {
+                'hits': sum(counts['hits'] for counts in self.endpoints.values()),
+                'misses': sum(counts['misses'] for counts in self.endpoints.values()),
+            }
+            metrics = {
+                'backend': self.backend.name if self.backend else 'none',
+                'ttl': self.ttl,
+                'hits': totals['hits'],
+                'misses': totals['misses'],
+                'hit_ratio': hit_ratio(totals),
+                'stores': self.stores,
+                'invalidations': self.invalidations,
+                'errors': self.errors,
+                'endpoints': endpoints,
+            }
+        metrics['entries'] = self.call('size') if self.backend else 0
+        return metrics
+
+def hit_ratio(counts):
+    lookups = counts['hits'] + counts['misses']
+    return round(counts['hits'] / lookups, 4) if lookups else None
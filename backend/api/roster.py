@@ -0,0 +1,236 @@
+"""
+ * roster.py
+ * Last Edited: 10/18/26
+ *
+ * Contains functions used to bulk import course rosters. A roster is a
+ * CSV or JSON list of people (email, name, account_type, password). It is
+ * diffed against the User and CourseMembers Tables, missing accounts are
+ * hashed on the password pool, and everything is written in one
+ * transaction using multi-row inserts.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+import csv
+import io
+import json
+import secrets
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, insert
+from .models import User, CourseDetails, CourseMembers
+from . import db, password_hasher, response_cache
+from .passwords import HashingPoolSaturated
+
+roster = Blueprint('roster', __name__)
+
+# maximum rows per multi-row INSERT / IN (...) lookup
+BATCH_SIZE = 500
+allowed_roster_account_types = ["student", "instructor"]
+
+# raised when a roster file cannot be parsed
+class RosterFormatError(Exception):
+    pass
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# split a list into BATCH_SIZE pieces
+def batched(items, size=BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+# turn CSV or JSON roster text into a list of row dicts
+def parse_roster(content, content_format):
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+
+    if content_format == 'csv':
+        reader = csv.DictReader(io.StringIO(content))
+        if not reader.fieldnames or 'email' not in [name.strip().lower() for name in reader.fieldnames]:
+            raise RosterFormatError("CSV roster must have a header row with an 'email' column")
+        return [{(key or '').strip().lower(): (value or '').strip() for key, value in row.items()} for row in reader]
+
+    try:
+        data = json.loads(content) if isinstance(content, str) else content
+    except ValueError as e:
+        raise RosterFormatError(f"invalid JSON roster: {str(e)}")
+
+    # accept a bare list or {"roster": [...]}
+    if isinstance(data, dict):
+        data = data.get('roster')
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise RosterFormatError("JSON roster must be a list of objects")
+    return data
+
+# validate and normalize every roster row, returning (rows, report entries for invalid rows)
+def normalize_roster(rows):
+    from email_validator import EmailNotValidError, validate_email
+
+    normalized = []
+    report = []
+    seen = set()
+
+    for index, row in enumerate(rows, start=1):
+        email = str(row.get('email') or '').strip()
+        name = str(row.get('name') or '').strip()
+        account_type = str(row.get('account_type') or 'student').strip().lower()
+        password = row.get('password') or None
+
+        try:
+            email = validate_email(email, check_deliverability=False).normalized
+        except EmailNotValidError as e:
+            report.append({"row": index, "email": email, "status": "error", "error": str(e)})
+            continue
+
+        if account_type not in allowed_roster_account_types:
+            report.append({"row": index, "email": email, "status": "error",
+                           "error": f"account_type '{account_type}' not allowed"})
+            continue
+
+        if email.lower() in seen:
+            report.append({"row": index, "email": email, "status": "error", "error": "duplicate email in roster"})
+            continue
+        seen.add(email.lower())
+
+        normalized.append({"row": index, "email": email, "name": name, "account_type": account_type, "password": password})
+    return normalized, report
+
+# import a roster into a course, returning the per-row report
+# commit=False leaves the transaction open for callers that write more (roster sync)
+def import_roster(course_id, rows, dry_run=False, commit=True):
+    rows, report = normalize_roster(rows)
+
+    # existing accounts, matched by email whatever its case
+    existing_users = {}
+    for emails in batched([row['email'].lower() for row in rows]):
+        for user_id, email in db.session.query(User.id, User.email).filter(func.lower(User.email).in_(emails)):
+            existing_users[email.lower()] = user_id
+
+    new_rows = [row for row in rows if row['email'].lower() not in existing_users]
+
+    # new accounts without a password get a temporary one returned in the report
+    for row in new_rows:
+        if not row['password']:
+            row['temporary_password'] = secrets.token_urlsafe(9)
+            row['password'] = row['temporary_password']
+
+    try:
+        if not dry_run and new_rows:
+            hashes = password_hasher.hash_passwords([row['password'] for row in new_rows])
+
+            # instructors created from a roster still need admin approval
+            user_values = [{
+                'email': row['email'],
+                'name': row['name'] or row['email'].split('@')[0],
+                'account_type': row['account_type'],
+                'status': 'active' if row['account_type'] == 'student' else 'pending',
+                'password': pwhash,
+            } for row, pwhash in zip(new_rows, hashes)]
+            for values in batched(user_values):
+                db.session.execute(insert(User), values)
+
+            for emails in batched([row['email'].lower() for row in new_rows]):
+                for user_id, email in db.session.query(User.id, User.email).filter(func.lower(User.email).in_(emails)):
+                    existing_users[email.lower()] = user_id
+
+        # existing memberships for the roster's users
+        user_ids = [existing_users[row['email'].lower()] for row in rows if row['email'].lower() in existing_users]
+        members = set()
+        for ids in batched(user_ids):
+            members.update(user_id for (user_id,) in db.session.query(CourseMembers.user_id).filter(
+                CourseMembers.course_id == course_id, CourseMembers.user_id.in_(ids)))
+
+        new_members = []
+        new_emails = {row['email'].lower() for row in new_rows}
+        for row in rows:
+            email = row['email'].lower()
+            user_id = existing_users.get(email)
+            entry = {
+                "row": row['row'],
+                "email": row['email'],
+                "user_id": user_id,
+                "user": "created" if email in new_emails else "existing",
+                "membership": "existing" if user_id in members else "added",
+                "status": "ok",
+            }
+            if row.get('temporary_password') and not dry_run:
+                entry['temporary_password'] = row['temporary_password']
+            if entry['membership'] == "added":
+                new_members.append({'course_id': course_id, 'user_id': user_id})
+            report.append(entry)
+
+        if not dry_run:
+            for values in batched(new_members):
+                db.session.execute(insert(CourseMembers), values)
+            if commit:
+                db.session.commit()
+                response_cache.invalidate(*[f"user:{member['user_id']}" for member in new_members])
+    except Exception:
+        db.session.rollback()
+        raise
+
+    report.sort(key=lambda entry: entry['row'])
+    summary = {
+        "users_created": sum(1 for entry in report if entry.get('user') == "created"),
+        "memberships_added": sum(1 for entry in report if entry.get('membership') == "added"),
+        "unchanged": sum(1 for entry in report if entry.get('user') == "existing" and entry.get('membership') == "existing"),
+        "errors": sum(1 for entry in report if entry['status'] == "error"),
+        "dry_run": dry_run,
+    }
+    return {"summary": summary, "rows": report}
+
+# check if a user can manage the roster of a course
+def can_manage_roster(user_id, course):
+    user = User.query.get(user_id)
+    if not user:
+        return False
+    return user.account_type == 'admin' or (user.account_type == 'instructor' and course.instructor_id == user.id)
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""               Endpoint Functions                ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# bulk import a CSV or JSON roster into a course
+@roster.route('/course/<int:course_id>/roster/import', methods=['POST'])
+@jwt_required()
+def import_course_roster(course_id):
+    try:
+        user_id = get_jwt_identity()
+        course = CourseDetails.query.get(course_id)
+
+        if not course:
+            return jsonify({"error": "Course not found"}), 404
+
+        if not can_manage_roster(user_id, course):
+            return jsonify({"msg": "admin or course instructor access required"}), 401
+
+        dry_run = request.args.get('dry_run') == 'true'
+
+        # roster can be an uploaded file, a CSV body, or a JSON body
+        try:
+            if 'file' in request.files:
+                upload = request.files['file']
+                content_format = 'csv' if upload.filename.lower().endswith('.csv') else 'json'
+                rows = parse_roster(upload.read(), content_format)
+            elif request.mimetype == 'text/csv':
+                rows = parse_roster(request.get_data(), 'csv')
+            else:
+                rows = parse_roster(request.get_json(), 'json')
+        except RosterFormatError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if not rows:
+            return jsonify({"error": "Roster is empty"}), 400
+
+        result = import_roster(course_id, rows, dry_run)
+        return jsonify(result), 200
+    except HashingPoolSaturated as e:
+        response = jsonify({"error": "Server is busy, try again shortly"})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,221 @@
+"""
+ * roster_sync.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the incremental roster sync used to keep CourseMembers in step
+ * with an LMS-style roster source (Canvas, a local JSON file, or a mock
+ * server in tests). Each course keeps the source's cursor and ETag in the
+ * RosterSync Table, so an unchanged roster costs one conditional request
+ * and a changed one only touches the added and dropped members.
+ *
+ * Roster source protocol (GET <ROSTER_SOURCE_URL>/courses/<course_id>/roster?cursor=<cursor>):
+ * - 304 Not Modified when the If-None-Match ETag still matches
+ * - {"cursor": "...", "added": [{"email": ...}, ...], "dropped": ["email", ...]} for a delta
+ * - {"cursor": "...", "members": [{"email": ...}, ...]} for a full snapshot
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+import hashlib
+import json
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from flask import Blueprint, current_app, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import delete, func, select
+from .models import User, CourseDetails, CourseMembers, RosterSync
+from . import db, response_cache
+from .roster import import_roster, can_manage_roster
+
+roster_sync = Blueprint('roster_sync', __name__)
+
+# raised when the roster source cannot be reached or returns bad data
+class RosterSourceError(Exception):
+    pass
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""                 Roster Sources                  ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# build a page of roster changes from a decoded source response
+def roster_page(data, etag):
+    if not isinstance(data, dict):
+        raise RosterSourceError("roster source must return a JSON object")
+    return {
+        'not_modified': False,
+        'cursor': data.get('cursor'),
+        'etag': etag,
+        'members': data.get('members'),
+        'added': data.get('added') or [],
+        'dropped': data.get('dropped') or [],
+    }
+
+NOT_MODIFIED = {'not_modified': True, 'cursor': None, 'etag': None, 'members': None, 'added': [], 'dropped': []}
+
+# roster served over HTTP with conditional GETs
+class HttpRosterSource:
+    def __init__(self, base_url, token=None, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+
+    def fetch(self, course_id, cursor=None, etag=None):
+        url = f"{self.base_url}/courses/{course_id}/roster"
+        if cursor:
+            url += '?' + urllib.parse.urlencode({'cursor': cursor})
+
+        req = urllib.request.Request(url, headers={'Accept': 'application/json'})
+        if etag:
+            req.add_header('If-None-Match', etag)
+        if self.token:
+            req.add_header('Authorization', f"Bearer {self.token}")
+
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                return roster_page(json.loads(response.read().decode('utf-8')), response.headers.get('ETag'))
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return dict(NOT_MODIFIED)
+            raise RosterSourceError(f"roster source returned {e.code} for course {course_id}")
+        except (urllib.error.URLError, ValueError) as e:
+            raise RosterSourceError(f"roster source unavailable: {str(e)}")
+
+# roster read from a local JSON file keyed by course id, for development and tests
+class JsonFileRosterSource:
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self, course_id, cursor=None, etag=None):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise RosterSourceError(f"roster file unreadable: {str(e)}")
+
+        course_data = data.get(str(course_id))
+        if course_data is None:
+            return dict(NOT_MODIFIED)
+
+        # the ETag is a digest of the course's entry so unchanged courses are skipped
+        digest = hashlib.sha1(json.dumps(course_data, sort_keys=True).encode()).hexdigest()
+        if etag == digest:
+            return dict(NOT_MODIFIED)
+        return roster_page(course_data, digest)
+
+# pick a roster source from a URL or file path
+def get_roster_source(location=None, token=None):
+    location = location or current_app.config.get('ROSTER_SOURCE_URL') or os.environ.get('ROSTER_SOURCE_URL')
+    if not location:
+        raise RosterSourceError("ROSTER_SOURCE_URL is not configured")
+    if location.startswith('http://') or location.startswith('https://'):
+        return HttpRosterSource(location, token or os.environ.get('ROSTER_SOURCE_TOKEN'))
+    if location.startswith('file://'):
+        location = location[len('file://'):]
+    return JsonFileRosterSource(location)
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# email of every current member of a course, except its instructor
+def get_member_emails(course):
+    rows = db.session.query(User.email).join(CourseMembers, CourseMembers.user_id == User.id).filter(
+        CourseMembers.course_id == course.id, User.id != course.instructor_id)
+    return {email.lower() for (email,) in rows if email}
+
+# pull a course's roster changes and apply only the delta to CourseMembers
+def sync_course(course, source):
+    state = RosterSync.query.filter_by(course_id=course.id).first()
+    if not state:
+        state = RosterSync(course_id=course.id)
+        db.session.add(state)
+
+    page = source.fetch(course.id, state.cursor, state.etag)
+    state.last_synced_at = datetime.utcnow()
+
+    if page['not_modified']:
+        db.session.commit()
+        return {"course_id": course.id, "not_modified": True, "added": 0, "dropped": 0, "errors": []}
+
+    if page['members'] is not None:
+        # full snapshot: set difference against the current members
+        incoming = {str(row.get('email', '')).strip().lower(): row for row in page['members'] if row.get('email')}
+        current = get_member_emails(course)
+        added_rows = [incoming[email] for email in incoming.keys() - current]
+        dropped = sorted(current - incoming.keys())
+    else:
+        added_rows = page['added']
+        dropped = sorted({str(email).strip().lower() for email in page['dropped'] if email})
+
+    try:
+        report = import_roster(course.id, added_rows, commit=False) if added_rows else None
+
+        dropped_count = 0
+        if dropped:
+            dropped_ids = select(User.id).where(func.lower(User.email).in_(dropped), User.id != course.instructor_id)
+            result = db.session.execute(
+                delete(CourseMembers)
+                .where(CourseMembers.course_id == course.id, CourseMembers.user_id.in_(dropped_ids))
+                .execution_options(synchronize_session=False)
+            )
+            dropped_count = result.rowcount
+
+        added_count = report['summary']['memberships_added'] if report else 0
+        state.cursor = page['cursor']
+        state.etag = page['etag']
+        state.last_added = added_count
+        state.last_dropped = dropped_count
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # new members' lists gain the course, dropped members' lists carry its tag
+    added_ids = [entry['user_id'] for entry in report['rows'] if entry.get('membership') == "added"] if report else []
+    response_cache.invalidate(*[f"user:{user_id}" for user_id in added_ids],
+                              *([f"course:{course.id}"] if dropped_count else []))
+
+    errors = [entry for entry in report['rows'] if entry['status'] == 'error'] if report else []
+    return {"course_id": course.id, "not_modified": False, "added": added_count, "dropped": dropped_count, "errors": errors}
+
+# sync every course, collecting per-course results
+def sync_all_courses(source):
+    results = []
+    for (course_id,) in db.session.query(CourseDetails.id).order_by(CourseDetails.id).all():
+        course = CourseDetails.query.get(course_id)
+        try:
+            results.append(sync_course(course, source))
+        except Exception as e:
+            db.session.rollback()
+            results.append({"course_id": course_id, "error": str(e)})
+    return results
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""               Endpoint Functions                ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# sync one course's members from the configured roster source
+@roster_sync.route('/course/<int:course_id>/roster/sync', methods=['POST'])
+@jwt_required()
+def sync_course_roster(course_id):
+    try:
+        user_id = get_jwt_identity()
+        course = CourseDetails.query.get(course_id)
+
+        if not course:
+            return jsonify({"error": "Course not found"}), 404
+
+        if not can_manage_roster(user_id, course):
+            return jsonify({"msg": "admin or course instructor access required"}), 401
+
+        result = sync_course(course, get_roster_source())
+        return jsonify(result), 200
+    except RosterSourceError as e:
+        return jsonify({"error": str(e)}), 502
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
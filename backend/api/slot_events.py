@@ -0,0 +1,222 @@
+"""
+ * slot_events.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the broker behind the live slot streams. Writes that change a
+ * slot's state add a SlotEvent row in their own transaction; the
+ * slot_event table is the channel between workers. One poller thread per
+ * process reads new rows and fans each event out to the in-process
+ * subscribers of its topics ("program:1", "course:2", "instructor:3").
+ * A commit in this process wakes the poller right away, events from
+ * other workers arrive within SLOT_EVENTS_POLL_INTERVAL seconds. The
+ * poller only runs while someone is subscribed.
+ *
+ * Known Bugs:
+ * - an event whose transaction commits after one with a higher id, within
+ *   the same poll, is skipped; clients catch up on their next full load
+ *
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# handed to a subscriber whose queue filled up, its stream ends and the client resumes with Last-Event-ID
+OVERFLOW = object()
+
+# seconds between deletes of events older than SLOT_EVENTS_RETENTION_MINUTES
+PRUNE_INTERVAL = 60
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# topics a slot event is delivered on: its program, and its course or for global programs its instructor
+def event_topics(program_id, course_id, instructor_id):
+    topics = {f"program:{program_id}"}
+    if course_id is not None:
+        topics.add(f"course:{course_id}")
+    elif instructor_id is not None:
+        topics.add(f"instructor:{instructor_id}")
+    return topics
+
+# a SlotEvent row as {"id", "topics", "data"}, data already JSON so streams never need the app
+def encode_event(row):
+    return {
+        'id': row.id,
+        'topics': event_topics(row.program_id, row.course_id, row.instructor_id),
+        'data': json.dumps({
+            'id': row.id,
+            'appointment_id': row.appointment_id,
+            'availability_id': row.availability_id,
+            'program_id': row.program_id,
+            'course_id': row.course_id,
+            'date': row.date,
+            'start_time': row.start_time,
+            'end_time': row.end_time,
+            'status': row.status,
+        }),
+    }
+
+# one SSE message
+def format_event(event):
+    return f"id: {event['id']}\nevent: slot\ndata: {event['data']}\n\n"
+
+class Subscription:
+    def __init__(self, topics, last_id, size):
+        self.topics = set(topics)
+        self.last_id = last_id
+        self.queue = queue.Queue(maxsize=size)
+
+    # next event, None when nothing arrived within timeout
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class SlotEventBroker:
+    def __init__(self, app=None):
+        self.app = None
+        self.poll_interval = 1.0
+        self.heartbeat = 15
+        self.retention = timedelta(minutes=60)
+        self.queue_size = 100
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.last_id = None
+        self.rewind = None
+        self.last_prune = 0
+        self.published = 0
+        if app is not None:
+            self.init_app(app)
+
+    # read the configuration, the poller starts with the first subscription
+    def init_app(self, app):
+        app.config.setdefault('SLOT_EVENTS_POLL_INTERVAL', float(os.environ.get('SLOT_EVENTS_POLL_INTERVAL', 1.0)))
+        app.config.setdefault('SLOT_EVENTS_HEARTBEAT', float(os.environ.get('SLOT_EVENTS_HEARTBEAT', 15)))
+        app.config.setdefault('SLOT_EVENTS_RETENTION_MINUTES', int(os.environ.get('SLOT_EVENTS_RETENTION_MINUTES', 60)))
+        app.config.setdefault('SLOT_EVENTS_QUEUE_SIZE', int(os.environ.get('SLOT_EVENTS_QUEUE_SIZE', 100)))
+        self.stop()
+        self.app = app
+        self.poll_interval = app.config['SLOT_EVENTS_POLL_INTERVAL']
+        self.heartbeat = app.config['SLOT_EVENTS_HEARTBEAT']
+        self.retention = timedelta(minutes=app.config['SLOT_EVENTS_RETENTION_MINUTES'])
+        self.queue_size = app.config['SLOT_EVENTS_QUEUE_SIZE']
+        self.published = 0
+        app.extensions['slot_events'] = self
+
+    # receive the events of topics with an id above last_id
+    def subscribe(self, topics, last_id):
+        subscription = Subscription(topics, last_id, self.queue_size)
+        with self.lock:
+            self.subscribers.add(subscription)
+            # the next poll starts from the oldest new subscriber, the others skip what they already have
+            self.rewind = last_id if self.rewind is None else min(self.rewind, last_id)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.poll_loop, name='slot-events', daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+
+    # wake the poller, called once a transaction holding SlotEvents commits
+    def notify(self, *args):
+        self.wakeup.set()
+
+    # hand an encoded event to every subscriber of one of its topics that hasn't seen it
+    def publish(self, event):
+        with self.lock:
+            subscribers = [subscription for subscription in self.subscribers
+                           if subscription.topics & event['topics'] and event['id'] > subscription.last_id]
+            self.published += 1
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+                subscription.last_id = event['id']
+            except queue.Full:
+                self.unsubscribe(subscription)
+                # make room so the overflow marker always gets through
+                try:
+                    subscription.queue.get_nowait()
+                except queue.Empty:
+                    pass
+                subscription.queue.put_nowait(OVERFLOW)
+
+    # end every stream and stop the poller, used on shutdown and by tests
+    def stop(self):
+        with self.lock:
+            thread, self.thread = self.thread, None
+            subscribers, self.subscribers = self.subscribers, set()
+            self.last_id = None
+            self.rewind = None
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(OVERFLOW)
+            except queue.Full:
+                pass
+        self.wakeup.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self.wakeup.clear()
+
+    # runs until the last subscriber leaves or the broker is stopped
+    def poll_loop(self):
+        from . import db
+        with self.app.app_context():
+            while True:
+                self.wakeup.wait(self.poll_interval)
+                self.wakeup.clear()
+                with self.lock:
+                    if self.thread is not threading.current_thread():
+                        return
+                    if not self.subscribers:
+                        self.thread = None
+                        self.last_id = None
+                        return
+                try:
+                    self.poll()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("slot event poll failed")
+                finally:
+                    db.session.remove()
+
+    # publish the rows added since the last poll (or since the oldest new subscriber's position)
+    def poll(self):
+        from . import db
+        from .models import SlotEvent
+        with self.lock:
+            rewind, self.rewind = self.rewind, None
+        positions = [position for position in (self.last_id, rewind) if position is not None]
+        start = min(positions) if positions else db.session.query(db.func.max(SlotEvent.id)).scalar() or 0
+
+        self.last_id = max(self.last_id or 0, start)
+        for row in SlotEvent.query.filter(SlotEvent.id > start).order_by(SlotEvent.id):
+            self.publish(encode_event(row))
+            self.last_id = max(self.last_id, row.id)
+
+        if time.monotonic() - self.last_prune > PRUNE_INTERVAL:
+            self.last_prune = time.monotonic()
+            SlotEvent.query.filter(SlotEvent.created_at < datetime.utcnow() - self.retention).delete(synchronize_session=False)
+            db.session.commit()
+
+    def metrics(self):
+        with self.lock:
+            return {
+                'subscribers': len(self.subscribers),
+                'polling': self.thread is not None,
+                'last_event_id': self.last_id,
+                'published': self.published,
+            }
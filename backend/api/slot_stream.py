@@ -0,0 +1,201 @@
+"""
+ * slot_stream.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the Server-Sent Events streams of slot state changes and the
+ * helpers write endpoints use to record them. A client opens one stream
+ * per program or course instead of polling get_available_appointments,
+ * and gets a "slot" event whenever a slot is reserved, set pending,
+ * cancelled, reposted, made inactive or deleted, or its program is
+ * deleted. Reconnecting with Last-Event-ID replays what was missed.
+ *
+ * Known Bugs:
+ * - every open stream holds a worker thread, run the app with threaded
+ *   or gevent workers when streams are in use
+ *
+"""
+
+from flask import Blueprint, Response, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity, set_access_cookies, get_jwt, create_access_token
+from sqlalchemy import event, select
+from datetime import datetime, timedelta, timezone
+from .models import SlotEvent, Availability, ProgramDetails, CourseDetails, CourseMembers
+from . import db, slot_events
+from .slot_events import OVERFLOW, encode_event, format_event
+
+slot_stream = Blueprint('slot_stream', __name__)
+
+# most events replayed for a Last-Event-ID, clients further behind are told to reload
+REPLAY_LIMIT = 500
+
+# reconnection delay sent to EventSource clients, in milliseconds
+RETRY_MS = 3000
+
+# token generator
+@slot_stream.after_request
+def refresh_expiring_jwts(response):
+    try:
+        exp_timestamp = get_jwt()["exp"]
+        now = datetime.now(timezone.utc)
+        target_timestamp = datetime.timestamp(now + timedelta(minutes=30))
+        if target_timestamp > exp_timestamp:
+            access_token = create_access_token(identity=get_jwt_identity())
+            set_access_cookies(response, access_token)
+        return response
+    except (RuntimeError, KeyError):
+        # Case where there is not a valid JWT. Just return the original response
+        return response
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# wake the broker after a commit that added SlotEvents
+def notify_after_commit(session):
+    if session.info.pop('slot_events_pending', False):
+        slot_events.notify()
+
+# add SlotEvents to the caller's transaction, the broker is woken once it commits
+def add_slot_event(*rows):
+    if not rows:
+        return
+    session = db.session()
+    session.add_all(rows)
+    session.info['slot_events_pending'] = True
+    # one listener per session however many events it adds
+    if not event.contains(session, 'after_commit', notify_after_commit):
+        event.listen(session, 'after_commit', notify_after_commit)
+
+# record an appointment's new status, call before the commit that changes it
+def record_slot_event(appointment):
+    availability = appointment.availability
+    program = availability.program_details if availability else None
+    if program is None:
+        return
+    add_slot_event(SlotEvent(program_id=program.id, course_id=program.course_id, instructor_id=program.instructor_id,
+                             availability_id=availability.id, appointment_id=appointment.id, date=appointment.appointment_date,
+                             start_time=appointment.start_time, end_time=appointment.end_time, status=appointment.status))
+
+# record a status change of every slot in an availability as one event
+def record_availability_event(availability, status):
+    program = availability.program_details
+    if program is None:
+        return
+    add_slot_event(SlotEvent(program_id=program.id, course_id=program.course_id, instructor_id=program.instructor_id,
+                             availability_id=availability.id, appointment_id=None, date=availability.date,
+                             start_time=availability.start_time, end_time=availability.end_time, status=status))
+
+# record the removal of the upcoming availabilities among availability_ids, one event each, call before deleting them
+def record_availabilities_deleted(availability_ids):
+    if not availability_ids:
+        return
+    rows = db.session.query(
+        Availability.id, Availability.date, Availability.start_time, Availability.end_time,
+        ProgramDetails.id.label('program_id'), ProgramDetails.course_id, ProgramDetails.instructor_id
+    ).join(ProgramDetails, Availability.program_id == ProgramDetails.id).filter(
+        Availability.id.in_(list(availability_ids)), Availability.date >= datetime.now().strftime('%Y-%m-%d'))
+    add_slot_event(*[SlotEvent(program_id=row.program_id, course_id=row.course_id, instructor_id=row.instructor_id,
+                               availability_id=row.id, appointment_id=None, date=row.date, start_time=row.start_time,
+                               end_time=row.end_time, status='deleted') for row in rows])
+
+# record that a whole program changed, e.g. was deleted, as one event without an availability
+def record_program_event(program, status):
+    add_slot_event(SlotEvent(program_id=program.id, course_id=program.course_id, instructor_id=program.instructor_id,
+                             availability_id=None, appointment_id=None, status=status))
+
+# instructors watch their own programs, students the programs of their courses
+def is_course_member(user_id, course_ids):
+    return db.session.query(CourseMembers.id).filter(CourseMembers.user_id == user_id,
+                                                      CourseMembers.course_id.in_(course_ids)).first() is not None
+
+def can_watch_course(user_id, course):
+    return course.instructor_id == user_id or is_course_member(user_id, [course.id])
+
+# a global program is listed in every course of its instructor
+def can_watch_program(user_id, program):
+    if program.instructor_id == user_id:
+        return True
+    if program.course_id is not None:
+        return is_course_member(user_id, [program.course_id])
+    return is_course_member(user_id, select(CourseDetails.id).where(CourseDetails.instructor_id == program.instructor_id))
+
+# the events after last_id for the topics, and the id the stream continues from
+# None instead of the events when the client is too far behind to replay
+def replay_events(topics, last_id):
+    rows = SlotEvent.query.filter(SlotEvent.id > last_id).order_by(SlotEvent.id).limit(REPLAY_LIMIT + 1).all()
+    if len(rows) > REPLAY_LIMIT:
+        return None, rows[-1].id
+    events = [encode_event(row) for row in rows]
+    return [slot_event for slot_event in events if slot_event['topics'] & topics], rows[-1].id if rows else last_id
+
+def event_stream(subscription, replay, heartbeat):
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        if replay is None:
+            yield "event: reset\ndata: {}\n\n"
+        else:
+            for slot_event in replay:
+                yield format_event(slot_event)
+        while True:
+            slot_event = subscription.get(heartbeat)
+            if slot_event is OVERFLOW:
+                return
+            # comments keep proxies from closing an idle connection
+            yield ": keep-alive\n\n" if slot_event is None else format_event(slot_event)
+    finally:
+        slot_events.unsubscribe(subscription)
+
+# subscribe to the topics from Last-Event-ID (or from now) and stream
+def open_stream(topics):
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID must be an event id"}), 400
+
+    if last_id is None:
+        replay, last_id = [], db.session.query(db.func.max(SlotEvent.id)).scalar() or 0
+    else:
+        replay, last_id = replay_events(topics, last_id)
+
+    subscription = slot_events.subscribe(topics, last_id)
+    return Response(event_stream(subscription, replay, slot_events.heartbeat), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""               Endpoint Functions                ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# stream the slot changes of one program
+@slot_stream.route('/events/programs/<int:program_id>/slots', methods=['GET'])
+@jwt_required()
+def stream_program_slots(program_id):
+    try:
+        user_id = int(get_jwt_identity())
+
+        program = ProgramDetails.query.filter_by(id=program_id, deleted_at=None).first()
+        if not program:
+            return jsonify({"error": "Program not found"}), 404
+        if not can_watch_program(user_id, program):
+            return jsonify({"error": "Not a member of the program's course"}), 403
+
+        return open_stream({f"program:{program_id}"})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# stream the slot changes of every program listed in a course, its instructor's global programs included
+@slot_stream.route('/events/courses/<int:course_id>/slots', methods=['GET'])
+@jwt_required()
+def stream_course_slots(course_id):
+    try:
+        user_id = int(get_jwt_identity())
+
+        course = CourseDetails.query.get(course_id)
+        if not course:
+            return jsonify({"error": "Course not found"}), 404
+        if not can_watch_course(user_id, course):
+            return jsonify({"error": "Not a member of the course"}), 403
+
+        return open_stream({f"course:{course_id}", f"instructor:{course.instructor_id}"})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
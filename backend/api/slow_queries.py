@@ -0,0 +1,184 @@
+"""
+ * slow_queries.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the slow-query recorder attached to the SQLAlchemy engine.
+ * Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with their
+ * normalized SQL, redacted parameters and the Flask endpoint that issued
+ * them. The backend's EXPLAIN output is captured on a background thread
+ * so the request is never delayed.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from flask import has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+""             Backend Only Functions              ""
+"""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+# collapse whitespace and repeated placeholders so similar statements group together
+def normalize_sql(statement):
+    normalized = re.sub(r'\s+', ' ', statement).strip()
+    normalized = re.sub(r"'(?:[^']|'')*'", '?', normalized)
+    normalized = re.sub(r'\b\d+\b', '?', normalized)
+    normalized = re.sub(r'%\(\w+\)s|%s|:\w+', '?', normalized)
+    normalized = re.sub(r'\(\s*\?(?:\s*,\s*\?)+\s*\)', '(?, ...)', normalized)
+    return normalized
+
+# replace parameter values with their type so no user data reaches the log
+def redact_parameters(parameters):
+    if parameters is None:
+        return None
+    if isinstance(parameters, dict):
+        return {key: f'<{type(value).__name__}>' for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) if isinstance(value, (dict, list, tuple))
+                else f'<{type(value).__name__}>' for value in parameters]
+    return f'<{type(parameters).__name__}>'
+
+# EXPLAIN statement prefix for the connected backend
+def explain_prefix(dialect_name):
+    if dialect_name == 'sqlite':
+        return 'EXPLAIN QUERY PLAN '
+    return 'EXPLAIN '
+
+class SlowQueryRecorder:
+    def __init__(self, app=None):
+        self.threshold_ms = 200.0
+        self.top_n = 50
+        self.explain_enabled = True
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.explain_queue = queue.Queue(maxsize=100)
+        self.explain_thread = None
+        self.local = threading.local()
+        if app is not None:
+            self.init_app(app)
+
+    # read the configuration and attach the timing hooks to the app's engine
+    def init_app(self, app):
+        app.config.setdefault('SLOW_QUERY_THRESHOLD_MS', float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200)))
+        app.config.setdefault('SLOW_QUERY_TOP_N', int(os.environ.get('SLOW_QUERY_TOP_N', 50)))
+        app.config.setdefault('SLOW_QUERY_EXPLAIN', os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true')
+        self.threshold_ms = app.config['SLOW_QUERY_THRESHOLD_MS']
+        self.top_n = app.config['SLOW_QUERY_TOP_N']
+        self.explain_enabled = app.config['SLOW_QUERY_EXPLAIN']
+        app.extensions['slow_queries'] = self
+
+        from . import db
+        with app.app_context():
+            self.attach(db.engine)
+
+    # register the cursor hooks on an engine
+    def attach(self, engine):
+        event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('slow_query_start')
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+        # never record the recorder's own EXPLAIN statements
+        if getattr(self.local, 'explaining', False) or elapsed_ms < self.threshold_ms:
+            return
+
+        endpoint = request.endpoint if has_request_context() else None
+        self.record(conn.engine, statement, parameters, elapsed_ms, endpoint, executemany)
+
+    # add a slow statement to the rolling stats and queue its EXPLAIN
+    def record(self, engine, statement, parameters, elapsed_ms, endpoint=None, executemany=False):
+        normalized = normalize_sql(statement)
+        redacted = redact_parameters(parameters)
+
+        logger.warning("slow query (%.1f ms) from %s: %s params=%s", elapsed_ms, endpoint, normalized, redacted)
+
+        with self.lock:
+            entry = self.stats.get(normalized)
+            if entry is None:
+                entry = {
+                    'sql': normalized,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'endpoints': [],
+                    'last_parameters': None,
+                    'explain': None,
+                }
+                self.stats[normalized] = entry
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['last_parameters'] = redacted
+            if endpoint and endpoint not in entry['endpoints']:
+                entry['endpoints'].append(endpoint)
+            needs_explain = entry['explain'] is None
+            self.trim()
+
+        if self.explain_enabled and needs_explain and not executemany and normalized.upper().startswith('SELECT'):
+            self.queue_explain(engine, normalized, statement, parameters)
+
+    # keep only the top-N statements by total time
+    def trim(self):
+        if len(self.stats) <= self.top_n:
+            return
+        ranked = sorted(self.stats.values(), key=lambda entry: entry['total_ms'], reverse=True)
+        self.stats = {entry['sql']: entry for entry in ranked[:self.top_n]}
+
+    def queue_explain(self, engine, normalized, statement, parameters):
+        try:
+            self.explain_queue.put_nowait((engine, normalized, statement, parameters))
+        except queue.Full:
+            return
+        if self.explain_thread is None or not self.explain_thread.is_alive():
+            self.explain_thread = threading.Thread(target=self.explain_worker, name='slow-query-explain', daemon=True)
+            self.explain_thread.start()
+
+    # background worker that runs EXPLAIN on its own connection
+    def explain_worker(self):
+        self.local.explaining = True
+        while True:
+            try:
+                engine, normalized, statement, parameters = self.explain_queue.get(timeout=5)
+            except queue.Empty:
+                return
+            try:
+                with engine.connect() as conn:
+                    sql = explain_prefix(engine.dialect.name) + statement
+                    if parameters:
+                        result = conn.exec_driver_sql(sql, parameters)
+                    else:
+                        result = conn.exec_driver_sql(sql)
+                    plan = [[str(value) for value in row] for row in result]
+            except Exception as e:
+                plan = [[f"EXPLAIN failed: {str(e)}"]]
+            with self.lock:
+                if normalized in self.stats:
+                    self.stats[normalized]['explain'] = plan
+
+    # return the rolling top-N, slowest total time first
+    def top(self, limit=None):
+        with self.lock:
+            ranked = sorted(self.stats.values(), key=lambda entry: entry['total_ms'], reverse=True)
+            ranked = [dict(entry, avg_ms=entry['total_ms'] / entry['count']) for entry in ranked]
+        return ranked[:limit] if limit else ranked
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
@@ -17,17 +17,33 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, \
     set_access_cookies, get_jwt, create_access_token
-from sqlalchemy import extract, or_, and_, func
+from sqlalchemy import or_, and_
 from .models import User, Appointment, ProgramDetails, Availability, AppointmentComment, CourseDetails, CourseMembers
-from . import db
+from . import db, response_cache
+from .response_cache import identity_scope, caller_tags
 from datetime import datetime, timedelta, timezone
 from .mail import send_email
 from .programs import get_program_name, get_course_name
 from .user import is_student, is_instructor
-from ics import Calendar, Event
+from .availability_rules import materialize_program_rules, materialize_rules_for_programs
+from .booking_conflicts import find_student_conflict, describe_conflict
+from .meeting_limits import program_limits, has_limits, booked_counts, limit_reached, blocked_ranges, outside_ranges, outside_program_ranges
+from .pagination import after_cursor, slot_order, decode_cursor, parse_limit, paginate
+from .fieldsets import PROGRAM_FIELDS, parse_fields, load_fields, serialize_fields
+from .dashboard import refresh_dashboards
+from .slot_stream import record_slot_event
 
 student = Blueprint('student', __name__)
 
+# default and longest from/to window of get_available_appointments, which bound rule materialization
+AVAILABLE_WINDOW_DAYS = 14
+AVAILABLE_MAX_SPAN_DAYS = 120
+AVAILABLE_PAGE_SIZE = 200
+AVAILABLE_MAX_PAGE_SIZE = 500
+
+# program fields returned to students, narrowed with ?fields=
+STUDENT_PROGRAM_FIELDS = [field for field in PROGRAM_FIELDS if field != 'isRangeBased']
+
 # token generator
 @student.after_request
 def refresh_expiring_jwts(response):
@@ -47,37 +63,25 @@ def refresh_expiring_jwts(response):
 ""             Backend Only Functions              ""
 """""""""""""""""""""""""""""""""""""""""""""""""""""
     
-# get all of the global programs for a instructor
-def get_global_programs(instructor_id):
+# get all of the global programs for a instructor, loading only the columns of fields
+def get_global_programs(instructor_id, fields=None, exclude_dropins=False):
+    fields = fields or STUDENT_PROGRAM_FIELDS
     try:
         if is_instructor(instructor_id):
+            filters = [ProgramDetails.course_id == None, ProgramDetails.instructor_id == instructor_id, ProgramDetails.deleted_at == None]
+            if exclude_dropins:
+                filters.append(ProgramDetails.isDropins == False)
+
             # get all global programs for the instructor
-            all_global_programs = ProgramDetails.query.filter(
-                and_(ProgramDetails.course_id == None, ProgramDetails.instructor_id == instructor_id)
-            ).all()
+            all_global_programs = ProgramDetails.query.options(load_fields(ProgramDetails, fields)).filter(and_(*filters)).all()
 
             # global programs found
             if all_global_programs:
                 all_formatted_programs = []
 
                 for program in all_global_programs:
-                    # convert attributes to a object
-                    program_info = {
-                        'id': program.id,
-                        'name': program.name,
-                        'description': program.description,
-                        'duration': program.duration,
-                        'physical_location': program.physical_location,
-                        'meeting_url': program.meeting_url,
-                        'auto_approve_appointments': program.auto_approve_appointments,
-                        'max_daily_meetings': program.max_daily_meetings,
-                        'max_weekly_meetings': program.max_weekly_meetings,
-                        'max_monthly_meetings': program.max_monthly_meetings,
-                        'isDropins': program.isDropins,
-                    }
-
-                    # append object to list
-                    all_formatted_programs.append(program_info)
+                    # convert the requested attributes to a object
+                    all_formatted_programs.append(serialize_fields(program, fields))
 
                 return all_formatted_programs
             else: 
@@ -91,6 +95,9 @@ def get_global_programs(instructor_id):
 
 # Helper function to send confirmation email to attendee and host
 def send_confirmation_email(appointment):
+    # imported on first use to keep ics out of worker startup
+    from ics import Calendar, Event
+
     attendee = User.query.get(appointment.attendee_id)
     host = User.query.get(appointment.host_id)
 
@@ -130,66 +137,6 @@ def send_confirmation_email(appointment):
         return True
     return False
 
-# Helper function to get the start and end dates of the week for a given date
-def get_week_range(date_str):
-    date = datetime.strptime(date_str, '%Y-%m-%d')
-    start_of_week = date - timedelta(days=date.weekday())
-    end_of_week = start_of_week + timedelta(days=6)
-    return start_of_week.strftime('%Y-%m-%d'), end_of_week.strftime('%Y-%m-%d')
-
-# Helper function to update appointments and availabilities status
-def update_appointments_status(host_id, appointment_date, scope):
-    parsed_appointment_date = datetime.strptime(appointment_date, '%Y-%m-%d')
-    if scope == 'daily':
-        # Update appointments for the day
-        appointments = Appointment.query.filter(
-            Appointment.host_id == host_id,
-            func.date(Appointment.appointment_date) == appointment_date,
-            Appointment.status == 'posted'
-        ).all()
-        # Update the availability for the day
-        availabilities = Availability.query.filter(
-            Availability.user_id == host_id,
-            func.date(Availability.date) == appointment_date
-        ).all()
-    elif scope == 'weekly':
-        start_of_week, end_of_week = get_week_range(appointment_date)
-        # Update appointments for the week
-        appointments = Appointment.query.filter(
-            Appointment.host_id == host_id,
-            func.date(Appointment.appointment_date).between(start_of_week, end_of_week),
-            Appointment.status == 'posted'
-        ).all()
-        # Update availabilities for the week
-        availabilities = Availability.query.filter(
-            Availability.user_id == host_id,
-            func.date(Availability.date).between(start_of_week, end_of_week)
-        ).all()
-    elif scope == 'monthly':
-        #Your code here
-        appointments = Appointment.query.filter(
-            Appointment.host_id == host_id,
-            extract('month', func.date(Appointment.appointment_date)) == parsed_appointment_date.month,
-            extract('year', func.date(Appointment.appointment_date)) == parsed_appointment_date.year,
-            Appointment.status == 'posted'
-        ).all()
-
-        # Update availabilities for the month
-        availabilities = Availability.query.filter(
-            Availability.user_id == host_id,
-            extract('month', func.date(Availability.date)) == parsed_appointment_date.month,
-            extract('year', func.date(Availability.date)) == parsed_appointment_date.year
-        ).all()
-        
-    # Set all fetched appointments to 'inactive'
-    for appt in appointments:
-        appt.status = 'inactive'
-
-    # Set all fetched availabilities to 'inactive'
-    for avail in availabilities:
-        avail.status = 'inactive'
-    db.session.commit()
-
 """""""""""""""""""""""""""""""""""""""""""""""""""""
 ""               Endpoint Functions                ""
 """""""""""""""""""""""""""""""""""""""""""""""""""""
@@ -206,7 +153,7 @@ def get_student_dropins(course_id):
 
             if member:
                 course_information = CourseDetails.query.filter(CourseDetails.id == member.course_id).first()
-                programs_in_course = ProgramDetails.query.filter(ProgramDetails.course_id == member.course_id).all()
+                programs_in_course = ProgramDetails.query.filter(ProgramDetails.course_id == member.course_id, ProgramDetails.deleted_at == None).all()
 
                 all_formatted_programs = []
 
@@ -358,6 +305,7 @@ def get_student_appointments_for_course():
 # fetch all of the programs for each course a student is enrolled in
 @student.route('/student/programs/descriptions', methods=['GET'])
 @jwt_required()
+@response_cache.cached(scope=identity_scope, tags=caller_tags)
 def get_student_programs():
     try:
         student_id = get_jwt_identity()
@@ -372,7 +320,7 @@ def get_student_programs():
             all_programs = []
 
             for course in all_student_courses:
-                all_programs_in_course = ProgramDetails.query.filter_by(course_id=course.id).all()
+                all_programs_in_course = ProgramDetails.query.filter_by(course_id=course.id, deleted_at=None).all()
 
                 # get global programs for instructor
                 global_programs = get_global_programs(course.instructor_id)
@@ -425,11 +373,14 @@ def cancel_appointment(appointment_id):
             #check if the appointment is in the future
             if appointment_datetime > current_time:
                 # Make the appointment available for reservation
+                attendee_id = appointment.attendee_id
                 appointment.status = 'posted'
                 appointment.meeting_url = None
                 appointment.attendee_id = None
                 appointment.notes = None
+                record_slot_event(appointment)
                 db.session.commit()
+                refresh_dashboards(appointment.host_id, attendee_id)
                 return jsonify({"message": "Appointment cancelled successfully"}), 200
             else:
                 return jsonify({"error": "Past appointments cannot be cancelled"}), 400
@@ -440,14 +391,21 @@ def cancel_appointment(appointment_id):
         return jsonify({"error": str(e)}), 500
     
 # Get all appointment based programs for all courses a student is enrolled in
+# ?fields=id,name limits the program attributes returned and the columns loaded
 @student.route('/student/programs/appointment-based', methods=['GET'])
 @jwt_required()
+@response_cache.cached(scope=identity_scope, tags=caller_tags)
 def get_appointment_programs():
     try:
         student_id = get_jwt_identity()
 
         if not is_student(student_id):
             return jsonify({"error": "Student not found"}), 404
+
+        try:
+            fields = parse_fields(request.args.get('fields'), STUDENT_PROGRAM_FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
         student_courses = CourseDetails.query.join(CourseMembers, CourseDetails.id == CourseMembers.course_id).filter_by(user_id=student_id).all()
         converted_courses = [{'course_id': course.id, 'course_name': course.name} for course in student_courses]
@@ -460,41 +418,20 @@ def get_appointment_programs():
             for entry in converted_courses:
                 course_id = entry['course_id']
 
-                programs_in_course = ProgramDetails.query.filter_by(course_id=course_id).all()
+                # appointment based (not dropin) programs, loading only the requested columns
+                programs_in_course = ProgramDetails.query.options(load_fields(ProgramDetails, fields)).filter_by(
+                    course_id=course_id, deleted_at=None, isDropins=False).all()
 
                 course = CourseDetails.query.filter_by(id=course_id).first()
 
-                global_programs = get_global_programs(course.instructor_id)
+                global_programs = get_global_programs(course.instructor_id, fields, exclude_dropins=True)
 
                 # list of all programs in a course
-                programs_in_course_list = []
-
-                for program in programs_in_course:
-                    # check if program is not a dropin
-                    if program.isDropins == False:
-                        # convert attributes to a object
-                        program_info = {
-                            'id': program.id,
-                            'name': program.name,
-                            'description': program.description,
-                            'duration': program.duration,
-                            'physical_location': program.physical_location,
-                            'meeting_url': program.meeting_url,
-                            'auto_approve_appointments': program.auto_approve_appointments,
-                            'max_daily_meetings': program.max_daily_meetings,
-                            'max_weekly_meetings': program.max_weekly_meetings,
-                            'max_monthly_meetings': program.max_monthly_meetings,
-                            'isDropins': program.isDropins,
-                        }
-
-                        # append object to list
-                        programs_in_course_list.append(program_info)
+                programs_in_course_list = [serialize_fields(program, fields) for program in programs_in_course]
 
-                # if global programs found and a dropin, append to programs_in_course_list 
+                # if global programs found, append to programs_in_course_list 
                 if global_programs is not None:
-                    for global_program in global_programs:
-                        if global_program['isDropins'] == False:
-                            programs_in_course_list.append(global_program)
+                    programs_in_course_list.extend(global_programs)
 
                 # format data to append to courses_list
                 formatTuple = {
@@ -513,6 +450,7 @@ def get_appointment_programs():
         return jsonify({"error": str(e)}), 500
     
 # Retrieve available appointments to reserve for a student
+# ?from=&to= bound the dates (two weeks from 'from' by default, at most AVAILABLE_MAX_SPAN_DAYS), ?limit=&after= page through them
 @student.route('/student/appointments/available/<program_id>/<course_id>', methods=['GET'])
 @jwt_required()
 def get_available_appointments(program_id, course_id):
@@ -523,43 +461,164 @@ def get_available_appointments(program_id, course_id):
             return jsonify({"error": "Student not found"}), 404
         
         now = datetime.now()
+        today = now.strftime('%Y-%m-%d')
+
+        try:
+            window_from = max(request.args.get('from', today), today)
+            first_day = datetime.strptime(window_from, '%Y-%m-%d')
+            window_to = request.args.get('to', (first_day + timedelta(days=AVAILABLE_WINDOW_DAYS)).strftime('%Y-%m-%d'))
+            datetime.strptime(window_to, '%Y-%m-%d')
+            window_to = min(window_to, (first_day + timedelta(days=AVAILABLE_MAX_SPAN_DAYS)).strftime('%Y-%m-%d'))
+            limit = parse_limit(request.args.get('limit'), default=AVAILABLE_PAGE_SIZE, maximum=AVAILABLE_MAX_PAGE_SIZE)
+            cursor = decode_cursor(request.args['after']) if request.args.get('after') else None
+        except ValueError:
+            return jsonify({"error": "from and to must be 'YYYY-MM-DD', limit a number and after a cursor returned by this endpoint"}), 400
+
+        program = ProgramDetails.query.filter_by(id=program_id, deleted_at=None).first()
+
+        # course programs are only listed under their own course
+        if not program or (program.course_id is not None and str(program.course_id) != str(course_id)):
+            return jsonify({"error": "Program not found"}), 404
 
-        program = ProgramDetails.query.filter_by(id=program_id).first()
+        # expand recurring availability into bookable slots for the requested window
+        materialize_program_rules(program.id, window_from, window_to)
+
+        # posted slots in the window, skipping ones that already started today
+        appointments_query = db.session.query(
+            Appointment.id, Appointment.appointment_date, Appointment.start_time, Appointment.end_time, Appointment.status,
+            Appointment.physical_location, Appointment.meeting_url, Availability.program_id
+        ).join(Availability, Appointment.availability_id == Availability.id).filter(
+            Availability.program_id == program.id,
+            Appointment.status == 'posted',
+            Appointment.appointment_date.between(window_from, window_to),
+            or_(Appointment.appointment_date > today, Appointment.start_time > now.strftime('%H:%M'))
+        )
+        if cursor:
+            appointments_query = appointments_query.filter(after_cursor(*cursor))
+
+        # hide the days of the window on which one more booking would exceed a meeting limit of the host
+        limits = program_limits(program)
+        if has_limits(limits):
+            counts = booked_counts([program.instructor_id], window_from, window_to)
+            blocked = outside_ranges(blocked_ranges(limits, counts[program.instructor_id], window_from, window_to))
+            if blocked is not None:
+                appointments_query = appointments_query.filter(blocked)
+
+        rows = appointments_query.order_by(*slot_order()).limit(limit + 1).all()
+
+        page, next_cursor = paginate(rows, limit, lambda row: (row.appointment_date, row.start_time, row.id))
+
+        return jsonify({
+            "program_id": program.id,
+            "from": window_from,
+            "to": window_to,
+            "available_appointments": [{
+                "appointment_id": row.id,
+                "physical_location": row.physical_location,
+                "date": row.appointment_date,
+                "program_id": row.program_id,
+                "start_time": row.start_time,
+                "end_time": row.end_time,
+                "status": row.status,
+                "meeting_url": row.meeting_url
+            } for row in page],
+            "next_cursor": next_cursor
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        if program:
-            # convert to empty to match attribute in ProgramDetails
-            if program.course_id == None:
-                course_id = None
-            
-            # get all future appointments for the program
-            future_appointments = Appointment.query.join(Availability).join(ProgramDetails).filter(
-                (Appointment.status == 'posted') &
-                (ProgramDetails.id == program_id) &
-                (ProgramDetails.course_id == course_id) &
-                (Appointment.appointment_date > now.date())
-            ).all()
+# Earliest open slots across every appointment based program a student can book
+@student.route('/student/slots/next', methods=['GET'])
+@jwt_required()
+def get_next_available_slots():
+    try:
+        student_id = get_jwt_identity()
 
+        if not is_student(student_id):
+            return jsonify({"error": "Student not found"}), 404
 
-            available_appointments = []
-            for appt in future_appointments:
-                # convert attributes to a object
-                appointment_data = {
-                    "appointment_id": appt.id,
-                    "physical_location": appt.physical_location,
-                    "date": appt.appointment_date,
-                    "program_id": appt.availability.program_details.id,
-                    "start_time": appt.start_time,
-                    "end_time": appt.end_time,
-                    "status": appt.status,
-                    "meeting_url": appt.meeting_url
-                }
+        try:
+            limit = parse_limit(request.args.get('limit'), default=10)
+            cursor = decode_cursor(request.args['after']) if request.args.get('after') else None
+        except ValueError:
+            return jsonify({"error": "limit must be a number and after must be a cursor returned by this endpoint"}), 400
 
-                # append object to list
-                available_appointments.append(appointment_data)
-                    
-            return jsonify({"available_appointments": available_appointments})
-        else:
-            return jsonify({"error": "Program not found"}), 404
+        courses_query = db.session.query(CourseDetails.id, CourseDetails.instructor_id).join(
+            CourseMembers, CourseDetails.id == CourseMembers.course_id).filter(CourseMembers.user_id == student_id)
+        if request.args.get('course_id'):
+            courses_query = courses_query.filter(CourseDetails.id == request.args.get('course_id'))
+        courses = courses_query.order_by(CourseDetails.id).all()
+
+        if not courses:
+            return jsonify({"error": "no courses found for student"}), 404
+
+        # global programs are booked through the first of the student's courses taught by their instructor
+        course_ids = [course_id for course_id, _ in courses]
+        course_for_instructor = {}
+        for course_id, instructor_id in courses:
+            course_for_instructor.setdefault(instructor_id, course_id)
+
+        programs = db.session.query(ProgramDetails.id, ProgramDetails.name, ProgramDetails.course_id, ProgramDetails.instructor_id,
+                                    ProgramDetails.max_daily_meetings, ProgramDetails.max_weekly_meetings,
+                                    ProgramDetails.max_monthly_meetings).filter(
+            ProgramDetails.isDropins == False,
+            ProgramDetails.deleted_at == None,
+            or_(ProgramDetails.course_id.in_(course_ids),
+                and_(ProgramDetails.course_id == None, ProgramDetails.instructor_id.in_(list(course_for_instructor))))
+        ).all()
+
+        if not programs:
+            return jsonify({"slots": [], "next_cursor": None}), 200
+
+        programs_by_id = {program.id: program for program in programs}
+        materialize_rules_for_programs(list(programs_by_id))
+
+        now = datetime.now()
+        today, current_time = now.strftime('%Y-%m-%d'), now.strftime('%H:%M')
+
+        # one ordered range scan over posted slots of all the programs, limit + 1 rows to detect another page
+        slots_query = db.session.query(
+            Appointment.id, Appointment.appointment_date, Appointment.start_time, Appointment.end_time,
+            Appointment.physical_location, Appointment.meeting_url, Availability.program_id
+        ).join(Availability, Appointment.availability_id == Availability.id).filter(
+            Appointment.status == 'posted',
+            Availability.program_id.in_(list(programs_by_id)),
+            or_(Appointment.appointment_date > today,
+                and_(Appointment.appointment_date == today, Appointment.start_time > current_time))
+        )
+        if cursor:
+            slots_query = slots_query.filter(after_cursor(*cursor))
+
+        # hide slots in periods where the program's host has reached one of the program's limits
+        limited = {program.id: program_limits(program) for program in programs if has_limits(program_limits(program))}
+        if limited:
+            counts = booked_counts(list({programs_by_id[program_id].instructor_id for program_id in limited}), today)
+            blocked = outside_program_ranges(Availability.program_id, {
+                program_id: blocked_ranges(limits, counts[programs_by_id[program_id].instructor_id], today)
+                for program_id, limits in limited.items()
+            })
+            if blocked is not None:
+                slots_query = slots_query.filter(blocked)
+        rows = slots_query.order_by(*slot_order()).limit(limit + 1).all()
+
+        page, next_cursor = paginate(rows, limit, lambda row: (row.appointment_date, row.start_time, row.id))
+
+        slots = []
+        for row in page:
+            program = programs_by_id[row.program_id]
+            slots.append({
+                "appointment_id": row.id,
+                "program_id": program.id,
+                "program_name": program.name,
+                "course_id": program.course_id if program.course_id is not None else course_for_instructor.get(program.instructor_id),
+                "date": row.appointment_date,
+                "start_time": row.start_time,
+                "end_time": row.end_time,
+                "physical_location": row.physical_location,
+                "meeting_url": row.meeting_url
+            })
+
+        return jsonify({"slots": slots, "next_cursor": next_cursor}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -586,62 +645,37 @@ def reserve_appointment(appointment_id, course_id):
         if appointment_datetime <= current_time:
             return jsonify({"error": "Cannot reserve past appointments"}), 400
 
-        instructor_limits = ProgramDetails.query.filter_by(id=appointment.availability.program_details.id).first()
+        # a student can't hold overlapping appointments or book over their own class meetings
+        conflict = find_student_conflict(student_id, appointment)
+        if conflict:
+            return jsonify({"error": describe_conflict(conflict), "conflict": conflict}), 409
 
-        # Calculate week range for the appointment
-        start_of_week, end_of_week = get_week_range(appointment.appointment_date)
+        # programs being deleted in the background no longer take bookings
+        instructor_limits = ProgramDetails.query.filter_by(id=appointment.availability.program_id, deleted_at=None).first() if appointment.availability else None
+        if not instructor_limits:
+            return jsonify({"error": "Appointment is not available for reservation"}), 400
 
-        # Count current reserved and pending appointments for the day
-        daily_count = Appointment.query.filter(
-            Appointment.host_id == appointment.host_id,
-            func.date(Appointment.appointment_date) == appointment.appointment_date,
-            Appointment.status.in_(['reserved', 'pending'])
-        ).count()
+        # count the host's reserved and pending appointments around the date in one grouped query
+        limits = program_limits(instructor_limits) if instructor_limits else None
+        reached = None
+        if limits and has_limits(limits):
+            counts = booked_counts([appointment.host_id], appointment.appointment_date, appointment.appointment_date)
+            reached = limit_reached(limits, counts[appointment.host_id], appointment.appointment_date)
 
-        # Count current reserved and pending appointments for the week
-        weekly_count = Appointment.query.filter(
-            Appointment.host_id == appointment.host_id,
-            func.date(Appointment.appointment_date).between(start_of_week, end_of_week),
-            Appointment.status.in_(['reserved', 'pending'])
-        ).count()
-        
-        parsed_appointment_date = datetime.strptime(appointment.appointment_date, '%Y-%m-%d')
-
-        # Count current reserved and pending appointments for the month
-        monthly_count = Appointment.query.filter(
-            Appointment.host_id == appointment.host_id,
-            extract('month', func.date(Appointment.appointment_date)) == parsed_appointment_date.month,
-            extract('year', func.date(Appointment.appointment_date)) == parsed_appointment_date.year,
-            Appointment.status.in_(['reserved', 'pending'])
-        ).count()
-        
-        # Check against daily and weekly limits
-        if (not instructor_limits) or (daily_count < instructor_limits.max_daily_meetings and \
-            weekly_count < instructor_limits.max_weekly_meetings and monthly_count < instructor_limits.max_monthly_meetings):
+        # Check against daily, weekly and monthly limits
+        if not reached:
             try:
                 appointment.attendee_id = student_id
                 appointment.course_id = course_id
                 appointment.notes = data.get('notes', None)
-                if instructor_limits.auto_approve_appointments:
+                if not instructor_limits or instructor_limits.auto_approve_appointments:
                     appointment.status = 'reserved'
                 else:
                     appointment.status = 'pending'
-                appointment.course_id = course_id
-                    
-                # Check if this appointment hits the daily or weekly limit
-                hits_daily_limit = daily_count + 1 == instructor_limits.max_daily_meetings
-                hits_weekly_limit = weekly_count + 1 == instructor_limits.max_weekly_meetings
-                hits_monthly_limit = monthly_count + 1 == instructor_limits.max_monthly_meetings
+                record_slot_event(appointment)
                 db.session.commit()
-                
-                if hits_daily_limit:
-                    update_appointments_status(appointment.host_id, appointment.appointment_date, 'daily')
-                elif hits_weekly_limit:
-                    update_appointments_status(appointment.host_id, appointment.appointment_date, 'weekly')
-                elif hits_monthly_limit:
-                    update_appointments_status(appointment.host_id, appointment.appointment_date, 'monthly')
-
-                
+                refresh_dashboards(appointment.host_id, student_id)
+
                 if appointment.status == 'reserved':
                     send_email_success = send_confirmation_email(appointment)
                     if send_email_success:
@@ -655,12 +689,8 @@ def reserve_appointment(appointment_id, course_id):
                 print(f"Exception: {str(e)}")
                 return jsonify({"error": f"Exception: {str(e)}"}), 500
         else:
-            # Update remaining slots if limits are reached
-            if daily_count >= instructor_limits.max_daily_meetings:
-                update_appointments_status(appointment.host_id, appointment.appointment_date, 'daily')
-            elif weekly_count >= instructor_limits.max_weekly_meetings:
-                update_appointments_status(appointment.host_id, appointment.appointment_date, 'weekly')
-            return jsonify({"message": "Meeting limit reached"}), 409
+            # remaining slots of the period are hidden at read time, nothing to rewrite here
+            return jsonify({"message": "Meeting limit reached", "limit": reached}), 409
     except Exception as e:
         print(f"ERM: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -16,7 +16,9 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, \
 from .models import User, Appointment, ProgramDetails, CourseDetails, CourseMembers, ProgramTimes, CourseTimes
 from . import db
 from .mail import send_email
-from ics import Calendar, Event
+from .dashboard import refresh_dashboards
+from .slot_stream import record_slot_event
+from .analytics import mark_days_stale
 from datetime import datetime, timedelta, timezone
 
 user = Blueprint('user', __name__)
@@ -42,12 +44,13 @@ def refresh_expiring_jwts(response):
 
 # check if user is an instructor
 def is_instructor(user_id):
-    instructor = User.query.get(user_id)
+    # JWT identities are strings, the identity map is keyed by the integer id
+    instructor = User.query.get(int(user_id))
     return instructor.account_type == 'instructor' if instructor else False
 
 # check if user is an student
 def is_student(user_id):
-    student = User.query.get(user_id)
+    student = User.query.get(int(user_id))
     return student.account_type == 'student' if student else False
 
 # convert a military time object to a standard time object
@@ -162,6 +165,9 @@ def get_user_data(user_id):
     
 # Helper function to send confirmation email to attendee and host
 def send_confirmation_email(appointment):
+    # imported on first use to keep ics out of worker startup
+    from ics import Calendar, Event
+
     attendee = User.query.get(appointment.attendee_id)
     host = User.query.get(appointment.host_id)
 
@@ -247,6 +253,7 @@ def get_user_courses():
                     'discord_link': course.discord_link,
                     'instructor_id': course.instructor_id,
                     'course_times': courseTimes,
+                    'times_version': course.times_version or 0,
                     'office_hours': officeHours
                 }
                 
@@ -328,6 +335,7 @@ def update_meeting():
             if meeting_url is not None:
                 appointment.meeting_url = meeting_url
             db.session.commit()
+            refresh_dashboards(appointment.host_id, appointment.attendee_id)
             return jsonify({"message": "Meeting updated successfully"}), 200
         else:
             return jsonify({"error": "Appointment doesn't exist"}), 404
@@ -348,7 +356,11 @@ def update_meeting_status():
 
         if appointment:
             appointment.status = status
+            record_slot_event(appointment)
+            # attendance is usually marked once the day is over
+            mark_days_stale(appointment.appointment_date)
             db.session.commit()
+            refresh_dashboards(appointment.host_id, appointment.attendee_id)
             if appointment.status == 'reserved':
                 send_confirmation_email(appointment)
             return jsonify({"message": "status updated successfully"}), 200
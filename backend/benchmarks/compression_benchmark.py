@@ -0,0 +1,75 @@
+"""
+ * compression_benchmark.py
+ * Last Edited: 10/18/26
+ *
+ * Measures response size and end-to-end latency of the large list
+ * endpoints on the seeded dataset with no compression, gzip and (when the
+ * brotli package is installed) brotli. Latency is the median server time
+ * through the test client plus the transfer time of the body over a
+ * BENCH_LINK_MBPS link (default 10 Mbit/s, slow campus Wi-Fi).
+ *
+ * Usage (from the backend directory):
+ *   python benchmarks/compression_benchmark.py [runs]
+ *
+"""
+
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+from seed import create_seeded_app
+from flask_jwt_extended import create_access_token
+from api import compression
+
+LINK_MBPS = float(os.environ.get('BENCH_LINK_MBPS', 10))
+
+# (label, user the request is made as, url)
+ENDPOINTS = [
+    ('instructor appointments', 'instructor', '/instructor/appointments'),
+    ('instructor availability', 'instructor', '/instructor/availability/{course}'),
+    ('admin user list', 'admin', '/admin/all-users'),
+    ('student available slots', 'student', '/student/appointments/available/{program}/{course}?to={until}&limit=500'),
+]
+
+# median server milliseconds and body bytes of one endpoint with an Accept-Encoding
+def measure(client, url, accept_encoding, runs):
+    timings = []
+    size = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = client.get(url, headers={'Accept-Encoding': accept_encoding})
+        body = response.get_data()
+        timings.append((time.perf_counter() - start) * 1000)
+        size = len(body)
+    return statistics.median(timings), size, response.headers.get('Content-Encoding', 'identity')
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    app, users = create_seeded_app()
+    encodings = ['identity', 'gzip'] + (['br'] if compression.brotli is not None else [])
+
+    with app.app_context():
+        clients = {}
+        for role in ['admin', 'instructor', 'student']:
+            clients[role] = app.test_client()
+            clients[role].set_cookie('access_token_cookie', create_access_token(identity=str(users[role])))
+
+    print(f"{'endpoint':<26}{'encoding':>10}{'bytes':>12}{'ratio':>8}{'server ms':>11}{'transfer ms':>13}{'total ms':>10}")
+    for label, role, url in ENDPOINTS:
+        url = url.format(until=(date.today() + timedelta(days=30)).strftime('%Y-%m-%d'), **users)
+        baseline = None
+        for accept_encoding in encodings:
+            server_ms, size, encoding = measure(clients[role], url, accept_encoding, runs)
+            baseline = baseline or size
+            transfer_ms = size * 8 / (LINK_MBPS * 1000)
+            print(f"{label:<26}{encoding:>10}{size:>12}{size / baseline:>8.2f}{server_ms:>11.1f}{transfer_ms:>13.1f}{server_ms + transfer_ms:>10.1f}")
+
+    if compression.brotli is None:
+        print("brotli is not installed, only gzip was measured (pip install brotli)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
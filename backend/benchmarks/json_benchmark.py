@@ -0,0 +1,94 @@
+"""
+ * json_benchmark.py
+ * Last Edited: 10/18/26
+ *
+ * Micro-benchmark of jsonify with the stdlib encoder and with orjson on
+ * payloads taken from the seeded dataset: the get_instructor_appointments
+ * list, a get_all_feedback export (built in the same shape from the
+ * seeded rows) and a comment list with datetimes.
+ *
+ * Usage (from the backend directory):
+ *   python benchmarks/json_benchmark.py [iterations]
+ *
+"""
+
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+from seed import create_seeded_app
+from flask import jsonify
+from flask_jwt_extended import create_access_token
+from api.json_provider import orjson
+from api.models import Feedback, Appointment, Availability, User
+
+# the feedback export in the shape returned by get_all_feedback
+def feedback_payload():
+    names = dict(User.query.with_entities(User.id, User.name))
+    rows = Feedback.query.join(Appointment, Feedback.appointment_id == Appointment.id).join(
+        Availability, Appointment.availability_id == Availability.id).with_entities(Feedback, Appointment, Availability.program_id)
+    return {"feedback_list": [{
+        "id": feedback.id,
+        "appointment_type": program_id,
+        "attendee_id": names.get(feedback.attendee_id),
+        "attendee_rating": feedback.attendee_rating,
+        "attendee_notes": feedback.attendee_notes,
+        "host_id": names.get(feedback.host_id),
+        "host_rating": feedback.host_rating,
+        "host_notes": feedback.host_notes,
+        "appointment_id": feedback.appointment_id,
+        "appointment_data": {
+            "start_time": appointment.start_time,
+            "end_time": appointment.end_time,
+            "appointment_date": appointment.appointment_date,
+            "meeting_url": appointment.meeting_url,
+            "notes": appointment.notes,
+            "attendee_id": appointment.attendee_id,
+            "host_id": appointment.host_id,
+            "status": appointment.status
+        }
+    } for feedback, appointment, program_id in rows]}
+
+# a get_comments response with a datetime per comment
+def comments_payload(count=1000):
+    start = datetime(2026, 1, 5, 9, 0)
+    return {"comments": [{
+        'id': i, 'name': f'Student Number {i}', 'title': None, 'pronouns': 'she/her', 'user_id': i,
+        'appointment_comment': 'Can we go over problem 3 from the practice exam?',
+        'created_at': start + timedelta(minutes=i),
+    } for i in range(count)]}
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    app, users = create_seeded_app()
+
+    with app.app_context():
+        client = app.test_client()
+        client.set_cookie('access_token_cookie', create_access_token(identity=str(users['instructor'])))
+        payloads = [
+            ('get_instructor_appointments', client.get('/instructor/appointments').get_json()),
+            ('get_all_feedback', feedback_payload()),
+            ('get_comments', comments_payload()),
+        ]
+
+    encoders = [('stdlib', False)] + ([('orjson', True)] if orjson is not None else [])
+    print(f"{'payload':<30}{'bytes':>10}" + ''.join(f"{name + ' ms':>14}" for name, _ in encoders) + f"{'speedup':>10}")
+
+    with app.test_request_context():
+        for label, payload in payloads:
+            timings = []
+            for _, fast in encoders:
+                app.json.fast = fast
+                size = len(jsonify(payload).get_data())
+                timings.append(min(timeit.repeat(lambda: jsonify(payload), number=iterations, repeat=3)) / iterations * 1000)
+            speedup = f"{timings[0] / timings[-1]:.1f}x" if len(timings) > 1 else '-'
+            print(f"{label:<30}{size:>10}" + ''.join(f"{ms:>14.2f}" for ms in timings) + f"{speedup:>10}")
+
+    if orjson is None:
+        print("orjson is not installed, only the stdlib encoder was measured (pip install orjson)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
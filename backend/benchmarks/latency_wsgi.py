@@ -0,0 +1,27 @@
+"""
+ * latency_wsgi.py
+ * Last Edited: 10/18/26
+ *
+ * The production app with BENCH_DB_LATENCY_MS of sleep before every SQL
+ * statement, standing in for the network round trip to a remote MySQL
+ * server when the server benchmark runs against a local SQLite file.
+ *
+ * Usage (started by server_benchmark.py):
+ *   gunicorn -c gunicorn.conf.py --pythonpath benchmarks latency_wsgi:app
+ *
+"""
+
+import os
+import time
+from sqlalchemy import event
+from wsgi import app
+from api import db
+
+LATENCY = float(os.environ.get('BENCH_DB_LATENCY_MS', 0)) / 1000
+
+def wait_for_database(conn, cursor, statement, parameters, context, executemany):
+    time.sleep(LATENCY)
+
+if LATENCY:
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', wait_for_database)
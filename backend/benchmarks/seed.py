@@ -0,0 +1,103 @@
+"""
+ * seed.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the benchmark dataset: one instructor with a course, a program,
+ * several weeks of posted availability around today split into 30 minute
+ * appointments, booked students with notes, and feedback on the booked
+ * meetings. Rows are written with multi-row inserts so a few thousand
+ * take well under a second on SQLite.
+ *
+ * Usage (from another benchmark):
+ *   app, users = create_seeded_app(students=500, days=60)
+ *
+"""
+
+import os
+import sys
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-secret-key-that-is-long-enough')
+
+from sqlalchemy import insert
+from api import create_app, db
+from api.models import User, CourseDetails, CourseMembers, ProgramDetails, Availability, Appointment, Feedback
+
+# the dataset starts two weeks in the past so it has both past and upcoming meetings
+START_OFFSET_DAYS = -14
+NOTES = "Questions about the assignment, the lecture slides and the upcoming midterm review session."
+
+# create an app on an in-memory database filled with the benchmark dataset
+def create_seeded_app(students=500, days=60, slots_per_day=16, config=None):
+    app = create_app()
+    app.config.update(config or {})
+    app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+    with app.app_context():
+        db.create_all()
+        users = seed(students, days, slots_per_day)
+    return app, users
+
+# insert the dataset, returning the ids of the admin, instructor and first student
+def seed(students, days, slots_per_day):
+    admin = User(email='admin@uw.edu', name='Admin', account_type='admin', status='active')
+    instructor = User(email='instructor@uw.edu', name='Instructor', account_type='instructor', status='active',
+                      pronouns='they/them')
+    db.session.add_all([admin, instructor])
+    db.session.flush()
+
+    db.session.execute(insert(User), [{
+        'email': f'student{i}@uw.edu', 'name': f'Student Number {i}', 'account_type': 'student',
+        'status': 'active', 'pronouns': 'she/her' if i % 2 else 'he/him',
+    } for i in range(students)])
+    student_ids = [user_id for (user_id,) in db.session.query(User.id).filter(User.account_type == 'student').order_by(User.id)]
+
+    course = CourseDetails(name='CSS 142 Computer Programming I', instructor_id=instructor.id, quarter='Winter 2026',
+                           physical_location='UW1-040', meeting_url='https://washington.zoom.us/j/1234567890')
+    db.session.add(course)
+    db.session.flush()
+    db.session.execute(insert(CourseMembers), [{'course_id': course.id, 'user_id': user_id}
+                                               for user_id in [instructor.id] + student_ids])
+
+    program = ProgramDetails(name='Office Hours', description='Weekly office hours for homework and exam questions.',
+                             course_id=course.id, instructor_id=instructor.id, duration=30,
+                             physical_location='DISC 464', meeting_url='https://washington.zoom.us/j/1234567890',
+                             isDropins=False, auto_approve_appointments=True)
+    db.session.add(program)
+    db.session.flush()
+
+    start_date = date.today() + timedelta(days=START_OFFSET_DAYS)
+    dates = [(start_date + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range(days)]
+    db.session.execute(insert(Availability), [{
+        'user_id': instructor.id, 'program_id': program.id, 'date': day,
+        'start_time': '09:00', 'end_time': f"{9 + slots_per_day // 2:02d}:00", 'status': 'active',
+    } for day in dates])
+    availability_ids = dict(db.session.query(Availability.date, Availability.id).filter(Availability.program_id == program.id))
+
+    appointments = []
+    for day in dates:
+        for slot in range(slots_per_day):
+            start = 9 * 60 + slot * 30
+            attendee = student_ids[(len(appointments) * 7) % len(student_ids)] if slot % 3 == 0 and student_ids else None
+            appointments.append({
+                'host_id': instructor.id, 'course_id': course.id, 'attendee_id': attendee,
+                'availability_id': availability_ids[day], 'appointment_date': day,
+                'start_time': f"{start // 60:02d}:{start % 60:02d}", 'end_time': f"{(start + 30) // 60:02d}:{(start + 30) % 60:02d}",
+                'physical_location': program.physical_location, 'meeting_url': program.meeting_url,
+                'notes': NOTES if attendee else None, 'status': 'reserved' if attendee else 'posted',
+            })
+    db.session.execute(insert(Appointment), appointments)
+
+    booked = db.session.query(Appointment.id, Appointment.attendee_id).filter(Appointment.attendee_id.isnot(None))
+    db.session.execute(insert(Feedback), [{
+        'appointment_id': appointment_id, 'attendee_id': attendee_id, 'host_id': instructor.id,
+        'attendee_rating': str(1 + appointment_id % 5), 'attendee_notes': 'Helpful, went over the practice problems.',
+        'host_rating': str(1 + attendee_id % 5), 'host_notes': 'Came prepared with questions.',
+    } for appointment_id, attendee_id in booked])
+    db.session.commit()
+
+    return {'admin': admin.id, 'instructor': instructor.id, 'student': student_ids[0] if student_ids else None,
+            'course': course.id, 'program': program.id}
@@ -0,0 +1,162 @@
+"""
+ * server_benchmark.py
+ * Last Edited: 10/18/26
+ *
+ * Runs the seeded endpoint suite against gunicorn under each worker model
+ * (sync, threaded, gevent when installed) at several client concurrency
+ * levels and prints throughput, latency percentiles and errors for each.
+ * The dataset goes to a SQLite file shared by the workers, and every SQL
+ * statement waits BENCH_DB_LATENCY_MS (default 2) to stand in for the
+ * round trip to a networked MySQL server. The response cache is off so
+ * every request reaches the database.
+ *
+ * Usage (from the backend directory):
+ *   python benchmarks/server_benchmark.py [seconds per run]
+ *
+ * Environment:
+ *   BENCH_WORKER_CLASSES  default sync,threaded,gevent
+ *   BENCH_CONCURRENCY     default 1,8,32,64
+ *   BENCH_WORKERS         gunicorn workers, default the number of CPUs
+ *
+"""
+
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+DATABASE_DIR = tempfile.mkdtemp(prefix='server-benchmark-')
+os.environ['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(DATABASE_DIR, 'benchmark.sqlite3')}"
+os.environ['RESPONSE_CACHE_BACKEND'] = 'none'
+os.environ.setdefault('BENCH_DB_LATENCY_MS', '2')
+
+sys.path.insert(0, os.path.dirname(__file__))
+from seed import create_seeded_app, BACKEND_DIR
+from flask_jwt_extended import create_access_token
+
+WORKER_CLASSES = os.environ.get('BENCH_WORKER_CLASSES', 'sync,threaded,gevent').split(',')
+CONCURRENCY = [int(level) for level in os.environ.get('BENCH_CONCURRENCY', '1,8,32,64').split(',')]
+WORKERS = int(os.environ.get('BENCH_WORKERS', os.cpu_count() or 2))
+
+# (user the request is made as, url) cycled through by every client
+ENDPOINTS = [
+    ('student', '/dashboard'),
+    ('student', '/student/programs/descriptions'),
+    ('student', '/student/appointments?type=upcoming'),
+    ('student', '/student/appointments/available/{program}/{course}?to={until}'),
+    ('instructor', '/instructor/appointments?type=upcoming'),
+    ('instructor', '/instructor/programs'),
+]
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+# start gunicorn with a worker model and wait until it accepts connections
+def start_server(worker_class, port):
+    env = dict(os.environ, GUNICORN_WORKER_CLASS=worker_class, GUNICORN_BIND=f'127.0.0.1:{port}',
+               GUNICORN_WORKERS=str(WORKERS), GUNICORN_LOG_LEVEL='warning')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--pythonpath', 'benchmarks',
+                               'latency_wsgi:app'], cwd=BACKEND_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {server.returncode}")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("gunicorn didn't start within 30 seconds")
+
+def stop_server(server):
+    server.terminate()
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+# one client: a keep-alive connection going through the suite until the deadline
+def run_client(port, requests, deadline, offset, latencies, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    index = offset
+    while time.monotonic() < deadline:
+        path, headers = requests[index % len(requests)]
+        index += 1
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+            else:
+                latencies.append((time.perf_counter() - start) * 1000)
+        except (OSError, http.client.HTTPException):
+            errors.append(None)
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    connection.close()
+
+# requests per second, latency percentiles and error count of one concurrency level
+def load(port, requests, concurrency, seconds):
+    latencies, errors = [], []
+    deadline = time.monotonic() + seconds
+    clients = [threading.Thread(target=run_client, args=(port, requests, deadline, i, latencies, errors))
+               for i in range(concurrency)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+
+    if not latencies:
+        return 0, None, None, None, len(errors)
+    ordered = sorted(latencies)
+    percentile = lambda p: ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+    return len(latencies) / seconds, statistics.median(ordered), percentile(0.95), percentile(0.99), len(errors)
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    try:
+        import gunicorn
+    except ImportError:
+        print("gunicorn is not installed (pip install -r requirements.txt)")
+        return 1
+
+    app, users = create_seeded_app()
+    until = (date.today() + timedelta(days=30)).strftime('%Y-%m-%d')
+    with app.app_context():
+        cookies = {role: f"access_token_cookie={create_access_token(identity=str(users[role]))}" for role in ['student', 'instructor']}
+    requests = [(url.format(until=until, **users), {'Cookie': cookies[role]}) for role, url in ENDPOINTS]
+
+    print(f"{WORKERS} workers, {os.environ['BENCH_DB_LATENCY_MS']} ms per SQL statement, {seconds:.0f} s per run")
+    print(f"{'worker class':<14}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for worker_class in WORKER_CLASSES:
+        if worker_class == 'gevent':
+            try:
+                import gevent
+            except ImportError:
+                print(f"{worker_class:<14}skipped, gevent is not installed (pip install gevent)")
+                continue
+
+        port = free_port()
+        server = start_server(worker_class, port)
+        try:
+            for concurrency in CONCURRENCY:
+                rps, p50, p95, p99, errors = load(port, requests, concurrency, seconds)
+                timing = ''.join(f"{value:>10.1f}" if value is not None else f"{'-':>10}" for value in (p50, p95, p99))
+                print(f"{worker_class:<14}{concurrency:>8}{rps:>10.1f}{timing}{errors:>8}")
+        finally:
+            stop_server(server)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
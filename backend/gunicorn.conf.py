@@ -0,0 +1,82 @@
+"""
+ * gunicorn.conf.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the production server settings, read by gunicorn from the
+ * backend directory:
+ *   gunicorn -c gunicorn.conf.py wsgi:app
+ * The app is imported once in the master (preload_app, GUNICORN_PRELOAD)
+ * and forked into GUNICORN_WORKERS processes. GUNICORN_WORKER_CLASS picks
+ * the worker model:
+ *   sync      one request at a time per process
+ *   threaded  GUNICORN_THREADS requests per process (gthread, the default)
+ *   gevent    GUNICORN_WORKER_CONNECTIONS requests per process on greenlets,
+ *             needs `pip install gevent`
+ * Preloaded workers share the master's copy of the app, so HUP replaces
+ * them with the code already loaded. To deploy new code send USR2 to the
+ * master, which starts a new master and workers, then WINCH and QUIT to
+ * the old master (its pid moves to GUNICORN_PID_FILE.oldbin). With
+ * GUNICORN_PRELOAD=false every worker imports the app itself and HUP
+ * reloads the code, at the cost of slower worker boot and no memory
+ * shared between workers. Workers are also recycled after
+ * GUNICORN_MAX_REQUESTS. With more than one worker the response cache
+ * defaults to the shared backend, and RESPONSE_CACHE_BACKEND=lru is
+ * refused since each worker would keep serving entries another invalidated.
+ *
+ * Known Bugs:
+ * - sync workers are tied up by /events streams until the client leaves,
+ *   use threaded or gevent when streams are in use
+ *
+"""
+
+import multiprocessing
+import os
+
+WORKER_CLASSES = {'sync': 'sync', 'threaded': 'gthread', 'gthread': 'gthread', 'gevent': 'gevent'}
+
+worker_model = os.environ.get('GUNICORN_WORKER_CLASS', 'threaded').lower()
+if worker_model not in WORKER_CLASSES:
+    raise ValueError(f"unknown GUNICORN_WORKER_CLASS '{worker_model}', use sync, threaded or gevent")
+worker_class = WORKER_CLASSES[worker_model]
+
+if worker_class == 'gevent':
+    # patch before preload_app imports the app, so pymysql and the broker threads cooperate
+    from gevent import monkey
+    monkey.patch_all()
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 8)) if worker_class == 'gthread' else 1
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 256))
+
+# set before preload_app imports the app, the lru backend is private to each worker
+response_cache_backend = os.environ.setdefault('RESPONSE_CACHE_BACKEND', 'shared' if workers > 1 else 'lru').lower()
+if response_cache_backend == 'lru' and workers > 1:
+    raise ValueError("RESPONSE_CACHE_BACKEND=lru is per worker, use shared or redis with more than one GUNICORN_WORKERS")
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+pidfile = os.environ.get('GUNICORN_PID_FILE') or None
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# recycle workers now and then so slow leaks never build up, jittered so they don't restart together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+# drop any pooled connection the master opened, a forked socket must not be shared between workers
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    from api import db
+    with server.app.wsgi().app_context():
+        db.engine.dispose(close=False)
+
+# end open event streams so the worker can exit within graceful_timeout
+def worker_exit(server, worker):
+    from api import slot_events
+    slot_events.stop()
@@ -0,0 +1,145 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from api import create_app, db, response_cache
+from api.models import User, ProgramDetails, Availability, Appointment, UtilizationDay
+from api.dashboard import dashboard_now
+
+class AnalyticsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        self.app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+        response_cache.backend = None
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        admin = User(email='admin@uw.edu', name='Admin', account_type='admin', status='active')
+        instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        other = User(email='other@uw.edu', name='Other', account_type='instructor', status='active')
+        student = User(email='stud@uw.edu', name='Student', account_type='student', status='active')
+        db.session.add_all([admin, instructor, other, student])
+        db.session.flush()
+        program = ProgramDetails(name='Advising', instructor_id=instructor.id, isDropins=False)
+        other_program = ProgramDetails(name='Tutoring', instructor_id=other.id, isDropins=False)
+        db.session.add_all([program, other_program])
+        db.session.flush()
+
+        # 2026-01-05 is a Monday, 2026-01-07 a Wednesday
+        slots = [
+            (instructor, program, '2026-01-05', '09:00', 'completed'),
+            (instructor, program, '2026-01-05', '09:30', 'missed'),
+            (instructor, program, '2026-01-05', '10:00', 'posted'),
+            (instructor, program, '2026-01-07', '09:00', 'canceled'),
+            (instructor, program, '2026-01-07', '09:30', 'inactive'),
+            (instructor, program, '2026-02-20', '09:00', 'reserved'),
+            (other, other_program, '2026-01-05', '14:00', 'reserved'),
+        ]
+        for host, slot_program, date, start, status in slots:
+            availability = Availability(user_id=host.id, program_id=slot_program.id, date=date,
+                                        start_time=start, end_time='18:00', status='active')
+            db.session.add(availability)
+            db.session.flush()
+            db.session.add(Appointment(host_id=host.id, availability_id=availability.id, appointment_date=date,
+                                       start_time=start, end_time='18:00', status=status))
+        db.session.commit()
+        self.program_id, self.other_program_id = program.id, other_program.id
+        self.instructor_id = instructor.id
+
+        from flask_jwt_extended import create_access_token
+        self.clients = {}
+        for role, user in (('admin', admin), ('instructor', instructor), ('student', student)):
+            self.clients[role] = self.app.test_client()
+            self.clients[role].set_cookie('access_token_cookie', create_access_token(identity=str(user.id)))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def utilization(self, role, query='from=2026-01-01&to=2026-01-31'):
+        return self.clients[role].get(f'/analytics/utilization?{query}')
+
+    def test_instructor_sees_own_slots_grouped(self):
+        response = self.utilization('instructor')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+
+        self.assertEqual(data['totals'], {'slots': 5, 'bookings': 2, 'no_shows': 1, 'cancellations': 1,
+                                          'closed': 1, 'fill_rate': 0.5})
+        self.assertEqual([(row['program_id'], row['program_name']) for row in data['by_program']],
+                         [(self.program_id, 'Advising')])
+        self.assertEqual([(row['weekday'], row['slots'], row['bookings']) for row in data['by_weekday']],
+                         [(0, 3, 2), (2, 2, 0)])
+        self.assertEqual([(row['hour'], row['slots']) for row in data['by_hour']], [(9, 4), (10, 1)])
+        monday_nine = [cell for cell in data['cells'] if cell['weekday'] == 0 and cell['hour'] == 9][0]
+        self.assertEqual((monday_nine['bookings'], monday_nine['no_shows'], monday_nine['fill_rate']), (2, 1, 1.0))
+
+    def test_admin_sees_every_program_and_filters(self):
+        data = self.utilization('admin').get_json()
+        self.assertEqual([row['program_id'] for row in data['by_program']], [self.program_id, self.other_program_id])
+        self.assertEqual(data['totals']['slots'], 6)
+
+        data = self.utilization('admin', f'from=2026-01-01&to=2026-01-31&program_id={self.other_program_id}').get_json()
+        self.assertEqual(data['totals']['slots'], 1)
+        self.assertEqual(data['by_hour'], [{'hour': 14, 'slots': 1, 'bookings': 1, 'no_shows': 0, 'cancellations': 0,
+                                            'closed': 0, 'fill_rate': 1.0}])
+
+    def test_rejects_students_and_bad_ranges(self):
+        self.assertEqual(self.utilization('student').status_code, 403)
+        self.assertEqual(self.utilization('admin', 'from=2026-02-01&to=2026-01-01').status_code, 400)
+        self.assertEqual(self.utilization('admin', 'from=January').status_code, 400)
+
+    def add_slot(self, date, status):
+        availability = Availability(user_id=self.instructor_id, program_id=self.program_id, date=date,
+                                    start_time='15:00', end_time='16:00', status='active')
+        db.session.add(availability)
+        db.session.flush()
+        appointment = Appointment(host_id=self.instructor_id, availability_id=availability.id, appointment_date=date,
+                                  start_time='15:00', end_time='16:00', status=status)
+        db.session.add(appointment)
+        db.session.commit()
+        return appointment
+
+    def test_closed_days_stored_and_today_live(self):
+        today = dashboard_now()[0]
+        yesterday = (datetime.strptime(today, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+        cancelled = self.add_slot(yesterday, 'canceled')
+        query = f'from={yesterday}&to={today}'
+        self.assertEqual(self.utilization('instructor', query).get_json()['totals']['cancellations'], 1)
+        self.assertEqual([row.day for row in UtilizationDay.query.all()], [yesterday])
+
+        # yesterday is served from its stored rows, even without a response cache, today is counted again
+        cancelled.status = 'completed'
+        db.session.commit()
+        self.add_slot(today, 'reserved')
+        totals = self.utilization('instructor', query).get_json()['totals']
+        self.assertEqual((totals['slots'], totals['bookings'], totals['cancellations']), (2, 1, 1))
+
+        # marking attendance on a past day drops that day's rows
+        response = self.clients['instructor'].post('/appointment/update/status',
+                                                   json={'appointment_id': cancelled.id, 'status': 'missed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(UtilizationDay.query.count(), 0)
+        totals = self.utilization('instructor', query).get_json()['totals']
+        self.assertEqual((totals['slots'], totals['bookings'], totals['no_shows'], totals['cancellations']), (2, 2, 1, 0))
+
+    def test_deleting_past_slots_drops_their_days(self):
+        today = dashboard_now()[0]
+        yesterday = (datetime.strptime(today, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+        appointment = self.add_slot(yesterday, 'completed')
+        self.utilization('admin', f'from={yesterday}&to={yesterday}')
+        self.assertEqual(UtilizationDay.query.count(), 1)
+
+        response = self.clients['instructor'].delete(f'/instructor/availability/{appointment.availability_id}/delete')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(UtilizationDay.query.count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from flask_jwt_extended import create_access_token
+from api import create_app, db
+from api import instructor
+from api.models import User, CourseDetails, ProgramDetails, Availability, Appointment
+
+def day(offset):
+    return (datetime.now() + timedelta(days=offset)).strftime('%Y-%m-%d')
+
+class AvailabilityReconcileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        self.app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        db.session.add(self.instructor)
+        db.session.flush()
+        self.course = CourseDetails(name='CSS 101', instructor_id=self.instructor.id)
+        db.session.add(self.course)
+        db.session.flush()
+        self.program = ProgramDetails(name='Office Hours', course_id=self.course.id, instructor_id=self.instructor.id,
+                                      duration=30, isDropins=False)
+        db.session.add(self.program)
+        db.session.commit()
+
+        self.client = self.app.test_client()
+        self.client.set_cookie('access_token_cookie', create_access_token(identity=str(self.instructor.id)))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def post(self, slots, **extra):
+        # mode=None leaves the mode out
+        body = {key: value for key, value in dict(dict(mode='reconcile', program_id=self.program.id, duration=30,
+                                                       isDropins=False), **extra).items() if value is not None}
+        body['availabilities'] = [{'id': self.program.id, 'date': date, 'start_time': start, 'end_time': end}
+                                  for date, start, end in slots]
+        return self.client.post(f'/instructor/availability/{self.course.id}', json=body)
+
+    def test_one_slot_edit_only_touches_that_slot(self):
+        slots = [(day(1), '09:00', '10:00'), (day(2), '09:00', '10:00'), (day(3), '09:00', '10:00')]
+        result = self.post(slots).get_json()
+        self.assertEqual((result['inserted'], result['deleted'], result['unchanged']), (3, 0, 0))
+        kept_ids = {availability.id for availability in Availability.query.filter(Availability.date != day(3))}
+
+        result = self.post(slots[:2] + [(day(3), '13:00', '14:00')]).get_json()
+        self.assertEqual((result['inserted'], result['deleted'], result['unchanged']), (1, 1, 2))
+        self.assertTrue(kept_ids <= {availability.id for availability in Availability.query.all()})
+        self.assertEqual(Appointment.query.count(), 6)
+
+    def test_removal_with_booking_is_flagged(self):
+        self.post([(day(1), '09:00', '10:00')])
+        appointment = Appointment.query.first()
+        appointment.status = 'reserved'
+        db.session.commit()
+
+        result = self.post([]).get_json()
+        self.assertEqual(result['deleted'], 0)
+        self.assertEqual(result['flagged'][0]['appointments'][0]['appointment_id'], appointment.id)
+        self.assertEqual(Availability.query.count(), 1)
+
+        result = self.post([], force=True).get_json()
+        self.assertEqual(result['deleted'], 1)
+        self.assertEqual(Appointment.query.count(), 0)
+
+    def test_replace_is_the_default_and_rewrites_everything(self):
+        self.post([(day(1), '09:00', '10:00')])
+        Appointment.query.first().status = 'reserved'
+        db.session.commit()
+
+        body = self.post([(day(1), '09:00', '10:00')], mode=None).get_json()
+        self.assertNotIn('unchanged', body)
+        self.assertEqual({appointment.status for appointment in Appointment.query.all()}, {'posted'})
+
+    def test_past_entries_are_skipped(self):
+        result = self.post([(day(-1), '09:00', '10:00'), (day(1), '09:00', '10:00')]).get_json()
+        self.assertEqual((result['inserted'], result['skipped'], result['errors']), (1, 1, []))
+        self.assertEqual([availability.date for availability in Availability.query.all()], [day(1)])
+
+    def test_program_setting_changes_rewrite_kept_rows(self):
+        slots = [(day(1), '09:00', '10:00'), (day(2), '09:00', '10:00')]
+        self.post(slots)
+
+        result = self.post(slots, duration=60, physical_location='UW2 131').get_json()
+        self.assertEqual((result['inserted'], result['deleted'], result['unchanged'], result['rewritten']), (2, 2, 0, 2))
+        self.assertEqual({(appointment.start_time, appointment.end_time, appointment.physical_location)
+                          for appointment in Appointment.query.all()}, {('09:00', '10:00', 'UW2 131')})
+        self.assertEqual(Appointment.query.count(), 2)
+
+        result = self.post(slots, duration=60, physical_location='UW2 131').get_json()
+        self.assertEqual((result['unchanged'], result['rewritten']), (2, 0))
+
+    def test_diff_is_one_transaction(self):
+        self.post([(day(1), '09:00', '10:00')])
+
+        # a failure part way through the inserts keeps the deleted row
+        with patch.object(instructor, 'generate_appointments', side_effect=RuntimeError('disk full')):
+            response = self.post([(day(2), '09:00', '10:00')])
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual([availability.date for availability in Availability.query.all()], [day(1)])
+        self.assertEqual(Appointment.query.count(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
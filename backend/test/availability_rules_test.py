@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from sqlalchemy import func
+from api import create_app, db, response_cache
+from api.models import User, ProgramDetails, Availability, AvailabilityRule, Appointment
+from api import availability_rules
+from api.availability_rules import materialize_program_rules
+
+def days_ahead(days):
+    return (datetime.now() + timedelta(days=days)).strftime('%Y-%m-%d')
+
+class AvailabilityRulesTestCase(unittest.TestCase):
+    def setUp(self):
+        # concurrent sessions need a database file they can share
+        self.directory = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(self.directory.name, 'rules.db')}"}):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
+        response_cache.backend = None
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        db.session.add(instructor)
+        db.session.flush()
+        program = ProgramDetails(name='Office Hours', instructor_id=instructor.id, isDropins=False, duration=30)
+        db.session.add(program)
+        db.session.flush()
+        rule = AvailabilityRule(user_id=instructor.id, program_id=program.id, days='MO,TU,WE,TH,FR,SA,SU',
+                                start_date=days_ahead(0), start_time='13:00', end_time='14:00', status='active')
+        db.session.add(rule)
+        db.session.commit()
+        self.program_id, self.rule_id = program.id, rule.id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.ctx.pop()
+        self.directory.cleanup()
+
+    def test_concurrent_materialization_creates_each_date_once(self):
+        barrier = threading.Barrier(2, timeout=10)
+        expand_rule = availability_rules.expand_rule
+        errors = []
+
+        # both requests expand the rule before either one inserts
+        def expand_together(*args):
+            windows = expand_rule(*args)
+            barrier.wait()
+            return windows
+
+        def view_slots():
+            with self.app.app_context():
+                try:
+                    materialize_program_rules(self.program_id, days_ahead(0), days_ahead(6))
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    db.session.remove()
+
+        with patch.object(availability_rules, 'expand_rule', expand_together):
+            threads = [threading.Thread(target=view_slots) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+        dates = db.session.query(Availability.date, func.count(Availability.id)).filter(
+            Availability.rule_id == self.rule_id).group_by(Availability.date).all()
+        self.assertEqual(len(dates), 7)
+        self.assertTrue(all(count == 1 for _, count in dates))
+        self.assertEqual(Appointment.query.count(), 7 * 2)
+        self.assertEqual(db.session.get(AvailabilityRule, self.rule_id).materialized_through, days_ahead(6))
+
+    def test_update_rejects_unknown_status(self):
+        from flask_jwt_extended import create_access_token
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        self.app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+        rule = db.session.get(AvailabilityRule, self.rule_id)
+        client = self.app.test_client()
+        client.set_cookie('access_token_cookie', create_access_token(identity=str(rule.user_id)))
+
+        until = {'until_date': days_ahead(30)}
+        response = client.post(f'/instructor/availability/rules/{self.rule_id}/update', json=dict(until, status='paused'))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', response.get_json()['error'])
+        self.assertEqual((rule.status, rule.version), ('active', 1))
+
+        response = client.post(f'/instructor/availability/rules/{self.rule_id}/update', json=dict(until, status='inactive'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['rule']['status'], 'inactive')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from api import create_app, db, response_cache
+from api.models import User, CourseDetails, ProgramDetails, Availability, AvailabilityRule, Appointment
+from api.student import AVAILABLE_WINDOW_DAYS, AVAILABLE_MAX_SPAN_DAYS
+
+def days_ahead(days):
+    return (datetime.now() + timedelta(days=days)).strftime('%Y-%m-%d')
+
+class AvailableAppointmentsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        self.app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+        response_cache.backend = None
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        student = User(email='stud@uw.edu', name='Student', account_type='student', status='active')
+        db.session.add_all([instructor, student])
+        db.session.flush()
+        course = CourseDetails(name='CSS 101', quarter='Fall')
+        db.session.add(course)
+        db.session.flush()
+        program = ProgramDetails(name='Office Hours', course_id=course.id, instructor_id=instructor.id, isDropins=False,
+                                 duration=30, physical_location='UW2 131', meeting_url='https://zoom.us/j/1')
+        db.session.add(program)
+        db.session.flush()
+
+        # slots well past the first two weeks, one with its own location
+        for days, start, location in ((3, '09:00', 'UW2 131'), (30, '09:00', 'UW2 131'),
+                                      (30, '10:00', 'UW1 020'), (90, '09:00', 'UW2 131')):
+            availability = Availability(user_id=instructor.id, program_id=program.id, date=days_ahead(days),
+                                        start_time=start, end_time='11:00', status='active')
+            db.session.add(availability)
+            db.session.flush()
+            db.session.add(Appointment(host_id=instructor.id, availability_id=availability.id,
+                                       appointment_date=days_ahead(days), start_time=start, end_time='11:00',
+                                       status='posted', physical_location=location, meeting_url=program.meeting_url))
+        db.session.commit()
+        self.instructor_id, self.course_id, self.program_id = instructor.id, course.id, program.id
+
+        from flask_jwt_extended import create_access_token
+        self.client = self.app.test_client()
+        self.client.set_cookie('access_token_cookie', create_access_token(identity=str(student.id)))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def available(self, query=''):
+        return self.client.get(f'/student/appointments/available/{self.program_id}/{self.course_id}?{query}')
+
+    def test_default_window_is_two_weeks(self):
+        response = self.available()
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+
+        self.assertEqual((data['from'], data['to']), (days_ahead(0), days_ahead(AVAILABLE_WINDOW_DAYS)))
+        self.assertIsNone(data['next_cursor'])
+        self.assertEqual([(slot['date'], slot['start_time']) for slot in data['available_appointments']],
+                         [(days_ahead(3), '09:00')])
+
+    def test_later_window_lists_slots_with_their_details(self):
+        data = self.available(f'from={days_ahead(15)}&to={days_ahead(100)}').get_json()
+        self.assertEqual([(slot['date'], slot['start_time']) for slot in data['available_appointments']],
+                         [(days_ahead(30), '09:00'), (days_ahead(30), '10:00'), (days_ahead(90), '09:00')])
+        slot = data['available_appointments'][1]
+        self.assertEqual((slot['program_id'], slot['physical_location'], slot['meeting_url']),
+                         (self.program_id, 'UW1 020', 'https://zoom.us/j/1'))
+
+    def test_pages_follow_next_cursor(self):
+        seen = []
+        window = f'to={days_ahead(AVAILABLE_MAX_SPAN_DAYS)}&limit=3'
+        query = window
+        while True:
+            data = self.available(query).get_json()
+            seen.extend(slot['appointment_id'] for slot in data['available_appointments'])
+            if not data['next_cursor']:
+                break
+            query = f"{window}&after={data['next_cursor']}"
+        self.assertEqual(len(seen), 4)
+        self.assertEqual(len(set(seen)), 4)
+
+    def test_to_is_clamped_and_bounds_materialization(self):
+        rule = AvailabilityRule(user_id=self.instructor_id, program_id=self.program_id, days='MO,TU,WE,TH,FR,SA,SU',
+                                start_date=days_ahead(0), start_time='13:00', end_time='14:00', status='active')
+        db.session.add(rule)
+        db.session.commit()
+
+        data = self.available(f'from={days_ahead(10)}&to={days_ahead(5000)}&limit=1').get_json()
+        self.assertEqual(data['to'], days_ahead(10 + AVAILABLE_MAX_SPAN_DAYS))
+        self.assertEqual(db.session.get(AvailabilityRule, rule.id).materialized_through, data['to'])
+        self.assertEqual(Availability.query.filter(Availability.rule_id == rule.id,
+                                                   Availability.date > data['to']).count(), 0)
+
+    def test_rejects_bad_windows_and_other_courses(self):
+        self.assertEqual(self.available('from=January').status_code, 400)
+        self.assertEqual(self.available('to=soon').status_code, 400)
+        self.assertEqual(self.available('after=not-a-cursor').status_code, 400)
+        response = self.client.get(f'/student/appointments/available/{self.program_id}/{self.course_id + 1}')
+        self.assertEqual(response.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from sqlalchemy import event
+from api import create_app, db, response_cache
+from api.models import User, CourseDetails, CourseMembers, ProgramDetails
+from api.batch import parse_subrequests
+
+class BatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        self.app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+        # responses are rebuilt every time so the queries can be counted
+        response_cache.backend = None
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        student = User(email='stud@uw.edu', name='Student', account_type='student', status='active')
+        db.session.add_all([instructor, student])
+        db.session.flush()
+        course = CourseDetails(name='CSS 101', instructor_id=instructor.id)
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(CourseMembers(course_id=course.id, user_id=student.id))
+        db.session.add(ProgramDetails(name='Office Hours', course_id=course.id, instructor_id=instructor.id, isDropins=False))
+        db.session.commit()
+        self.student_id = student.id
+
+        from flask_jwt_extended import create_access_token
+        self.client = self.app.test_client()
+        self.client.set_cookie('access_token_cookie', create_access_token(identity=str(self.student_id)))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_parse_subrequests(self):
+        self.assertEqual(parse_subrequests(['/profile', {'id': 'c', 'path': '/user/courses?x=1'}], 5),
+                         [{'id': 0, 'path': '/profile', 'query_string': ''}, {'id': 'c', 'path': '/user/courses', 'query_string': 'x=1'}])
+        for entries in [[], ['/a'] * 6, ['http://evil.example/a'], ['/batch'], [{'path': '/a', 'method': 'POST'}], [3]]:
+            with self.assertRaises(ValueError):
+                parse_subrequests(entries, 5)
+
+    def test_batch_keeps_sub_statuses(self):
+        response = self.client.post('/batch', json={'requests': [
+            {'id': 'descriptions', 'path': '/student/programs/descriptions'},
+            {'id': 'programs', 'path': '/student/programs/appointment-based?fields=id,name'},
+            '/no/such/route',
+        ]})
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()['responses']
+        self.assertEqual([result['status'] for result in results], [200, 200, 404])
+        self.assertEqual([result['id'] for result in results], ['descriptions', 'programs', 2])
+        self.assertEqual(results[1]['body'][0]['programs'], [{'id': 1, 'name': 'Office Hours'}])
+        self.assertEqual(self.client.post('/batch', json={'requests': ['/batch']}).status_code, 400)
+
+    def test_sequential_batch_resolves_the_caller_once(self):
+        statements = []
+        record = lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            self.client.post('/batch', json={'requests': ['/student/programs/descriptions'] * 3})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        # three role checks of the student, one query
+        user_lookups = [parameters for statement, parameters in statements if statement.lstrip().startswith('SELECT user.')]
+        self.assertEqual([lookup[0] for lookup in user_lookups].count(self.student_id), 1)
+
+    def test_max_requests_read_from_environment(self):
+        with patch.dict(os.environ, {'BATCH_MAX_REQUESTS': '2'}):
+            app = create_app()
+        self.assertEqual(app.config['BATCH_MAX_REQUESTS'], 2)
+        self.assertEqual(self.app.config['BATCH_MAX_REQUESTS'], 20)
+
+    def test_parallel_batch(self):
+        response = self.client.post('/batch', json={'parallel': True, 'requests': ['/student/programs/descriptions'] * 4})
+        results = response.get_json()['responses']
+        self.assertEqual([result['status'] for result in results], [200] * 4)
+        self.assertEqual(results[0]['body'], results[3]['body'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from api import create_app, db
+from api.models import User, CourseDetails, CourseMembers, CourseTimes, ProgramDetails, Availability, Appointment
+from api.booking_conflicts import IntervalIndex, find_student_conflict, describe_conflict, course_times_checked
+
+class BookingConflictsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.student = User(email='stud@uw.edu', name='Student', account_type='student', status='active')
+        instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        db.session.add_all([self.student, instructor])
+        db.session.flush()
+        course = CourseDetails(name='CSS 101', instructor_id=instructor.id)
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(CourseMembers(course_id=course.id, user_id=self.student.id))
+        # 2026-01-05 is a Monday
+        db.session.add(CourseTimes(course_id=course.id, day='Monday', start_time='13:00', end_time='14:20'))
+        program = ProgramDetails(name='Office Hours', course_id=course.id, instructor_id=instructor.id)
+        db.session.add(program)
+        db.session.flush()
+        availability = Availability(user_id=instructor.id, program_id=program.id, date='2026-01-05',
+                                    start_time='09:00', end_time='17:00', status='active')
+        db.session.add(availability)
+        db.session.flush()
+
+        self.booked = self.slot(instructor, availability, '10:00', '10:30', 'reserved', self.student.id)
+        self.slot(instructor, availability, '11:00', '11:30', 'cancelled', self.student.id)
+        db.session.commit()
+        self.instructor, self.availability = instructor, availability
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def slot(self, instructor, availability, start_time, end_time, status='posted', attendee_id=None):
+        appointment = Appointment(host_id=instructor.id, availability_id=availability.id, appointment_date='2026-01-05',
+                                  start_time=start_time, end_time=end_time, status=status, attendee_id=attendee_id)
+        db.session.add(appointment)
+        db.session.flush()
+        return appointment
+
+    def test_overlapping_appointment(self):
+        conflict = find_student_conflict(self.student.id, self.slot(self.instructor, self.availability, '10:15', '10:45'))
+        self.assertEqual(conflict['id'], self.booked.id)
+        self.assertEqual(describe_conflict(conflict),
+                         "Overlaps your reserved appointment for Office Hours on 2026-01-05 from 10:00 to 10:30")
+
+    def test_adjacent_and_cancelled_slots_are_free(self):
+        self.assertIsNone(find_student_conflict(self.student.id, self.slot(self.instructor, self.availability, '10:30', '11:00')))
+        self.assertIsNone(find_student_conflict(self.student.id, self.slot(self.instructor, self.availability, '11:00', '11:30')))
+
+    def test_course_times(self):
+        appointment = self.slot(self.instructor, self.availability, '14:00', '14:30')
+        conflict = find_student_conflict(self.student.id, appointment)
+        self.assertEqual(describe_conflict(conflict), "Overlaps your CSS 101 class meeting on Mondays from 13:00 to 14:20")
+        self.assertIsNone(find_student_conflict(self.student.id, appointment, include_course_times=False))
+
+    def test_course_times_setting_read_from_environment(self):
+        self.assertTrue(course_times_checked())
+        with patch.dict(os.environ, {'BOOKING_CONFLICT_COURSE_TIMES': 'false'}):
+            app = create_app()
+        with app.app_context():
+            self.assertFalse(course_times_checked())
+
+    def test_interval_index(self):
+        index = IntervalIndex.for_student(self.student.id, '2026-01-05', '2026-01-12')
+        self.assertEqual(index.find_overlap('2026-01-05', '09:45', '10:05')['id'], self.booked.id)
+        self.assertIsNone(index.find_overlap('2026-01-05', '10:30', '13:00'))
+        self.assertEqual(index.find_overlap('2026-01-12', '12:00', '13:30')['kind'], 'course')
+        self.assertIsNone(index.find_overlap('2026-01-06', '13:00', '14:00'))
+
+if __name__ == '__main__':
+    unittest.main()
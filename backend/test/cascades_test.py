@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from api import create_app, db
+from api.models import User, ProgramDetails, ProgramTimes, Availability, AvailabilityRule, Appointment, AppointmentComment, Feedback
+from api.cascades import delete_availabilities, purge_program, soft_delete_program, purge_in_background, purge_deleted_programs, chunk_size
+
+class CascadesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        db.session.add(self.instructor)
+        db.session.flush()
+        self.program = self.make_program('Office Hours')
+        self.other = self.make_program('Tutoring')
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def make_program(self, name):
+        program = ProgramDetails(name=name, instructor_id=self.instructor.id)
+        db.session.add(program)
+        db.session.flush()
+        db.session.add(ProgramTimes(program_id=program.id, day='Monday', start_time='09:00', end_time='10:00'))
+        db.session.add(AvailabilityRule(user_id=self.instructor.id, program_id=program.id, days='MO', start_date='2026-01-05',
+                                        start_time='09:00', end_time='10:00', status='active'))
+        for date in ['2026-01-05', '2026-01-06', '2026-01-07']:
+            availability = Availability(user_id=self.instructor.id, program_id=program.id, date=date,
+                                        start_time='09:00', end_time='10:00', status='active')
+            db.session.add(availability)
+            db.session.flush()
+            appointment = Appointment(host_id=self.instructor.id, availability_id=availability.id, appointment_date=date,
+                                      start_time='09:00', end_time='09:30', status='reserved')
+            db.session.add(appointment)
+            db.session.flush()
+            db.session.add(AppointmentComment(appointment_id=appointment.id, user_id=self.instructor.id, appointment_comment='hi'))
+            db.session.add(Feedback(appointment_id=appointment.id, host_id=self.instructor.id, host_rating='5'))
+        return program
+
+    def remaining(self):
+        return [Availability.query.count(), Appointment.query.count(), AppointmentComment.query.count(),
+                Feedback.query.count(), AvailabilityRule.query.count(), ProgramTimes.query.count(), ProgramDetails.query.count()]
+
+    def test_purge_program_in_chunks(self):
+        self.assertEqual(purge_program(self.program.id, size=2), 3)
+        self.assertEqual(self.remaining(), [3, 3, 3, 3, 1, 1, 1])
+        self.assertEqual(ProgramDetails.query.one().name, 'Tutoring')
+
+    def test_settings_read_from_environment(self):
+        self.assertEqual((chunk_size(), self.app.config['PROGRAM_DELETE_MODE']), (1000, 'sync'))
+        with patch.dict(os.environ, {'PURGE_CHUNK_SIZE': '50', 'PROGRAM_DELETE_MODE': 'async'}):
+            app = create_app()
+        with app.app_context():
+            self.assertEqual((chunk_size(), app.config['PROGRAM_DELETE_MODE']), (50, 'async'))
+
+    def test_admin_delete_purges_like_program_delete(self):
+        from flask_jwt_extended import create_access_token
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        self.app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+        admin = User(email='admin@uw.edu', name='Admin', account_type='admin', status='active')
+        db.session.add(admin)
+        db.session.commit()
+        client = self.app.test_client()
+        client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+
+        self.assertEqual(client.delete(f'/program/{self.program.id}').status_code, 200)
+        self.assertEqual(self.remaining(), [3, 3, 3, 3, 1, 1, 1])
+
+        with patch('api.admin.purge_in_background') as purge:
+            self.assertEqual(client.delete(f'/program/{self.other.id}?mode=async').status_code, 202)
+        purge.assert_called_once_with(self.other.id)
+        self.assertIsNotNone(db.session.get(ProgramDetails, self.other.id).deleted_at)
+
+    def test_delete_availabilities(self):
+        availability_ids = [availability.id for availability in Availability.query.filter_by(program_id=self.other.id).limit(2)]
+        self.assertEqual(delete_availabilities(availability_ids, commit_each=True, size=1), 2)
+        self.assertEqual(self.remaining(), [4, 4, 4, 4, 2, 2, 2])
+
+    def test_soft_delete_then_background_purge(self):
+        soft_delete_program(self.program)
+        self.assertEqual(ProgramDetails.query.filter_by(deleted_at=None).count(), 1)
+
+        purge_in_background(self.program.id).join(timeout=10)
+        db.session.expire_all()
+        self.assertEqual(self.remaining(), [3, 3, 3, 3, 1, 1, 1])
+
+    def test_purge_deleted_programs(self):
+        other_id = self.other.id
+        soft_delete_program(self.other)
+        self.assertEqual(purge_deleted_programs(), [other_id])
+        self.assertEqual(self.remaining(), [3, 3, 3, 3, 1, 1, 1])
+
+if __name__ == '__main__':
+    unittest.main()
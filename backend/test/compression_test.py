@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+import gzip
+import zlib
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from flask import jsonify, Response
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+from api import create_app, db, compressor
+from api.compression import negotiate_encoding
+
+class CompressionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        @self.app.route('/test/large')
+        def large():
+            return jsonify([{'id': i, 'name': 'Office Hours', 'status': 'posted'} for i in range(200)])
+
+        @self.app.route('/test/small')
+        def small():
+            return jsonify({'id': 1})
+
+        @self.app.route('/test/stream')
+        def stream():
+            return Response((f"data: {i}\n\n" for i in range(3)), mimetype='text/event-stream')
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_negotiate_encoding(self):
+        accept = lambda value: parse_accept_header(value, Accept)
+        self.assertEqual(negotiate_encoding(accept('gzip, br'), ['br', 'gzip']), 'br')
+        self.assertEqual(negotiate_encoding(accept('gzip;q=1.0, br;q=0.5'), ['br', 'gzip']), 'gzip')
+        self.assertEqual(negotiate_encoding(accept('br'), ['gzip']), None)
+        self.assertEqual(negotiate_encoding(accept('*'), ['gzip']), 'gzip')
+        self.assertEqual(negotiate_encoding(accept('gzip;q=0'), ['gzip']), None)
+
+    def test_large_json_is_gzipped(self):
+        response = self.client.get('/test/large', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(len(gzip.decompress(response.get_data())), len(self.client.get('/test/large').get_data()))
+        self.assertEqual(int(response.headers['Content-Length']), len(response.get_data()))
+        self.assertEqual(compressor.metrics()['stats']['gzip']['responses'], 1)
+
+    def test_small_and_unaccepted_responses_are_not_compressed(self):
+        self.assertNotIn('Content-Encoding', self.client.get('/test/small', headers={'Accept-Encoding': 'gzip'}).headers)
+        self.assertNotIn('Content-Encoding', self.client.get('/test/large').headers)
+        self.assertNotIn('Content-Encoding', self.client.get('/test/large', headers={'Accept-Encoding': 'identity'}).headers)
+
+    def test_streamed_response_is_compressed_per_chunk(self):
+        response = self.client.get('/test/stream', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response.headers)
+
+        # every chunk is flushed, so a client can decode each event as it arrives
+        chunks = list(response.response)
+        decoder = zlib.decompressobj(31)
+        self.assertEqual(decoder.decompress(chunks[0]), b"data: 0\n\n")
+        self.assertEqual(b''.join(decoder.decompress(chunk) for chunk in chunks[1:]), b"data: 1\n\ndata: 2\n\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from api import create_app, db, response_cache
+from api.models import User, CourseDetails, CourseMembers, ProgramDetails, Availability, Appointment, DashboardView
+from api.dashboard import dashboard_now
+from api.cascades import soft_delete_program
+
+class DashboardTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        self.app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+        response_cache.backend = None
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        today, _ = dashboard_now()
+        self.date = (datetime.strptime(today, '%Y-%m-%d') + timedelta(days=2)).strftime('%Y-%m-%d')
+
+        instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        student = User(email='stud@uw.edu', name='Student', account_type='student', status='active')
+        db.session.add_all([instructor, student])
+        db.session.flush()
+        course = CourseDetails(name='CSS 101', instructor_id=instructor.id)
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(CourseMembers(course_id=course.id, user_id=student.id))
+        program = ProgramDetails(name='Advising', course_id=course.id, instructor_id=instructor.id, isDropins=False,
+                                 auto_approve_appointments=False)
+        dropins = ProgramDetails(name='Office Hours', course_id=course.id, instructor_id=instructor.id, isDropins=True)
+        db.session.add_all([program, dropins])
+        db.session.flush()
+        availability = Availability(user_id=instructor.id, program_id=program.id, date=self.date,
+                                    start_time='09:00', end_time='11:00', status='active')
+        db.session.add_all([availability, Availability(user_id=instructor.id, program_id=dropins.id, date=self.date,
+                                                       start_time='13:00', end_time='15:00', status='active')])
+        db.session.flush()
+        appointment = Appointment(host_id=instructor.id, availability_id=availability.id, appointment_date=self.date,
+                                  start_time='09:00', end_time='09:30', status='posted')
+        db.session.add(appointment)
+        db.session.commit()
+        self.instructor_id, self.student_id, self.course_id = instructor.id, student.id, course.id
+        self.program_id, self.appointment_id = program.id, appointment.id
+
+        from flask_jwt_extended import create_access_token
+        self.student = self.app.test_client()
+        self.student.set_cookie('access_token_cookie', create_access_token(identity=str(self.student_id)))
+        self.instructor = self.app.test_client()
+        self.instructor.set_cookie('access_token_cookie', create_access_token(identity=str(self.instructor_id)))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def reserve(self):
+        response = self.student.post(f'/student/appointments/reserve/{self.appointment_id}/{self.course_id}', json={'notes': 'hi'})
+        self.assertEqual(response.status_code, 201)
+
+    def test_first_read_builds_the_row(self):
+        data = self.student.get('/dashboard').get_json()
+        self.assertEqual(data['upcoming_appointments'], [])
+        self.assertEqual([window['program_name'] for window in data['next_office_hours']], ['Office Hours'])
+        self.assertEqual(data['next_office_hours'][0]['host'], {'id': self.instructor_id, 'name': 'Instructor'})
+        self.assertIsNotNone(db.session.get(DashboardView, self.student_id))
+
+    def test_reserve_updates_both_dashboards(self):
+        self.reserve()
+        self.assertFalse(db.session.get(DashboardView, self.instructor_id).stale)
+
+        data = self.instructor.get('/dashboard').get_json()
+        appointment = data['upcoming_appointments'][0]
+        self.assertEqual((appointment['program_name'], appointment['course_name'], appointment['status']), ('Advising', 'CSS 101', 'pending'))
+        self.assertEqual(appointment['attendee'], {'id': self.student_id, 'name': 'Student'})
+        self.assertEqual(data['pending_counts'], {'hosting': 1, 'attending': 0})
+        self.assertEqual(self.student.get('/dashboard').get_json()['pending_counts'], {'hosting': 0, 'attending': 1})
+
+    def test_read_is_one_primary_key_lookup(self):
+        self.reserve()
+        db.session.remove()
+        statements = []
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            self.assertEqual(len(self.student.get('/dashboard').get_json()['upcoming_appointments']), 1)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual(len(statements), 1)
+        self.assertIn('FROM dashboard_view', statements[0])
+
+    def test_status_change_and_cancel(self):
+        self.reserve()
+        self.instructor.post('/appointment/update/status', json={'appointment_id': self.appointment_id, 'status': 'rejected'})
+        self.assertEqual(self.student.get('/dashboard').get_json()['upcoming_appointments'], [])
+
+        db.session.get(Appointment, self.appointment_id).status = 'posted'
+        db.session.commit()
+        self.reserve()
+        self.instructor.post('/appointment/update/status', json={'appointment_id': self.appointment_id, 'status': 'reserved'})
+        self.assertEqual(self.instructor.post(f'/instructor/appointments/cancel/{self.appointment_id}').status_code, 200)
+        self.assertEqual(self.student.get('/dashboard').get_json()['upcoming_appointments'], [])
+        self.assertEqual(self.instructor.get('/dashboard').get_json()['upcoming_appointments'], [])
+
+    def test_program_edit_marks_audience_stale(self):
+        self.reserve()
+        response = self.instructor.post('/program/details', json={'course_id': self.course_id, 'data': {
+            'id': self.program_id, 'name': 'Project Advising', 'isDropins': False, 'auto_approve_appointments': False}})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(db.session.get(DashboardView, self.student_id).stale)
+        data = self.student.get('/dashboard').get_json()
+        self.assertEqual(data['upcoming_appointments'][0]['program_name'], 'Project Advising')
+
+    def test_availability_delete_marks_audience_stale(self):
+        self.reserve()
+        availability_id = db.session.get(Appointment, self.appointment_id).availability_id
+        response = self.instructor.delete(f'/instructor/availability/{availability_id}/delete')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(db.session.get(DashboardView, self.student_id).stale)
+        self.assertEqual(self.student.get('/dashboard').get_json()['upcoming_appointments'], [])
+
+    def test_program_delete_marks_audience_stale(self):
+        self.reserve()
+        self.assertEqual(len(self.student.get('/dashboard').get_json()['upcoming_appointments']), 1)
+        self.assertEqual(self.instructor.delete(f'/program/delete/{self.program_id}?mode=sync').status_code, 200)
+        self.assertEqual(self.student.get('/dashboard').get_json()['upcoming_appointments'], [])
+        self.assertEqual(self.instructor.get('/dashboard').get_json()['upcoming_appointments'], [])
+
+    def test_program_soft_delete_marks_audience_stale(self):
+        self.reserve()
+        self.assertEqual(len(self.student.get('/dashboard').get_json()['upcoming_appointments']), 1)
+
+        # hidden from dashboards before the background purge removes its rows
+        soft_delete_program(db.session.get(ProgramDetails, self.program_id))
+        self.assertTrue(db.session.get(DashboardView, self.student_id).stale)
+        self.assertEqual(self.student.get('/dashboard').get_json()['upcoming_appointments'], [])
+
+if __name__ == '__main__':
+    unittest.main()
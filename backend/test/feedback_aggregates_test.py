@@ -0,0 +1,145 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from api import create_app, db, response_cache
+from api.models import User, ProgramDetails, Availability, Appointment, Feedback, FeedbackAggregate
+from api.feedback_aggregates import rating_score
+
+class FeedbackAggregatesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        self.app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+        response_cache.backend = None
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        admin = User(email='admin@uw.edu', name='Admin', account_type='admin', status='active')
+        instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        student = User(email='stud@uw.edu', name='Student', account_type='student', status='active')
+        other = User(email='other@uw.edu', name='Other', account_type='student', status='active')
+        db.session.add_all([admin, instructor, student, other])
+        db.session.flush()
+        program = ProgramDetails(name='Advising', instructor_id=instructor.id, isDropins=False)
+        db.session.add(program)
+        db.session.flush()
+        availability = Availability(user_id=instructor.id, program_id=program.id, date='2026-01-05',
+                                    start_time='09:00', end_time='11:00', status='active')
+        db.session.add(availability)
+        db.session.flush()
+        appointments = [Appointment(host_id=instructor.id, attendee_id=attendee.id, availability_id=availability.id,
+                                    appointment_date='2026-01-05', start_time=start, end_time='11:00', status='completed')
+                        for attendee, start in ((student, '09:00'), (other, '10:00'))]
+        db.session.add_all(appointments)
+        db.session.commit()
+        self.instructor_id, self.program_id = instructor.id, program.id
+        self.appointment_ids = [appointment.id for appointment in appointments]
+
+        from flask_jwt_extended import create_access_token
+        self.clients = {}
+        for role, user in (('admin', admin), ('instructor', instructor), ('student', student), ('other', other)):
+            self.clients[role] = self.app.test_client()
+            self.clients[role].set_cookie('access_token_cookie', create_access_token(identity=str(user.id)))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def rate(self, role, appointment_id, satisfaction):
+        return self.clients[role].post('/feedback/add', json={'appointment_id': appointment_id,
+                                                               'satisfaction': satisfaction,
+                                                               'additional_comments': 'notes'})
+
+    def test_rating_score(self):
+        self.assertEqual(rating_score('Very Dissatisfied'), 1)
+        self.assertEqual(rating_score('Highly Satisfied'), 5)
+        self.assertEqual(rating_score('3'), 3)
+        self.assertIsNone(rating_score('great'))
+        self.assertIsNone(rating_score(None))
+
+    def test_add_feedback_updates_aggregates(self):
+        self.assertEqual(self.rate('student', self.appointment_ids[0], 'Satisfied').status_code, 200)
+        self.assertEqual(self.rate('other', self.appointment_ids[1], 'Highly Satisfied').status_code, 200)
+        self.assertEqual(self.rate('instructor', self.appointment_ids[0], 'Neutral').status_code, 200)
+
+        summary = self.clients['instructor'].get(f'/feedback/summary/hosts/{self.instructor_id}').get_json()
+        self.assertEqual(summary['attendee_ratings'], {'count': 2, 'average': 4.5,
+                                                       'histogram': {'1': 0, '2': 0, '3': 0, '4': 1, '5': 1}})
+        self.assertEqual(summary['host_ratings']['count'], 1)
+        self.assertEqual(summary['host_ratings']['histogram']['3'], 1)
+
+        # changing a rating moves it in the histogram instead of counting it twice
+        self.assertEqual(self.rate('student', self.appointment_ids[0], 'Dissatisfied').status_code, 200)
+        summary = self.clients['admin'].get(f'/feedback/summary/programs/{self.program_id}').get_json()
+        self.assertEqual(summary['attendee_ratings'], {'count': 2, 'average': 3.5,
+                                                       'histogram': {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1}})
+
+    def test_add_feedback_validation(self):
+        response = self.clients['student'].post('/feedback/add', json={'appointment_id': self.appointment_ids[0]})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.rate('student', 999, 'Satisfied').status_code, 404)
+        self.assertEqual(self.rate('admin', self.appointment_ids[0], 'Satisfied').status_code, 401)
+        self.assertEqual(FeedbackAggregate.query.count(), 0)
+
+    def test_summary_access(self):
+        self.assertEqual(self.clients['student'].get(f'/feedback/summary/hosts/{self.instructor_id}').status_code, 403)
+        self.assertEqual(self.clients['student'].get(f'/feedback/summary/programs/{self.program_id}').status_code, 403)
+        self.assertEqual(self.clients['admin'].get('/feedback/summary/programs/999').status_code, 404)
+
+        summary = self.clients['admin'].get(f'/feedback/summary/hosts/{self.instructor_id}').get_json()
+        self.assertEqual(summary['attendee_ratings'], {'count': 0, 'average': None,
+                                                       'histogram': {'1': 0, '2': 0, '3': 0, '4': 0, '5': 0}})
+
+    def test_rebuild_command(self):
+        db.session.add_all([
+            Feedback(appointment_id=self.appointment_ids[0], attendee_rating='Satisfied', host_rating='5'),
+            Feedback(appointment_id=self.appointment_ids[1], attendee_rating='Satisfied', host_rating='not a score'),
+        ])
+        db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['rebuild-feedback-aggregates'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('4 feedback aggregates rebuilt', result.output)
+
+        aggregate = db.session.get(FeedbackAggregate, ('program', self.program_id, 'attendee'))
+        self.assertEqual((aggregate.count, aggregate.total, aggregate.score_4), (2, 8, 2))
+        aggregate = db.session.get(FeedbackAggregate, ('host', self.instructor_id, 'host'))
+        self.assertEqual((aggregate.count, aggregate.total, aggregate.score_5), (1, 5, 1))
+
+    def test_deletes_subtract_feedback(self):
+        self.rate('student', self.appointment_ids[0], 'Satisfied')
+        self.rate('instructor', self.appointment_ids[0], 'Neutral')
+        self.rate('other', self.appointment_ids[1], 'Highly Satisfied')
+
+        # a separate availability whose feedback is deleted with it
+        availability = Availability(user_id=self.instructor_id, program_id=self.program_id, date='2026-01-06',
+                                    start_time='09:00', end_time='10:00', status='active')
+        db.session.add(availability)
+        db.session.flush()
+        appointment = Appointment(host_id=self.instructor_id, availability_id=availability.id, appointment_date='2026-01-06',
+                                  start_time='09:00', end_time='10:00', status='completed')
+        db.session.add(appointment)
+        db.session.commit()
+        self.rate('student', appointment.id, 'Very Dissatisfied')
+
+        response = self.clients['instructor'].delete(f'/instructor/availability/{availability.id}/delete')
+        self.assertEqual(response.status_code, 200)
+        summary = self.clients['instructor'].get(f'/feedback/summary/programs/{self.program_id}').get_json()
+        self.assertEqual(summary['attendee_ratings'], {'count': 2, 'average': 4.5,
+                                                       'histogram': {'1': 0, '2': 0, '3': 0, '4': 1, '5': 1}})
+        self.assertEqual(summary['host_ratings']['count'], 1)
+
+        # purging the program empties its aggregates and the host's, matching a rebuild
+        self.assertEqual(self.clients['instructor'].delete(f'/program/delete/{self.program_id}?mode=sync').status_code, 200)
+        summary = self.clients['instructor'].get(f'/feedback/summary/hosts/{self.instructor_id}').get_json()
+        self.assertEqual((summary['attendee_ratings']['count'], summary['host_ratings']['count']), (0, 0))
+        self.assertEqual(summary['attendee_ratings']['histogram'], {'1': 0, '2': 0, '3': 0, '4': 0, '5': 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from sqlalchemy import event
+from api import create_app, db, response_cache
+from api.models import User, CourseDetails, CourseMembers, ProgramDetails
+from api.fieldsets import PROGRAM_FIELDS, parse_fields
+
+class FieldsetsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        # responses are rebuilt every time so the queries can be counted
+        response_cache.backend = None
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        self.student = User(email='stud@uw.edu', name='Student', account_type='student', status='active')
+        db.session.add_all([self.instructor, self.student])
+        db.session.flush()
+        course = CourseDetails(name='CSS 101', instructor_id=self.instructor.id)
+        db.session.add(course)
+        db.session.flush()
+        db.session.add_all([CourseMembers(course_id=course.id, user_id=user.id) for user in [self.instructor, self.student]])
+        db.session.add_all([
+            ProgramDetails(name='Office Hours', description='x' * 500, course_id=course.id, instructor_id=self.instructor.id, isDropins=False),
+            ProgramDetails(name='Drop In Lab', description='y' * 500, course_id=course.id, instructor_id=self.instructor.id, isDropins=True),
+            ProgramDetails(name='Advising', description='z' * 500, instructor_id=self.instructor.id, isDropins=False),
+        ])
+        db.session.commit()
+        self.instructor_id, self.student_id = self.instructor.id, self.student.id
+        db.session.expunge_all()
+
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self.record)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self.record)
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def client_for(self, user_id):
+        from flask_jwt_extended import create_access_token
+        client = self.app.test_client()
+        client.set_cookie('access_token_cookie', create_access_token(identity=str(user_id)))
+        return client
+
+    def program_queries(self):
+        return [statement for statement in self.statements if 'FROM program_details' in statement]
+
+    def test_parse_fields(self):
+        self.assertEqual(parse_fields(None, PROGRAM_FIELDS), PROGRAM_FIELDS)
+        self.assertEqual(parse_fields('name, id', PROGRAM_FIELDS), ['id', 'name'])
+        self.assertEqual(parse_fields(',', PROGRAM_FIELDS), PROGRAM_FIELDS)
+        with self.assertRaises(ValueError):
+            parse_fields('id,password', PROGRAM_FIELDS)
+
+    def test_instructor_programs_fields(self):
+        response = self.client_for(self.instructor_id).get('/instructor/programs?fields=id,name')
+        self.assertEqual(response.status_code, 200)
+        courses = response.get_json()
+        self.assertEqual([course['course_name'] for course in courses], ['CSS 101', 'All Courses'])
+        self.assertEqual(sorted(program['name'] for program in courses[0]['programs']), ['Drop In Lab', 'Office Hours'])
+        self.assertTrue(all(set(program) == {'id', 'name'} for course in courses for program in course['programs']))
+
+        # descriptions are never selected
+        self.assertTrue(self.program_queries())
+        self.assertFalse([statement for statement in self.program_queries() if 'description' in statement])
+
+        self.assertEqual(self.client_for(self.instructor_id).get('/instructor/programs?fields=id,secret').status_code, 400)
+        full = self.client_for(self.instructor_id).get('/instructor/programs').get_json()
+        self.assertEqual(list(full[0]['programs'][0]), sorted(PROGRAM_FIELDS))
+
+    def test_student_appointment_programs_fields(self):
+        response = self.client_for(self.student_id).get('/student/programs/appointment-based?fields=id,name')
+        self.assertEqual(response.status_code, 200)
+        programs = response.get_json()[0]['programs']
+        self.assertEqual(sorted(program['name'] for program in programs), ['Advising', 'Office Hours'])
+        self.assertTrue(all(set(program) == {'id', 'name'} for program in programs))
+        self.assertFalse([statement for statement in self.program_queries() if 'description' in statement])
+
+        # isRangeBased is not part of the student view
+        self.assertEqual(self.client_for(self.student_id).get('/student/programs/appointment-based?fields=isRangeBased').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
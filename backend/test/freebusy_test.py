@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from api import create_app, db
+from api.models import User, CourseDetails, CourseTimes, ProgramDetails, ProgramTimes, Availability, Appointment
+from api.freebusy import merge_intervals, subtract_intervals, compute_freebusy
+
+class FreeBusyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        db.session.add(self.instructor)
+        db.session.flush()
+        course = CourseDetails(name='CSS 101', instructor_id=self.instructor.id)
+        db.session.add(course)
+        db.session.flush()
+        program = ProgramDetails(name='Office Hours', course_id=course.id, instructor_id=self.instructor.id)
+        db.session.add(program)
+        db.session.flush()
+
+        # 2026-01-05 is a Monday
+        db.session.add(CourseTimes(course_id=course.id, day='Monday', start_time='09:00', end_time='10:30'))
+        db.session.add(ProgramTimes(program_id=program.id, day='Monday', start_time='10:00', end_time='11:00'))
+        db.session.add(Availability(user_id=self.instructor.id, program_id=program.id, date='2026-01-05',
+                                    start_time='13:00', end_time='16:00', status='active'))
+        db.session.add(Appointment(host_id=self.instructor.id, appointment_date='2026-01-05',
+                                   start_time='14:00', end_time='14:30', status='reserved'))
+        db.session.add(Appointment(host_id=self.instructor.id, appointment_date='2026-01-05',
+                                   start_time='15:00', end_time='15:30', status='posted'))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_merge_intervals(self):
+        self.assertEqual(merge_intervals([(60, 120), (0, 30), (30, 45), (100, 150)]), [(0, 45), (60, 150)])
+        self.assertEqual(merge_intervals([]), [])
+
+    def test_subtract_intervals(self):
+        self.assertEqual(subtract_intervals([(0, 100)], [(10, 20), (50, 120)]), [(0, 10), (20, 50)])
+        self.assertEqual(subtract_intervals([(0, 10), (20, 30)], [(5, 25)]), [(0, 5), (25, 30)])
+        self.assertEqual(subtract_intervals([(0, 10)], []), [(0, 10)])
+
+    def test_compute_freebusy(self):
+        result = compute_freebusy([self.instructor.id], '2026-01-05', '2026-01-05')[self.instructor.id]
+        self.assertEqual([(i['start_time'], i['end_time']) for i in result['busy']],
+                         [('09:00', '11:00'), ('14:00', '14:30')])
+        self.assertEqual([(i['start_time'], i['end_time']) for i in result['free']],
+                         [('08:00', '09:00'), ('11:00', '14:00'), ('14:30', '20:00')])
+        self.assertEqual([(i['start_time'], i['end_time']) for i in result['open']],
+                         [('13:00', '14:00'), ('14:30', '16:00')])
+
+        # the course and program repeat the next Monday, posted appointments never count as busy
+        result = compute_freebusy([self.instructor.id], '2026-01-06', '2026-01-12')[self.instructor.id]
+        self.assertEqual(result['busy'], [{'date': '2026-01-12', 'start_time': '09:00', 'end_time': '11:00'}])
+        self.assertEqual(result['open'], [])
+
+    def test_freebusy_endpoints(self):
+        from flask_jwt_extended import create_access_token
+        client = self.app.test_client()
+        client.set_cookie('access_token_cookie', create_access_token(identity=str(self.instructor.id)))
+
+        response = client.get(f'/instructor/{self.instructor.id}/freebusy?from=2026-01-05&to=2026-01-05')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()['busy']), 2)
+
+        response = client.get(f'/instructors/freebusy?ids={self.instructor.id},999&from=2026-01-05&to=2026-01-11')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['instructor_id'] for r in response.get_json()['freebusy']], [self.instructor.id, 999])
+
+        self.assertEqual(client.get('/instructor/999/freebusy').status_code, 404)
+        self.assertEqual(client.get(f'/instructor/{self.instructor.id}/freebusy?from=2026-01-05&to=2026-06-05').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+from datetime import date, datetime, timedelta, timezone
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from flask import jsonify, request
+from api import create_app, db
+from api.json_provider import iso_format, orjson
+
+class JSONProviderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        @self.app.route('/test/echo', methods=['POST'])
+        def echo():
+            return jsonify(request.get_json())
+
+        self.payload = {
+            'comments': [{'id': 1, 'created_at': datetime(2026, 1, 5, 9, 30, 0, 250000), 'date': date(2026, 1, 5)}],
+            'name': 'Office Hours',
+            'aware': datetime(2026, 1, 5, 9, 30, tzinfo=timezone(timedelta(hours=-8))),
+        }
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def encode(self, fast):
+        self.app.json.fast = fast and orjson is not None
+        with self.app.test_request_context():
+            return jsonify(self.payload).get_data()
+
+    def test_iso_format(self):
+        self.assertEqual(iso_format(datetime(2026, 1, 5, 9, 30)), '2026-01-05T09:30:00Z')
+        self.assertEqual(iso_format(datetime(2026, 1, 5, 9, 30, tzinfo=timezone(timedelta(hours=-8)))), '2026-01-05T09:30:00-08:00')
+        self.assertEqual(iso_format(date(2026, 1, 5)), '2026-01-05')
+
+    def test_encoders_agree(self):
+        expected = (b'{"aware":"2026-01-05T09:30:00-08:00","comments":[{"created_at":"2026-01-05T09:30:00.250000Z",'
+                    b'"date":"2026-01-05","id":1}],"name":"Office Hours"}\n')
+        self.assertEqual(self.encode(fast=False), expected)
+        self.assertEqual(self.encode(fast=True), expected)
+
+    def test_falls_back_for_values_orjson_rejects(self):
+        with self.app.test_request_context():
+            self.assertEqual(jsonify({'n': 2 ** 70}).get_json(), {'n': 2 ** 70})
+            self.assertEqual(self.app.json.loads(self.app.json.dumps({'n': 2 ** 70})), {'n': 2 ** 70})
+
+    def test_request_json_round_trip(self):
+        response = self.app.test_client().post('/test/echo', json={'b': [1, 2], 'a': 'é'})
+        self.assertEqual(response.get_json(), {'a': 'é', 'b': [1, 2]})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from api import create_app, db
+from api.models import Appointment
+from api import meeting_limits
+from api.meeting_limits import period_range, program_limits, booked_counts, limit_reached, blocked_ranges, python_bookable_mask, date_span
+
+class MeetingLimitsTestCase(unittest.TestCase):
+    def limits(self, daily=None, weekly=None, monthly=None):
+        return program_limits(SimpleNamespace(max_daily_meetings=daily, max_weekly_meetings=weekly,
+                                              max_monthly_meetings=monthly))
+
+    def test_period_range(self):
+        self.assertEqual(period_range('2026-01-07', 'daily'), ('2026-01-07', '2026-01-07'))
+        # weeks run Monday to Sunday, even across months
+        self.assertEqual(period_range('2026-01-01', 'weekly'), ('2025-12-29', '2026-01-04'))
+        self.assertEqual(period_range('2024-02-10', 'monthly'), ('2024-02-01', '2024-02-29'))
+
+    def test_limit_reached(self):
+        counts = {'2026-01-05': 2, '2026-01-07': 1, '2026-01-20': 1}
+        self.assertEqual(limit_reached(self.limits(daily=2), counts, '2026-01-05'), 'daily')
+        self.assertIsNone(limit_reached(self.limits(daily=2), counts, '2026-01-06'))
+        self.assertEqual(limit_reached(self.limits(daily=5, weekly=3), counts, '2026-01-09'), 'weekly')
+        self.assertEqual(limit_reached(self.limits(weekly=3, monthly=4), counts, '2026-01-07'), 'monthly')
+        self.assertIsNone(limit_reached(self.limits(daily='', weekly=None), counts, '2026-01-05'))
+
+    def test_blocked_ranges(self):
+        counts = {'2026-01-05': 2, '2026-01-07': 1}
+        self.assertEqual(blocked_ranges(self.limits(daily=2, weekly=3), counts, '2026-01-01', '2026-01-31'),
+                         [('2026-01-05', '2026-01-11')])
+        self.assertEqual(blocked_ranges(self.limits(daily=2), counts, '2026-01-06', '2026-01-31'), [])
+        self.assertEqual(blocked_ranges(self.limits(monthly=10), counts, '2026-01-01'), [])
+
+    def test_blocked_ranges_zero_limit(self):
+        # a limit of 0 blocks every date, reserving would be refused
+        self.assertEqual(blocked_ranges(self.limits(weekly=0), {}, '2026-01-01', '2026-01-31'), [('2026-01-01', '2026-01-31')])
+        self.assertEqual(blocked_ranges(self.limits(daily=0), {'2026-01-05': 1}, '2026-01-01'), [('2026-01-01', '9999-12-31')])
+
+    def test_bookable_mask_agrees_with_limit_reached(self):
+        counts = {'2025-12-30': 1, '2026-01-05': 2, '2026-01-07': 1, '2026-01-20': 3, '2026-02-02': 1}
+        dates = date_span('2025-12-20', '2026-02-28')
+        for limits in [self.limits(daily=2), self.limits(weekly=3), self.limits(daily=2, weekly=4, monthly=7),
+                       self.limits(monthly=0), self.limits()]:
+            expected = [limit_reached(limits, counts, date) is None for date in dates]
+            self.assertEqual(python_bookable_mask(limits, counts, dates), expected)
+            if meeting_limits.numpy is not None:
+                self.assertEqual(meeting_limits.numpy_bookable_mask(limits, counts, dates).tolist(), expected)
+
+    def test_booked_counts(self):
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            for date, status in [('2026-01-05', 'reserved'), ('2026-01-05', 'pending'), ('2026-01-05', 'posted'),
+                                 ('2025-12-30', 'reserved'), ('2026-03-01', 'reserved')]:
+                db.session.add(Appointment(host_id=1, appointment_date=date, start_time='10:00', end_time='10:30', status=status))
+            db.session.add(Appointment(host_id=2, appointment_date='2026-01-05', start_time='10:00', end_time='10:30', status='reserved'))
+            db.session.commit()
+
+            # the week of 2026-01-01 starts in December, so that booking counts too
+            self.assertEqual(booked_counts([1], '2026-01-01', '2026-01-31'), {1: {'2026-01-05': 2, '2025-12-30': 1}})
+            self.assertEqual(booked_counts([1, 3], '2026-02-15')[1], {'2026-03-01': 1})
+            db.session.remove()
+            db.drop_all()
+
+if __name__ == '__main__':
+    unittest.main()
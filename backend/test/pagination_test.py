@@ -0,0 +1,30 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api.pagination import encode_cursor, decode_cursor, parse_limit, paginate, MAX_PAGE_SIZE
+
+class PaginationTestCase(unittest.TestCase):
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor('2026-01-05', '09:30', 42)
+        self.assertNotIn('=', cursor)
+        self.assertEqual(decode_cursor(cursor), ('2026-01-05', '09:30', 42))
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor')
+
+    def test_parse_limit(self):
+        self.assertEqual(parse_limit(None, default=10), 10)
+        self.assertEqual(parse_limit('0'), 1)
+        self.assertEqual(parse_limit('100000'), MAX_PAGE_SIZE)
+        with self.assertRaises(ValueError):
+            parse_limit('ten')
+
+    def test_paginate(self):
+        rows = [('2026-01-05', '09:00', 1), ('2026-01-05', '10:00', 2), ('2026-01-06', '09:00', 3)]
+        page, cursor = paginate(rows, 2, lambda row: row)
+        self.assertEqual(page, rows[:2])
+        self.assertEqual(decode_cursor(cursor), rows[1])
+        self.assertEqual(paginate(rows, 3, lambda row: row), (rows, None))
+
+if __name__ == '__main__':
+    unittest.main()
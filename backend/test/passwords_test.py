@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from werkzeug.security import generate_password_hash, check_password_hash
+from api.passwords import PasswordHasher, HashingPoolSaturated
+
+class PasswordHasherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.hasher = PasswordHasher()
+        self.hasher.method = 'scrypt:16384:8:1'
+        self.hasher.salt_length = 16
+        self.hasher.workers = 0
+        self.hasher.max_pending = 1
+
+    def test_hash_and_check(self):
+        pwhash = self.hasher.hash_password('Black!Hole123')
+        self.assertTrue(pwhash.startswith('scrypt:16384:8:1$'))
+        self.assertTrue(self.hasher.check_password(pwhash, 'Black!Hole123'))
+        self.assertFalse(self.hasher.check_password(pwhash, 'wrong'))
+        self.assertEqual(self.hasher.metrics()['count'], 3)
+
+    def test_needs_rehash(self):
+        legacy = generate_password_hash('Black!Hole123', method='scrypt:16384:8:1', salt_length=2)
+        other_method = generate_password_hash('Black!Hole123', method='pbkdf2:sha256', salt_length=16)
+        self.assertTrue(self.hasher.needs_rehash(legacy))
+        self.assertTrue(self.hasher.needs_rehash(other_method))
+        self.assertFalse(self.hasher.needs_rehash(self.hasher.hash_password('Black!Hole123')))
+
+    def test_saturated_pool_raises(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_hash():
+            started.set()
+            release.wait(5)
+
+        worker = threading.Thread(target=self.hasher.run, args=(blocking_hash,))
+        worker.start()
+        started.wait(5)
+        with self.assertRaises(HashingPoolSaturated) as context:
+            self.hasher.hash_password('Black!Hole123')
+        self.assertEqual(context.exception.retry_after, self.hasher.retry_after)
+        release.set()
+        worker.join()
+
+    def test_batch_takes_a_slot_per_password(self):
+        self.hasher.max_pending = 3
+        hashes = self.hasher.hash_passwords(['one', 'two', 'three', 'four', 'five'])
+        self.assertEqual(len(hashes), 5)
+        self.assertTrue(self.hasher.check_password(hashes[3], 'four'))
+
+        # two workers hash two passwords at once, and only one slot is left
+        self.hasher.workers = 2
+        self.hasher.acquire_slots(2)
+        with self.assertRaises(HashingPoolSaturated):
+            self.hasher.hash_passwords(['one', 'two'])
+        self.hasher.release_slots(2)
+
+        # the failed chunk gave its slot back
+        self.hasher.acquire_slots(3)
+
+    def test_pool_processes_are_not_forked(self):
+        self.hasher.workers = 1
+        try:
+            pwhash = self.hasher.hash_password('Black!Hole123')
+            self.assertNotEqual(self.hasher.executor._mp_context.get_start_method(), 'fork')
+        finally:
+            self.hasher.executor.shutdown()
+        self.assertTrue(check_password_hash(pwhash, 'Black!Hole123'))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
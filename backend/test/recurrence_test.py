@@ -0,0 +1,47 @@
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api.recurrence import parse_days, format_days, expand_rule, expand_dates, split_into_slots, expand_weekly_times
+
+class RecurrenceTestCase(unittest.TestCase):
+    def make_rule(self, **kwargs):
+        values = dict(id=1, version=1, days='MO,WE', start_date='2026-01-05', until_date='2026-03-13',
+                      start_time='10:00', end_time='11:00', exdates='2026-01-07')
+        values.update(kwargs)
+        return SimpleNamespace(**values)
+
+    def test_parse_days(self):
+        self.assertEqual(parse_days('MO,WE'), [0, 2])
+        self.assertEqual(parse_days(['Friday', 'monday']), [0, 4])
+        self.assertEqual(format_days(parse_days(['Wednesday', 'MO'])), 'MO,WE')
+        with self.assertRaises(ValueError):
+            parse_days(['Funday'])
+
+    def test_expand_rule_only_for_window(self):
+        windows = expand_rule(self.make_rule(), '2026-01-01', '2026-01-14')
+        self.assertEqual([window['date'] for window in windows], ['2026-01-05', '2026-01-12', '2026-01-14'])
+        self.assertEqual(expand_rule(self.make_rule(), '2026-04-01', '2026-04-30'), [])
+
+    def test_expansion_cached_per_version(self):
+        expand_dates.cache_clear()
+        expand_rule(self.make_rule(), '2026-01-01', '2026-01-31')
+        expand_rule(self.make_rule(), '2026-01-01', '2026-01-31')
+        self.assertEqual(expand_dates.cache_info().hits, 1)
+
+        windows = expand_rule(self.make_rule(version=2, exdates=''), '2026-01-01', '2026-01-14')
+        self.assertEqual(len(windows), 4)
+
+    def test_split_into_slots(self):
+        self.assertEqual(split_into_slots('10:00', '11:00', 30), [('10:00', '10:30'), ('10:30', '11:00')])
+        self.assertEqual(split_into_slots('10:00', '11:00', None), [('10:00', '11:00')])
+
+    def test_expand_weekly_times(self):
+        times = [SimpleNamespace(day='Tuesday', start_time='13:00', end_time='14:00')]
+        windows = expand_weekly_times(times, '2026-01-05', '2026-01-18')
+        self.assertEqual([window['date'] for window in windows], ['2026-01-06', '2026-01-13'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,236 @@
+import unittest
+import sys
+import os
+import runpy
+import socketserver
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from api import create_app, db, response_cache
+from api.models import User, CourseDetails, CourseMembers, ProgramDetails, ProgramTimes
+from api.response_cache import LRUBackend, SharedMemoryBackend, RedisBackend, read_reply, encode_command
+
+# local stand-in for a Redis server, enough of the protocol for RedisBackend
+class RespStandIn(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), RespStandInHandler)
+        self.data = {}
+        self.expires = {}
+        self.lock = threading.Lock()
+
+    def value(self, key):
+        if key in self.expires and self.expires[key] <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def run(self, command, args):
+        if command == b'PING':
+            return b'+PONG\r\n'
+        if command == b'GET':
+            return bulk(self.value(args[0]))
+        if command == b'MGET':
+            return b''.join([f"*{len(args)}\r\n".encode()] + [bulk(self.value(key)) for key in args])
+        if command == b'SET':
+            self.data[args[0]] = args[1]
+            self.expires.pop(args[0], None)
+            if len(args) == 4 and args[2].upper() == b'EX':
+                self.expires[args[0]] = time.time() + int(args[3])
+            return b'+OK\r\n'
+        if command == b'INCR':
+            value = int(self.value(args[0]) or 0) + 1
+            self.data[args[0]] = str(value).encode()
+            return f":{value}\r\n".encode()
+        if command == b'SADD':
+            members = self.data.setdefault(args[0], set())
+            added = len(set(args[1:]) - members)
+            members.update(args[1:])
+            return f":{added}\r\n".encode()
+        if command == b'SMEMBERS':
+            members = self.value(args[0]) or set()
+            return b''.join([f"*{len(members)}\r\n".encode()] + [bulk(member) for member in members])
+        if command == b'EXPIRE':
+            self.expires[args[0]] = time.time() + int(args[1])
+            return b':1\r\n'
+        if command == b'DEL':
+            removed = sum(1 for key in args if self.data.pop(key, None) is not None)
+            return f":{removed}\r\n".encode()
+        return b'-ERR unknown command\r\n'
+
+def bulk(value):
+    return b'$-1\r\n' if value is None else f"${len(value)}\r\n".encode() + value + b'\r\n'
+
+class RespStandInHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except ConnectionError:
+                return
+            with self.server.lock:
+                reply = self.server.run(command[0].upper(), command[1:])
+            self.wfile.write(reply)
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        self.app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        self.student = User(email='stud@uw.edu', name='Student', account_type='student', status='active')
+        self.admin = User(email='admin@uw.edu', name='Admin', account_type='admin', status='active')
+        db.session.add_all([self.instructor, self.student, self.admin])
+        db.session.flush()
+        self.course = CourseDetails(name='CSS 101', instructor_id=self.instructor.id)
+        db.session.add(self.course)
+        db.session.flush()
+        db.session.add(CourseMembers(course_id=self.course.id, user_id=self.instructor.id))
+        db.session.add(ProgramDetails(name='Office Hours', course_id=self.course.id, instructor_id=self.instructor.id))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def client_for(self, user):
+        from flask_jwt_extended import create_access_token
+        client = self.app.test_client()
+        client.set_cookie('access_token_cookie', create_access_token(identity=str(user.id)))
+        return client
+
+    def check_backend(self, backend):
+        tags = ['course:1', 'user:2']
+        self.assertIsNone(backend.get('a'))
+        self.assertTrue(backend.set('a', b'one', tags, backend.versions(tags), 60))
+        self.assertTrue(backend.set('b', b'two', ['course:2'], backend.versions(['course:2']), 60))
+        self.assertEqual(backend.get('a'), b'one')
+
+        # an entry built before an invalidation of its tags is not stored
+        versions = backend.versions(tags)
+        backend.invalidate(['user:2'])
+        self.assertIsNone(backend.get('a'))
+        self.assertEqual(backend.get('b'), b'two')
+        self.assertFalse(backend.set('a', b'stale', tags, versions, 60))
+        self.assertIsNone(backend.get('a'))
+
+    def test_lru_backend(self):
+        self.check_backend(LRUBackend())
+
+        backend = LRUBackend(max_entries=2)
+        for key in ['a', 'b', 'c']:
+            backend.get('a')
+            backend.set(key, key.encode(), [f"tag:{key}"], {}, 60)
+        self.assertEqual(backend.get('a'), b'a')
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.tag_keys, {'tag:a': {'a'}, 'tag:c': {'c'}})
+
+    def test_shared_backend(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache.sqlite3')
+            self.check_backend(SharedMemoryBackend(path))
+
+            # a second instance, as in another worker, sees the same entries and versions
+            other = SharedMemoryBackend(path)
+            self.assertEqual(other.get('b'), b'two')
+            other.invalidate(['course:2'])
+            self.assertIsNone(SharedMemoryBackend(path).get('b'))
+
+    def test_redis_backend(self):
+        server = RespStandIn()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            backend = RedisBackend(f"redis://127.0.0.1:{server.server_address[1]}/0")
+            self.assertEqual(backend.client.execute('PING'), 'PONG')
+            self.check_backend(backend)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_gunicorn_shares_the_cache_between_workers(self):
+        path = os.path.join(os.path.dirname(__file__), '..', 'gunicorn.conf.py')
+        with patch.dict(os.environ, {'GUNICORN_WORKERS': '4'}):
+            os.environ.pop('RESPONSE_CACHE_BACKEND', None)
+            runpy.run_path(path)
+            self.assertEqual(os.environ['RESPONSE_CACHE_BACKEND'], 'shared')
+        with patch.dict(os.environ, {'GUNICORN_WORKERS': '4', 'RESPONSE_CACHE_BACKEND': 'lru'}):
+            with self.assertRaises(ValueError):
+                runpy.run_path(path)
+        with patch.dict(os.environ, {'GUNICORN_WORKERS': '1', 'RESPONSE_CACHE_BACKEND': 'lru'}):
+            self.assertEqual(runpy.run_path(path)['response_cache_backend'], 'lru')
+
+    def test_encode_command(self):
+        self.assertEqual(encode_command('GET', 'k'), b'*2\r\n$3\r\nGET\r\n$1\r\nk\r\n')
+
+    def test_course_programs_cached_and_invalidated(self):
+        client = self.client_for(self.instructor)
+        url = f'/course/programs/{self.course.id}'
+
+        first = client.get(url)
+        second = client.get(url)
+        self.assertEqual((first.headers['X-Cache'], second.headers['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(first.get_json(), second.get_json())
+        self.assertEqual(second.mimetype, 'application/json')
+        self.assertEqual(client.get('/course/programs/999').status_code, 404)
+        self.assertEqual(client.get('/course/programs/999').headers['X-Cache'], 'MISS')
+
+        response = client.post('/program/create', json={'name': 'Tutoring', 'course_id': self.course.id})
+        self.assertEqual(response.status_code, 200)
+        third = client.get(url)
+        self.assertEqual(third.headers['X-Cache'], 'MISS')
+        self.assertEqual(sorted(program['name'] for program in third.get_json()), ['Office Hours', 'Tutoring'])
+
+        metrics = self.client_for(self.admin).get('/admin/metrics/response-cache').get_json()
+        self.assertEqual((metrics['hits'], metrics['misses']), (1, 4))
+        self.assertEqual(metrics['endpoints']['programs.get_programs']['hit_ratio'], 0.2)
+        self.assertEqual(metrics['backend'], 'lru')
+
+    def test_student_programs_invalidated_by_membership(self):
+        client = self.client_for(self.student)
+        self.assertEqual(client.get('/student/programs/descriptions').get_json(), [])
+        self.assertEqual(client.get('/student/programs/descriptions').headers['X-Cache'], 'HIT')
+
+        client.post('/course/add/user', json={'course_id': self.course.id, 'user_id': self.student.id})
+        response = client.get('/student/programs/descriptions')
+        self.assertEqual(response.headers['X-Cache'], 'MISS')
+        self.assertEqual([program['name'] for program in response.get_json()], ['Office Hours'])
+
+        # responses are scoped to the caller
+        self.assertEqual(self.client_for(self.instructor).get('/student/programs/descriptions').status_code, 404)
+
+    def test_path_arguments_in_key(self):
+        other_course = CourseDetails(name='CSS 102', instructor_id=self.instructor.id)
+        db.session.add(other_course)
+        db.session.flush()
+        first_program = ProgramDetails.query.filter_by(course_id=self.course.id).one()
+        second_program = ProgramDetails(name='Tutoring', course_id=other_course.id, instructor_id=self.instructor.id)
+        db.session.add(second_program)
+        db.session.flush()
+        db.session.add_all([ProgramTimes(program_id=first_program.id, day='Monday', start_time='09:00', end_time='10:00'),
+                            ProgramTimes(program_id=second_program.id, day='Tuesday', start_time='13:00', end_time='14:00')])
+        db.session.commit()
+
+        # the scope is the caller, the course in the path must still tell the entries apart
+        client = self.client_for(self.instructor)
+        first = client.get(f'/course/programs/times/{self.course.id}')
+        second = client.get(f'/course/programs/times/{other_course.id}')
+        self.assertEqual((first.headers['X-Cache'], second.headers['X-Cache']), ('MISS', 'MISS'))
+        self.assertIn('Monday', first.get_data(as_text=True))
+        self.assertNotIn('Monday', second.get_data(as_text=True))
+        self.assertIn('Tuesday', second.get_data(as_text=True))
+        self.assertEqual(client.get(f'/course/programs/times/{self.course.id}').get_json(), first.get_json())
+
+if __name__ == '__main__':
+    unittest.main()
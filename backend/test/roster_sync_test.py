@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from api import create_app, db
+from api.models import User, CourseDetails, CourseMembers, RosterSync
+from api.roster_sync import sync_course, JsonFileRosterSource, HttpRosterSource
+
+# mock LMS serving a delta after the first snapshot and 304 for a matching ETag
+class MockRosterHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        MockRosterHandler.requests.append(self.path)
+        if self.headers.get('If-None-Match') == '"v2"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        if 'cursor=c1' in self.path:
+            body, etag = {"cursor": "c2", "added": [{"email": "c@uw.edu"}], "dropped": ["a@uw.edu"]}, '"v2"'
+        else:
+            body, etag = {"cursor": "c1", "members": [{"email": "a@uw.edu"}, {"email": "b@uw.edu"}]}, '"v1"'
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+class RosterSyncTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.course = CourseDetails(name='CSS 101')
+        db.session.add(self.course)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def member_emails(self):
+        return sorted(email for (email,) in db.session.query(User.email).join(
+            CourseMembers, CourseMembers.user_id == User.id).filter(CourseMembers.course_id == self.course.id))
+
+    def test_file_source_snapshot_and_unchanged(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({str(self.course.id): {"members": [{"email": "a@uw.edu"}, {"email": "b@uw.edu"}]}}, f)
+        source = JsonFileRosterSource(f.name)
+
+        result = sync_course(self.course, source)
+        self.assertEqual((result['added'], result['dropped']), (2, 0))
+        self.assertEqual(self.member_emails(), ['a@uw.edu', 'b@uw.edu'])
+
+        result = sync_course(self.course, source)
+        self.assertTrue(result['not_modified'])
+
+        with open(f.name, 'w') as out:
+            json.dump({str(self.course.id): {"members": [{"email": "b@uw.edu"}]}}, out)
+        result = sync_course(self.course, source)
+        self.assertEqual((result['added'], result['dropped']), (0, 1))
+        self.assertEqual(self.member_emails(), ['b@uw.edu'])
+        os.unlink(f.name)
+
+    def test_mixed_case_accounts_are_dropped(self):
+        student = User(email='Mixed.Case@UW.edu', name='Mixed', account_type='student', status='active')
+        db.session.add(student)
+        db.session.flush()
+        db.session.add(CourseMembers(course_id=self.course.id, user_id=student.id))
+        db.session.commit()
+
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({str(self.course.id): {"members": []}}, f)
+        result = sync_course(self.course, JsonFileRosterSource(f.name))
+        os.unlink(f.name)
+        self.assertEqual(result['dropped'], 1)
+        self.assertEqual(self.member_emails(), [])
+
+    def test_http_source_uses_cursor_and_etag(self):
+        server = HTTPServer(('127.0.0.1', 0), MockRosterHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        source = HttpRosterSource(f"http://127.0.0.1:{server.server_port}")
+
+        try:
+            sync_course(self.course, source)
+            self.assertEqual(self.member_emails(), ['a@uw.edu', 'b@uw.edu'])
+
+            result = sync_course(self.course, source)
+            self.assertEqual((result['added'], result['dropped']), (1, 1))
+            self.assertEqual(self.member_emails(), ['b@uw.edu', 'c@uw.edu'])
+
+            result = sync_course(self.course, source)
+            self.assertTrue(result['not_modified'])
+            self.assertEqual(RosterSync.query.filter_by(course_id=self.course.id).first().cursor, 'c2')
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
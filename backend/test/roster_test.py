@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from api import create_app, db
+from api.models import User, CourseDetails, CourseMembers
+from api.roster import parse_roster, import_roster, RosterFormatError
+
+class RosterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.course = CourseDetails(name='CSS 101')
+        db.session.add(self.course)
+        db.session.add(User(email='existing@uw.edu', name='Existing', account_type='student', status='active'))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_parse_roster(self):
+        rows = parse_roster(b"Email,Name\nnew@uw.edu, New Student\n", 'csv')
+        self.assertEqual(rows, [{'email': 'new@uw.edu', 'name': 'New Student'}])
+        self.assertEqual(parse_roster('{"roster": [{"email": "a@uw.edu"}]}', 'json'), [{'email': 'a@uw.edu'}])
+        with self.assertRaises(RosterFormatError):
+            parse_roster("name\nNo Email\n", 'csv')
+
+    def test_import_roster_only_applies_the_diff(self):
+        rows = [
+            {'email': 'existing@uw.edu'},
+            {'email': 'new@uw.edu', 'name': 'New Student', 'password': 'Black!Hole123'},
+            {'email': 'not-an-email'},
+        ]
+        result = import_roster(self.course.id, rows)
+        self.assertEqual(result['summary']['users_created'], 1)
+        self.assertEqual(result['summary']['memberships_added'], 2)
+        self.assertEqual(result['summary']['errors'], 1)
+        self.assertEqual(CourseMembers.query.filter_by(course_id=self.course.id).count(), 2)
+
+        # importing the same roster again changes nothing
+        result = import_roster(self.course.id, rows)
+        self.assertEqual(result['summary']['users_created'], 0)
+        self.assertEqual(result['summary']['memberships_added'], 0)
+        self.assertEqual(result['summary']['unchanged'], 2)
+        self.assertEqual(User.query.count(), 2)
+
+    def test_existing_accounts_match_whatever_the_case(self):
+        db.session.add(User(email='Mixed.Case@UW.edu', name='Mixed', account_type='student', status='active'))
+        db.session.commit()
+
+        result = import_roster(self.course.id, [{'email': 'EXISTING@uw.edu'}, {'email': 'mixed.case@uw.edu'}])
+        self.assertEqual(result['summary']['users_created'], 0)
+        self.assertEqual(result['summary']['memberships_added'], 2)
+        self.assertEqual(User.query.count(), 2)
+
+    def test_dry_run_writes_nothing(self):
+        result = import_roster(self.course.id, [{'email': 'new@uw.edu'}], dry_run=True)
+        self.assertEqual(result['summary']['users_created'], 1)
+        self.assertEqual(User.query.count(), 1)
+        self.assertEqual(CourseMembers.query.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
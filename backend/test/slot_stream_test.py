@@ -0,0 +1,170 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from api import create_app, db, response_cache, slot_events
+from api.models import User, CourseDetails, CourseMembers, ProgramDetails, Availability, Appointment
+from api.slot_events import SlotEventBroker, Subscription, OVERFLOW
+from api.slot_stream import replay_events, record_availability_event
+
+class SlotEventBrokerTestCase(unittest.TestCase):
+    def event(self, event_id, *topics):
+        return {'id': event_id, 'topics': set(topics), 'data': '{}'}
+
+    def test_publish_routes_by_topic_and_skips_seen_events(self):
+        broker = SlotEventBroker()
+        program, course = Subscription({'program:1'}, 0, 10), Subscription({'course:2', 'instructor:3'}, 5, 10)
+        broker.subscribers.update([program, course])
+
+        broker.publish(self.event(4, 'program:1', 'course:2'))
+        broker.publish(self.event(6, 'program:9', 'instructor:3'))
+        self.assertEqual([program.get(0)['id'], program.get(0)], [4, None])
+        self.assertEqual([course.get(0)['id'], course.get(0)], [6, None])
+
+        # a rewound poll publishes it again, the subscriber already has it
+        broker.publish(self.event(6, 'program:9', 'instructor:3'))
+        self.assertIsNone(course.get(0))
+
+    def test_full_queue_ends_the_subscription(self):
+        broker = SlotEventBroker()
+        subscription = Subscription({'program:1'}, 0, 2)
+        broker.subscribers.add(subscription)
+        for event_id in range(1, 4):
+            broker.publish(self.event(event_id, 'program:1'))
+        self.assertEqual(subscription.get(0)['id'], 2)
+        self.assertIs(subscription.get(0), OVERFLOW)
+        self.assertNotIn(subscription, broker.subscribers)
+
+class SlotStreamTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        self.app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+        response_cache.backend = None
+        slot_events.heartbeat = 5
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        date = (datetime.now() + timedelta(days=2)).strftime('%Y-%m-%d')
+        instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        student = User(email='stud@uw.edu', name='Student', account_type='student', status='active')
+        outsider = User(email='other@uw.edu', name='Other', account_type='student', status='active')
+        db.session.add_all([instructor, student, outsider])
+        db.session.flush()
+        course = CourseDetails(name='CSS 101', instructor_id=instructor.id)
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(CourseMembers(course_id=course.id, user_id=student.id))
+        program = ProgramDetails(name='Advising', course_id=course.id, instructor_id=instructor.id, isDropins=False,
+                                 auto_approve_appointments=False)
+        db.session.add(program)
+        db.session.flush()
+        availability = Availability(user_id=instructor.id, program_id=program.id, date=date, start_time='09:00', end_time='10:00', status='active')
+        db.session.add(availability)
+        db.session.flush()
+        appointment = Appointment(host_id=instructor.id, availability_id=availability.id, appointment_date=date,
+                                  start_time='09:00', end_time='09:30', status='posted')
+        db.session.add(appointment)
+        db.session.commit()
+        self.course_id, self.program_id, self.appointment_id = course.id, program.id, appointment.id
+        self.availability_id, self.date = availability.id, date
+
+        from flask_jwt_extended import create_access_token
+        self.clients = {}
+        for name, user in [('instructor', instructor), ('student', student), ('outsider', outsider)]:
+            self.clients[name] = self.app.test_client()
+            self.clients[name].set_cookie('access_token_cookie', create_access_token(identity=str(user.id)))
+
+    def tearDown(self):
+        slot_events.stop()
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def reserve(self):
+        response = self.clients['student'].post(f'/student/appointments/reserve/{self.appointment_id}/{self.course_id}', json={})
+        self.assertEqual(response.status_code, 201)
+
+    # the next "slot" event of a stream, skipping keep-alive comments
+    def next_event(self, chunks):
+        for chunk in chunks:
+            lines = chunk.decode('utf-8').splitlines()
+            if 'event: slot' in lines:
+                return json.loads(lines[lines.index('event: slot') + 1][len('data: '):])
+            self.assertTrue(lines[0].startswith(('retry:', ':')), lines)
+
+    def test_reservation_is_pushed_to_the_course_stream(self):
+        response = self.clients['student'].get(f'/events/courses/{self.course_id}/slots', buffered=False)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        chunks = response.iter_encoded()
+        self.assertTrue(next(chunks).startswith(b'retry:'))
+        try:
+            self.reserve()
+            event = self.next_event(chunks)
+        finally:
+            response.close()
+        self.assertEqual((event['appointment_id'], event['program_id'], event['status']), (self.appointment_id, self.program_id, 'pending'))
+        self.assertEqual(slot_events.metrics()['subscribers'], 0)
+
+    def test_last_event_id_replays_missed_events(self):
+        self.reserve()
+        response = self.clients['student'].get(f'/events/programs/{self.program_id}/slots', headers={'Last-Event-ID': '0'}, buffered=False)
+        try:
+            event = self.next_event(response.iter_encoded())
+        finally:
+            response.close()
+        self.assertEqual(event['status'], 'pending')
+
+    # every event recorded so far, as replayed to a program stream
+    def replayed_events(self):
+        return [json.loads(row['data']) for row in replay_events({f"program:{self.program_id}"}, 0)[0]]
+
+    def test_availability_delete_and_reconcile_are_recorded(self):
+        response = self.clients['instructor'].delete(f'/instructor/availability/{self.availability_id}/delete')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(event['availability_id'], event['appointment_id'], event['status']) for event in self.replayed_events()],
+                         [(self.availability_id, None, 'deleted')])
+
+        # reconcile announces the availabilities it adds and removes
+        entry = {'id': self.program_id, 'date': self.date, 'start_time': '13:00', 'end_time': '14:00'}
+        for entries in ([entry], []):
+            response = self.clients['instructor'].post(f'/instructor/availability/{self.course_id}', json={
+                'availabilities': entries, 'program_id': self.program_id, 'duration': 30, 'isDropins': False, 'mode': 'reconcile'})
+            self.assertEqual(response.status_code, 201)
+        events = self.replayed_events()[1:]
+        self.assertEqual([(event['start_time'], event['status']) for event in events], [('13:00', 'posted'), ('13:00', 'deleted')])
+        self.assertEqual(events[0]['availability_id'], events[1]['availability_id'])
+
+    def test_broker_is_woken_once_per_commit(self):
+        availability = db.session.get(Availability, self.availability_id)
+        with patch.object(slot_events, 'notify') as notify:
+            for status in ('inactive', 'posted', 'inactive'):
+                record_availability_event(availability, status)
+            db.session.commit()
+            self.assertEqual(notify.call_count, 1)
+
+            # a commit without events leaves the broker alone
+            db.session.commit()
+            record_availability_event(availability, 'posted')
+            db.session.commit()
+        self.assertEqual(notify.call_count, 2)
+
+    def test_program_delete_is_recorded(self):
+        response = self.clients['instructor'].delete(f'/program/delete/{self.program_id}?mode=sync')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(event['program_id'], event['availability_id'], event['status']) for event in self.replayed_events()],
+                         [(self.program_id, None, 'deleted')])
+
+    def test_non_members_cannot_subscribe(self):
+        self.assertEqual(self.clients['outsider'].get(f'/events/courses/{self.course_id}/slots').status_code, 403)
+        self.assertEqual(self.clients['outsider'].get(f'/events/programs/{self.program_id}/slots').status_code, 403)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sqlalchemy import create_engine, text
+from api.slow_queries import SlowQueryRecorder, normalize_sql, redact_parameters
+
+class SlowQueriesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        self.recorder = SlowQueryRecorder()
+        self.recorder.threshold_ms = 0
+        self.recorder.attach(self.engine)
+
+    def test_normalize_sql(self):
+        sql = "SELECT *  FROM appointment\n WHERE id IN (1, 2, 3) AND status = 'posted'"
+        self.assertEqual(normalize_sql(sql), "SELECT * FROM appointment WHERE id IN (?, ...) AND status = ?")
+
+    def test_redact_parameters(self):
+        self.assertEqual(redact_parameters(('secret@uw.edu', 4)), ['<str>', '<int>'])
+        self.assertEqual(redact_parameters({'email': 'secret@uw.edu'}), {'email': '<str>'})
+
+    def test_records_and_explains_slow_select(self):
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1 WHERE 1 = :x"), {'x': 1})
+
+        entries = self.recorder.top()
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['count'], 1)
+
+        # wait for the background EXPLAIN
+        for _ in range(50):
+            if self.recorder.top()[0]['explain'] is not None:
+                break
+            time.sleep(0.05)
+        self.assertIsNotNone(self.recorder.top()[0]['explain'])
+        self.assertEqual(len(self.recorder.top()), 1)
+
+    def test_top_n_keeps_largest_total(self):
+        self.recorder.top_n = 2
+        self.recorder.explain_enabled = False
+        self.recorder.record(self.engine, "SELECT a FROM t", None, 5)
+        self.recorder.record(self.engine, "SELECT b FROM t", None, 50)
+        self.recorder.record(self.engine, "SELECT c FROM t", None, 20)
+        self.assertEqual([entry['sql'] for entry in self.recorder.top()], ["SELECT b FROM t", "SELECT c FROM t"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
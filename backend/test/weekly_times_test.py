@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+from flask_jwt_extended import create_access_token
+from api import create_app, db
+from api.models import User, CourseDetails, CourseTimes, ProgramDetails, ProgramTimes
+
+class WeeklyTimesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        self.app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.instructor = User(email='inst@uw.edu', name='Instructor', account_type='instructor', status='active')
+        db.session.add(self.instructor)
+        db.session.flush()
+        self.course = CourseDetails(name='CSS 101', instructor_id=self.instructor.id)
+        db.session.add(self.course)
+        db.session.flush()
+        self.program = ProgramDetails(name='Office Hours', course_id=self.course.id, instructor_id=self.instructor.id)
+        db.session.add(self.program)
+        db.session.commit()
+
+        self.client = self.app.test_client()
+        self.client.set_cookie('access_token_cookie', create_access_token(identity=str(self.instructor.id)))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def times(self, **days):
+        return {day: {'start_time': start, 'end_time': end} for day, (start, end) in days.items()}
+
+    def test_course_times_diff(self):
+        url = f'/course/times/{self.course.id}'
+        result = self.client.post(url, json={self.course.id: self.times(Monday=('09:00', '10:00'), Wednesday=('09:00', '10:00'))}).get_json()
+        self.assertEqual((result['inserted'], result['updated'], result['deleted'], result['times_version']), (2, 0, 0, 1))
+        monday_id = CourseTimes.query.filter_by(day='Monday').one().id
+
+        result = self.client.post(url, json={self.course.id: self.times(Monday=('09:00', '10:00'), Wednesday=('11:00', '12:00'),
+                                                                         Friday=('09:00', '10:00'))}).get_json()
+        self.assertEqual((result['inserted'], result['updated'], result['deleted'], result['times_version']), (1, 1, 0, 2))
+        self.assertEqual(CourseTimes.query.filter_by(day='Monday').one().id, monday_id)
+        self.assertEqual(CourseTimes.query.filter_by(day='Wednesday').one().start_time, '11:00')
+
+        # posting the same schedule again changes nothing and keeps the version
+        result = self.client.post(url, json={self.course.id: self.times(Monday=('09:00', '10:00'), Wednesday=('11:00', '12:00'),
+                                                                         Friday=('09:00', '10:00'))}).get_json()
+        self.assertEqual((result['inserted'], result['updated'], result['deleted'], result['times_version']), (0, 0, 0, 2))
+
+        result = self.client.post(url, json={}).get_json()
+        self.assertEqual((result['deleted'], result['times_version']), (3, 3))
+        self.assertEqual(CourseTimes.query.count(), 0)
+
+    def test_program_times_diff(self):
+        url = f'/course/programs/times/{self.program.id}'
+        self.client.post(url, json={self.program.id: self.times(Tuesday=('13:00', '14:00'))})
+        result = self.client.post(url, json={self.program.id: self.times(Thursday=('13:00', '14:00'))}).get_json()
+        self.assertEqual((result['inserted'], result['deleted'], result['times_version']), (1, 1, 2))
+        self.assertEqual([time.day for time in ProgramTimes.query.all()], ['Thursday'])
+        self.assertEqual(self.client.post('/course/programs/times/999', json={}).status_code, 404)
+
+    def test_program_times_ignore_other_programs(self):
+        other = ProgramDetails(name='Tutoring', course_id=self.course.id, instructor_id=self.instructor.id)
+        db.session.add(other)
+        db.session.commit()
+
+        # the program page posts the times of every program in the course to the selected program's url
+        body = {self.program.id: self.times(Monday=('09:00', '10:00')), other.id: self.times(Tuesday=('13:00', '14:00'))}
+        result = self.client.post(f'/course/programs/times/{self.program.id}', json=body).get_json()
+        self.assertEqual((result['inserted'], result['deleted']), (1, 0))
+        self.assertEqual([time.day for time in ProgramTimes.query.filter_by(program_id=self.program.id)], ['Monday'])
+        self.assertEqual(ProgramTimes.query.filter_by(program_id=other.id).count(), 0)
+
+        self.client.post(f'/course/programs/times/{other.id}', json=body)
+        self.assertEqual([time.day for time in ProgramTimes.query.filter_by(program_id=other.id)], ['Tuesday'])
+        self.assertEqual([time.day for time in ProgramTimes.query.filter_by(program_id=self.program.id)], ['Monday'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,17 @@
+"""
+ * wsgi.py
+ * Last Edited: 10/18/26
+ *
+ * Contains the production WSGI entry point, served by gunicorn with the
+ * settings in gunicorn.conf.py:
+ *   gunicorn -c gunicorn.conf.py wsgi:app
+ * main.py remains the development server.
+ *
+ * Known Bugs:
+ * -
+ *
+"""
+
+from api import create_app
+
+app = create_app()
@@ -13,7 +13,7 @@
 import React, { useState, useContext, useEffect } from "react";
 import { UserContext } from "../context/UserContext.js";
 import { ScheduleMeeting } from "react-schedule-meeting";
-import { format } from "date-fns";
+import { format, addDays } from "date-fns";
 import { getCookie } from "../utils/GetCookie.js";
 import Appointment from "./Appointment.js";
 import { isnt_Student } from "../utils/CheckUser.js";
@@ -45,6 +45,8 @@ const ScheduleAppointmentPopup = ({ onClose, functions }) => {
   const [selectedTimeslot, setSelectedTimeslot] = useState(null);
   const [selectedTimeDuration, setSelectedTimeDuration] = useState(0);
   const [availableTimeslots, setAvailableTimeslots] = useState([]);
+  // the next page or date window "Show later times" fetches
+  const [laterTimes, setLaterTimes] = useState(null);
 
   // Appointment Data Variables
   const [programDescriptions, setProgramDescriptions] = useState({});
@@ -98,6 +100,69 @@ const ScheduleAppointmentPopup = ({ onClose, functions }) => {
     }
   };
 
+  // fetches one page of a program's available appointments; without a
+  // page the backend returns the first page of the next two weeks
+  const fetchAvailableAppointments = async (page) => {
+    const params = new URLSearchParams();
+    if (page) {
+      params.set("from", page.from);
+      if (page.to) params.set("to", page.to);
+      if (page.after) params.set("after", page.after);
+    }
+
+    const response = await fetch(
+      `/student/appointments/available/${encodeURIComponent(
+        selectedProgramId
+      )}/${encodeURIComponent(selectedCourseId)}?${params}`,
+      { credentials: "include" }
+    );
+    if (!response.ok) {
+      throw new Error("Failed to fetch available appointments");
+    }
+    return response.json();
+  };
+
+  // loads a page of the selected program's available appointments into the
+  // calendar, replacing the shown timeslots unless page continues them
+  const loadAvailableTimeslots = (page = null) => {
+    fetchAvailableAppointments(page)
+      .then((data) => {
+        const timeslots = data.available_appointments
+          .filter((appointment) => appointment.status === "posted")
+          .map((appointment) => ({
+            startTime: new Date(`${appointment.date}T${appointment.start_time}`),
+            endTime: new Date(`${appointment.date}T${appointment.end_time}`),
+            id: appointment.appointment_id,
+          }));
+
+        // the rest of this window, or else the two weeks after it
+        setLaterTimes(
+          data.next_cursor
+            ? { from: data.from, to: data.to, after: data.next_cursor }
+            : {
+                from: format(addDays(new Date(`${data.to}T00:00`), 1), "yyyy-MM-dd"),
+              }
+        );
+        setAvailableTimeslots((shown) =>
+          page ? [...shown, ...timeslots] : timeslots
+        );
+
+        // set the duration of the timeslots (all timeslots should have the same duration)
+        if (timeslots.length > 0) {
+          const startDate = new Date(timeslots[0].startTime);
+          const endDate = new Date(timeslots[0].endTime);
+          const timeDifference = endDate - startDate;
+          const minutes = Math.floor(timeDifference / (1000 * 60));
+          setSelectedTimeDuration(minutes);
+        } else if (!page) {
+          window.alert(
+            "No available appointments in the next two weeks. Use \"Show later times\" to look further ahead."
+          );
+        }
+      })
+      .catch((error) => console.error("Error:", error));
+  };
+
   // when selectedProgramId or selectedCourseId change,
   // if they are real values, fetch the available appointments
   // for the program
@@ -106,47 +171,64 @@ const ScheduleAppointmentPopup = ({ onClose, functions }) => {
     if (isnt_Student(user)) return;
 
     if (selectedProgramId && selectedCourseId !== "") {
-      fetch(
-        `/student/appointments/available/${encodeURIComponent(
-          selectedProgramId
-        )}/${encodeURIComponent(selectedCourseId)}`
-      )
-        .then((response) => response.json())
-        .then((data) => {
-          // if there is real data
-          if (data.available_appointments.length > 0) {
-            const timeslots = data.available_appointments
-              .filter((appointment) => appointment.status === "posted")
-              .map((appointment) => ({
-                startTime: new Date(
-                  `${appointment.date}T${appointment.start_time}`
-                ),
-                endTime: new Date(
-                  `${appointment.date}T${appointment.end_time}`
-                ),
-                id: appointment.appointment_id,
-              }));
-
-            // set available timeslots to all available appointments
-            setAvailableTimeslots(timeslots);
-
-            // set the duration of the timeslots (all timeslots should have the same duration)
-            if (timeslots) {
-              const startDate = new Date(timeslots[0].startTime);
-              const endDate = new Date(timeslots[0].endTime);
-              const timeDifference = endDate - startDate;
-              const minutes = Math.floor(timeDifference / (1000 * 60));
-              setSelectedTimeDuration(minutes);
-            }
-          } else {
-            window.alert("No available appointments at this time.");
-          }
-        })
-        .catch((error) => console.error("Error:", error));
+      loadAvailableTimeslots();
     }
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [selectedProgramId, selectedCourseId]);
 
+  // while a program is selected, keep its timeslots current from the
+  // program's slot event stream instead of refetching them on a timer
+  useEffect(() => {
+    // user isn't an student
+    if (isnt_Student(user)) return;
+    if (!selectedProgramId) return;
+
+    const source = new EventSource(
+      `/events/programs/${encodeURIComponent(selectedProgramId)}/slots`,
+      { withCredentials: true }
+    );
+
+    // the stream missed too many events to replay them, reload instead
+    source.addEventListener("reset", () => loadAvailableTimeslots());
+
+    source.addEventListener("slot", (message) => {
+      const slot = JSON.parse(message.data);
+
+      // the program was deleted, nothing is bookable anymore
+      if (slot.availability_id === null) {
+        setAvailableTimeslots([]);
+        setLaterTimes(null);
+        return;
+      }
+
+      // a whole availability was added, deleted or toggled, reload its slots
+      if (slot.appointment_id === null) {
+        loadAvailableTimeslots();
+        return;
+      }
+
+      setAvailableTimeslots((timeslots) => {
+        const others = timeslots.filter(
+          (timeslot) => timeslot.id !== slot.appointment_id
+        );
+        if (slot.status !== "posted") return others;
+
+        // a cancelled appointment is bookable again
+        return [
+          ...others,
+          {
+            startTime: new Date(`${slot.date}T${slot.start_time}`),
+            endTime: new Date(`${slot.date}T${slot.end_time}`),
+            id: slot.appointment_id,
+          },
+        ].sort((a, b) => a.startTime - b.startTime);
+      });
+    });
+
+    return () => source.close();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [selectedProgramId]);
+
   ////////////////////////////////////////////////////////
   //               Fetch Post Functions                 //
   ////////////////////////////////////////////////////////
@@ -185,12 +267,18 @@ const ScheduleAppointmentPopup = ({ onClose, functions }) => {
         .then((response) => {
           if (!response.ok) {
             if (response.status === 409) {
-              alert("Sorry, this appointment is no longer available.");
-              setSelectedProgramId(""); // Reset the program id
-              setShowAppointmentPanel(false);
-              setShowCalendar(false);
               isHandledError = true; // Mark this error as handled
-              return;
+              // overlapping bookings come back with a description of the conflict
+              return response.json().then((data) => {
+                alert(
+                  data && data.conflict
+                    ? data.error
+                    : "Sorry, this appointment is no longer available."
+                );
+                setSelectedProgramId(""); // Reset the program id
+                setShowAppointmentPanel(false);
+                setShowCalendar(false);
+              });
             }
             throw new Error("Failed to reserve appointment");
           }
@@ -269,6 +357,7 @@ const ScheduleAppointmentPopup = ({ onClose, functions }) => {
     if (expandPopup && showCalendar) {
       setSelectedProgramId("");
       setAvailableTimeslots([]);
+      setLaterTimes(null);
       setShowCalendar(false);
       setExpandPopup(false);
     }
@@ -294,6 +383,7 @@ const ScheduleAppointmentPopup = ({ onClose, functions }) => {
     if (e.target.value === "") {
       setSelectedProgramId("");
       setAvailableTimeslots([]);
+      setLaterTimes(null);
       setExpandPopup(false);
       setShowCalendar(false);
     } else {
@@ -482,6 +572,18 @@ const ScheduleAppointmentPopup = ({ onClose, functions }) => {
                     availableTimeslots={availableTimeslots}
                     onStartTimeSelect={handleStartTimeSelect}
                   />
+
+                  {/* Load the next page of timeslots, or the two weeks after the shown ones */}
+                  {laterTimes && (
+                    <div className="flex justify-center">
+                      <button
+                        onClick={() => loadAvailableTimeslots(laterTimes)}
+                        className="bg-purple text-white p-2 rounded mt-3"
+                      >
+                        Show later times
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
 